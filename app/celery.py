@@ -20,3 +20,6 @@ def on_celery_setup_logging(**kwargs):
 def at_start(sender, **k):
     with sender.app.connection() as conn:
         sender.app.send_task("spread.tasks.run_spread_balance_cacher_bot")
+        sender.app.send_task("spread.tasks.run_spread_order_cacher_bot")
+        sender.app.send_task("spread.tasks.run_spread_order_status_service")
+        sender.app.send_task("spread.tasks.flush_spread_tx_journal")
@@ -0,0 +1,83 @@
+"""Redis depth value serialization benchmark
+
+Compares the previously cached dict of string levels, pickled the way
+django-redis stores it, with the depth_codec encoding (itself pickled as
+bytes by django-redis). Reports the stored size, the cacher's encode cost
+and the bot's decode cost, the latter including the float() of the best
+bid and ask every bot does.
+
+Usage: python -m benchmarks.depth_codec_bench [--levels 5,20,50] [--count 20000]
+"""
+import argparse
+import pickle
+import random
+import time
+
+from spread.spread_bot import depth_codec
+from spread.spread_bot.depth_codec import decode_depth, encode_depth
+
+from .orderbook_bench import make_snapshot
+
+
+def pickle_encode(asks, bids, meta):
+    return pickle.dumps(dict(meta, asks=asks, bids=bids), pickle.HIGHEST_PROTOCOL)
+
+
+def pickle_decode(data):
+    depth = pickle.loads(data)
+    return float(depth["asks"][0][0]), float(depth["bids"][0][0])
+
+
+def codec_encode(asks, bids, meta):
+    return pickle.dumps(encode_depth(asks, bids, **meta), pickle.HIGHEST_PROTOCOL)
+
+
+def codec_decode(data):
+    depth = decode_depth(pickle.loads(data))
+    return float(depth["asks"][0][0]), float(depth["bids"][0][0])
+
+
+def timed(function, items):
+    started = time.perf_counter()
+    for item in items:
+        function(*item)
+    return (time.perf_counter() - started) / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", default="5,20,50")
+    parser.add_argument("--count", type=int, default=20_000)
+    args = parser.parse_args()
+
+    random.seed(1)
+    backend = "numpy" if depth_codec.numpy is not None else "array"
+    print(f"depth_codec levels backend: {backend}")
+    print(
+        f"{'levels':<8}{'format':<8}{'bytes':>8}{'encode':>10}{'decode':>10}"
+        "   (us/book)"
+    )
+    for levels in map(int, args.levels.split(",")):
+        books = []
+        for _ in range(args.count):
+            asks, bids = make_snapshot(random.uniform(1, 100), levels, 0.0001)
+            meta = {"exchange_ts": time.time(), "received_at": time.time(), "seq": 1}
+            books.append((asks, bids, meta))
+
+        for name, encode, decode in (
+            ("pickle", pickle_encode, pickle_decode),
+            ("codec", codec_encode, codec_decode),
+        ):
+            encoded = [(encode(*book),) for book in books]
+            for (data,), (asks, bids, meta) in zip(encoded, books):
+                assert decode(data) == (float(asks[0][0]), float(bids[0][0]))
+
+            size = sum(len(data) for data, in encoded) // len(encoded)
+            print(
+                f"{levels:<8}{name:<8}{size:>8}"
+                f"{timed(encode, books):>10.2f}{timed(decode, encoded):>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Pooled HTTP session benchmark
+
+Serves a small JSON body over HTTPS from a local keep-alive server with a
+throwaway self-signed certificate (needs the openssl binary) and compares a
+fresh requests.request per call, as the exchange utils used to do, with
+exchanges.sessions.request reusing pooled connections.
+
+Usage: python -m benchmarks.http_pool_bench [--requests 300]
+"""
+import argparse
+import os
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from exchanges import sessions
+
+BODY = b'{"code":0,"data":{"price":"1.2345","qty":"10"}}'
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep connections open between requests
+    disable_nagle_algorithm = True  # Measure TLS, not delayed ACKs
+    handshakes = 0
+
+    def setup(self):
+        super().setup()
+        Handler.handshakes += 1
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_certificate(directory):
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", key, "-out", cert, "-days", "1",
+            "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost",
+        ],
+        check=True,
+        capture_output=True,
+    )  # fmt: skip
+    return cert, key
+
+
+def run(label, call, url, count, cert):
+    Handler.handshakes = 0
+    start = time.perf_counter()
+    for _ in range(count):
+        res = call("GET", url, verify=cert)
+        res.json()
+    elapsed = time.perf_counter() - start
+    per_request = elapsed / count * 1000
+    print(f"{label:<10}{per_request:>10.3f}{Handler.handshakes:>12}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = make_certificate(directory)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+
+        server = ThreadingHTTPServer(("localhost", 0), Handler)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"https://localhost:{server.server_address[1]}/api/v3/depth"
+
+        print(f"{args.requests} GET requests over TLS to {url}")
+        print(f"{'client':<10}{'ms/req':>10}{'handshakes':>12}")
+        fresh = run("fresh", requests.request, url, args.requests, cert)
+        pooled = run("pooled", sessions.request, url, args.requests, cert)
+        print(f"speedup: {fresh / pooled:.1f}x")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Order book update benchmark
+
+Compares the previous BybitWS rebuild-and-sort delta handling with the
+incremental OrderBook on a 50 level book fed with Bybit style deltas.
+
+Usage: python -m benchmarks.orderbook_bench [--messages 20000] [--rates 50,200,1000]
+"""
+import argparse
+import random
+import time
+
+from exchanges.orderbook import OrderBook
+
+
+def make_snapshot(mid, levels, tick):
+    asks, bids = [], []
+    for i in range(levels):
+        asks.append([f"{mid + tick * (i + 1):.4f}", f"{random.uniform(1, 500):.2f}"])
+        bids.append([f"{mid - tick * (i + 1):.4f}", f"{random.uniform(1, 500):.2f}"])
+    return asks, bids
+
+
+def make_deltas(count, mid, levels, tick):
+    """Deltas touching 1-4 levels near the top, with inserts and deletes"""
+    deltas = []
+    for _ in range(count):
+        delta = {"a": [], "b": []}
+        for _ in range(random.randint(1, 4)):
+            side = random.choice(("a", "b"))
+            offset = tick * random.randint(1, levels + 5)
+            price = mid + offset if side == "a" else mid - offset
+            size = 0 if random.random() < 0.25 else random.uniform(1, 500)
+            delta[side].append([f"{price:.4f}", f"{size:.2f}"])
+        deltas.append(delta)
+    return deltas
+
+
+class RebuildBook:
+    """Delta handling as previously implemented in BybitWS._apply_delta"""
+
+    def __init__(self, asks, bids):
+        self.orderbooks = {
+            "b": sorted(bids, key=lambda x: float(x[0]), reverse=True),
+            "a": sorted(asks, key=lambda x: float(x[0])),
+        }
+
+    def apply(self, data):
+        for side in ["b", "a"]:
+            updates = {float(price): float(size) for price, size in data.get(side, [])}
+            book = {float(price): float(size) for price, size in self.orderbooks[side]}
+
+            for price, size in updates.items():
+                if size == 0:
+                    if price in book:
+                        del book[price]
+                else:
+                    book[price] = size
+
+            sorted_book = sorted(
+                book.items(), key=lambda x: x[0], reverse=(side == "b")
+            )
+            self.orderbooks[side] = [[price, size] for price, size in sorted_book]
+        return self.orderbooks["a"], self.orderbooks["b"]
+
+
+def run_rebuild(snapshot, deltas):
+    book = RebuildBook(*snapshot)
+    start = time.perf_counter()
+    for delta in deltas:
+        asks, bids = book.apply(delta)
+    return time.perf_counter() - start, asks, bids
+
+
+def run_incremental(snapshot, deltas):
+    book = OrderBook()
+    book.reset(*snapshot)
+    start = time.perf_counter()
+    for delta in deltas:
+        book.update(delta["a"], delta["b"])
+        asks, bids = book.asks(), book.bids()
+    return time.perf_counter() - start, asks, bids
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--levels", type=int, default=50)
+    parser.add_argument("--rates", default="50,200,1000")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    mid, tick = 100.0, 0.01
+    snapshot = make_snapshot(mid, args.levels, tick)
+    deltas = make_deltas(args.messages, mid, args.levels, tick)
+
+    rebuild_time, rebuild_asks, rebuild_bids = run_rebuild(snapshot, deltas)
+    incremental_time, asks, bids = run_incremental(snapshot, deltas)
+
+    if rebuild_asks != asks or rebuild_bids != bids:
+        raise SystemExit("Books diverged, benchmark is invalid")
+
+    rates = [int(rate) for rate in args.rates.split(",")]
+    print(f"{args.messages} deltas on a {args.levels} level book")
+    header = "".join(f"{f'cpu@{rate}/s':>12}" for rate in rates)
+    print(f"{'engine':<14}{'us/msg':>10}{header}")
+    for name, elapsed in (("rebuild", rebuild_time), ("incremental", incremental_time)):
+        per_message = elapsed / args.messages
+        cpu = "".join(f"{per_message * rate * 100:>11.2f}%" for rate in rates)
+        print(f"{name:<14}{per_message * 1e6:>10.2f}{cpu}")
+    print(f"speedup: {rebuild_time / incremental_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
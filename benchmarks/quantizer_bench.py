@@ -0,0 +1,118 @@
+"""Price and quantity rounding benchmark
+
+Compares the previous SpreadUtilityFunctions, which rebuilt a Decimal from
+the precision on every call, with the precomputed Quantizer on random prices
+and quantities, and counts the results off by a step from an exact Decimal
+reference.
+
+Usage: python -m benchmarks.quantizer_bench [--calls 200000]
+"""
+import argparse
+import math
+import random
+import time
+from decimal import ROUND_DOWN, Decimal
+
+from spread.spread_bot.utils import SpreadUtilityFunctions
+
+PRECISIONS = [(0.01, 0.0001), (1 / 10**6, 1 / 10**2), ("0.00001", "1"), (0.1, 0.001)]
+
+
+class LegacyUtilityFunctions:
+    """SpreadUtilityFunctions as it was before the Quantizer"""
+
+    def __init__(self, ticker, price_precision, quantity_precision):
+        self.ticker = ticker
+        self.price_precision = price_precision
+        self.quantity_precision = quantity_precision
+
+    def determine_order_price(self, side, lowest_ask=None, highest_bid=None):
+        decimal_places = Decimal(str(self.price_precision)).as_tuple().exponent * -1
+        if side == "BUY":
+            return round(highest_bid + float(self.price_precision), decimal_places)
+        if side == "SELL":
+            return round(lowest_ask - float(self.price_precision), decimal_places)
+
+    def format_order_price(self, order_price):
+        decimal_places = Decimal(str(self.price_precision)).as_tuple().exponent * -1
+        return f"{order_price:.{decimal_places}f}"
+
+    def determine_qty_down(self, qty):
+        decimal_places = (
+            Decimal(str(self.quantity_precision)).as_tuple().exponent * -1
+        )
+        factor = 10**decimal_places
+        return math.floor(qty * factor) / factor
+
+
+def make_inputs(count, price_precision, quantity_precision):
+    price_step = Decimal(str(price_precision))
+    qty_step = Decimal(str(quantity_precision))
+    inputs = []
+    for _ in range(count):
+        price = float(Decimal(random.randrange(1, 10**7)) * price_step)
+        # Quantities are often on the step already, e.g. a filled quantity
+        qty = float(Decimal(random.randrange(1, 10**6)) * qty_step)
+        if random.random() < 0.5:
+            qty *= random.uniform(0.5, 1.5)
+        inputs.append((price, qty))
+    return inputs
+
+
+def reference(inputs, price_precision, quantity_precision):
+    price_step = Decimal(str(price_precision)).normalize()
+    qty_step = Decimal(str(quantity_precision)).normalize()
+    results = []
+    for price, qty in inputs:
+        bid = Decimal(repr(price))
+        order_price = (bid + price_step).quantize(price_step)
+        qty_down = (Decimal(repr(qty)) / qty_step).to_integral_value(
+            rounding=ROUND_DOWN
+        ) * qty_step
+        results.append((float(order_price), float(qty_down)))
+    return results
+
+
+def run(functions, inputs):
+    results = []
+    started = time.perf_counter()
+    for price, qty in inputs:
+        order_price = functions.determine_order_price("BUY", highest_bid=price)
+        functions.format_order_price(order_price)
+        results.append((order_price, functions.determine_qty_down(qty)))
+    return time.perf_counter() - started, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args()
+
+    random.seed(1)
+    per_pair = args.calls // len(PRECISIONS)
+    print(f"{'precision':<22}{'impl':<10}{'us/call':>10}{'off by a step':>16}")
+    for price_precision, quantity_precision in PRECISIONS:
+        inputs = make_inputs(per_pair, price_precision, quantity_precision)
+        expected = reference(inputs, price_precision, quantity_precision)
+        for name, cls in (
+            ("decimal", LegacyUtilityFunctions),
+            ("quantizer", SpreadUtilityFunctions),
+        ):
+            functions = cls("BENCH/USDT", price_precision, quantity_precision)
+            elapsed, results = run(functions, inputs)
+            wrong = sum(
+                not (
+                    math.isclose(result[0], exact[0], rel_tol=1e-12)
+                    and math.isclose(result[1], exact[1], rel_tol=1e-12)
+                )
+                for result, exact in zip(results, expected)
+            )
+            label = f"{price_precision}/{quantity_precision}"
+            print(
+                f"{label:<22}{name:<10}{elapsed / per_pair * 1e6:>10.2f}"
+                f"{wrong:>16}"
+            )
+
+
+if __name__ == "__main__":
+    main()
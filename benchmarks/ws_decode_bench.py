@@ -0,0 +1,253 @@
+"""Websocket depth frame decoding benchmark
+
+Decodes depth frames of every adapter the way on_message used to (stdlib
+json.loads and extraction from the decoded message) and with the adapter
+parse_depth functions on each available decoding backend.
+
+Frames are read from DIR/<Exchange>.frames, one captured text frame per
+line (gzip and deflate frames decompressed), when --frames is given.
+Exchanges without a capture use generated frames shaped like the venue's
+depth pushes.
+
+Usage: python -m benchmarks.ws_decode_bench [--frames DIR] [--count 20000]
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+from exchanges import decoding
+from exchanges.bingx import bingx_ws_class
+from exchanges.bitget import bitget_ws_class
+from exchanges.bitmart import bitmart_ws_class
+from exchanges.bybit import bybit_ws_class
+from exchanges.htx import htx_ws_class
+from exchanges.kucoin import kucoin_ws_class
+from exchanges.mexc import mexc_ws_class
+from exchanges.xt import xt_ws_class
+
+
+def levels(count, mid, sign, as_numbers=False):
+    result = []
+    for i in range(count):
+        price = round(mid + sign * 0.0001 * (i + 1) * mid, 4)
+        size = round(random.uniform(1, 5000), 2)
+        result.append([price, size] if as_numbers else [f"{price}", f"{size}"])
+    return result
+
+
+def generated_frames(exchange, count):
+    """Depth pushes in the venue's format for a handful of tickers"""
+    frames = []
+    for i in range(count):
+        tick = f"T{i % 20}"
+        mid = random.uniform(0.01, 50000)
+        ts = 1700000000000 + i
+        if exchange == "Bybit":
+            frame = {
+                "topic": f"orderbook.50.{tick}USDT",
+                "type": "snapshot" if i % 100 == 0 else "delta",
+                "ts": ts,
+                "data": {
+                    "s": f"{tick}USDT",
+                    "a": levels(50 if i % 100 == 0 else 3, mid, 1),
+                    "b": levels(50 if i % 100 == 0 else 3, mid, -1),
+                    "u": i,
+                    "seq": i,
+                },
+                "cts": ts,
+            }
+        elif exchange == "Mexc":
+            frame = {
+                "c": f"spot@public.limit.depth.v3.api@{tick}USDT@5",
+                "d": {
+                    "asks": [{"p": p, "v": v} for p, v in levels(5, mid, 1)],
+                    "bids": [{"p": p, "v": v} for p, v in levels(5, mid, -1)],
+                    "e": "spot@public.limit.depth.v3.api",
+                    "r": str(i),
+                },
+                "s": f"{tick}USDT",
+                "t": ts,
+            }
+        elif exchange == "Htx":
+            frame = {
+                "ch": f"market.{tick.lower()}usdt.depth.step0",
+                "ts": ts,
+                "tick": {
+                    "bids": levels(150, mid, -1, as_numbers=True),
+                    "asks": levels(150, mid, 1, as_numbers=True),
+                    "version": i,
+                    "ts": ts,
+                },
+            }
+        elif exchange == "Kucoin":
+            frame = {
+                "type": "message",
+                "topic": f"/spotMarket/level2Depth5:{tick}-USDT",
+                "subject": "level2",
+                "data": {
+                    "asks": levels(5, mid, 1),
+                    "bids": levels(5, mid, -1),
+                    "timestamp": ts,
+                },
+            }
+        elif exchange == "BingX":
+            frame = {
+                "code": 0,
+                "dataType": f"{tick}-USDT@depth10",
+                "data": {
+                    "bids": levels(10, mid, -1),
+                    "asks": levels(10, mid, 1)[::-1],
+                },
+                "timestamp": ts,
+            }
+        elif exchange == "Bitget":
+            frame = {
+                "action": "snapshot",
+                "arg": {
+                    "instType": "SPOT",
+                    "channel": "books5",
+                    "instId": f"{tick}USDT",
+                },
+                "data": [
+                    {
+                        "asks": levels(5, mid, 1),
+                        "bids": levels(5, mid, -1),
+                        "checksum": 0,
+                        "ts": str(ts),
+                    }
+                ],
+                "ts": ts,
+            }
+        elif exchange == "Bitmart":
+            frame = {
+                "table": "spot/depth5",
+                "data": [
+                    {
+                        "asks": levels(5, mid, 1),
+                        "bids": levels(5, mid, -1),
+                        "symbol": f"{tick}_USDT",
+                        "ms_t": ts,
+                    }
+                ],
+            }
+        else:
+            frame = {
+                "topic": "depth",
+                "event": f"depth@{tick.lower()}_usdt,5",
+                "data": {
+                    "s": f"{tick.lower()}_usdt",
+                    "i": i,
+                    "t": ts,
+                    "a": levels(5, mid, 1),
+                    "b": levels(5, mid, -1),
+                },
+            }
+        frames.append(json.dumps(frame, separators=(",", ":")))
+    return frames
+
+
+def legacy_bybit(message):
+    message = json.loads(message)
+    data = message.get("data", {})
+    if "orderbook" in message["topic"]:
+        return message.get("type") == "snapshot", data.get("a", []), data.get("b", [])
+
+
+def legacy_mexc(message):
+    message = json.loads(message)
+    asks = [[ask["p"], ask["v"]] for ask in message["d"]["asks"]]
+    bids = [[bid["p"], bid["v"]] for bid in message["d"]["bids"]]
+    return message["c"], asks, bids
+
+
+def legacy_htx(message):
+    message = json.loads(message)
+    return message["ch"], message["tick"]["asks"], message["tick"]["bids"]
+
+
+def legacy_kucoin(message):
+    message = json.loads(message)
+    return message["topic"], message["data"]["asks"], message["data"]["bids"]
+
+
+def legacy_bingx(message):
+    message = json.loads(message)
+    asks = message["data"]["asks"][::-1]
+    return message["dataType"], asks, message["data"]["bids"]
+
+
+def legacy_bitget(message):
+    message = json.loads(message)
+    data = message["data"][0]
+    return message["arg"]["instId"], data["asks"], data["bids"]
+
+
+def legacy_bitmart(message):
+    message = json.loads(message)
+    topic = f"spot/depth5:{message['data'][0]['symbol']}"
+    return topic, message["data"][0]["asks"], message["data"][0]["bids"]
+
+
+def legacy_xt(message):
+    message = json.loads(message)
+    return message["event"], message["data"]["a"], message["data"]["b"]
+
+
+EXCHANGES = {
+    "Bybit": (legacy_bybit, bybit_ws_class.parse_depth),
+    "Mexc": (legacy_mexc, mexc_ws_class.parse_depth),
+    "Htx": (legacy_htx, htx_ws_class.parse_depth),
+    "Kucoin": (legacy_kucoin, kucoin_ws_class.parse_depth),
+    "BingX": (legacy_bingx, bingx_ws_class.parse_depth),
+    "Bitget": (legacy_bitget, bitget_ws_class.parse_depth),
+    "Bitmart": (legacy_bitmart, bitmart_ws_class.parse_depth),
+    "XT": (legacy_xt, xt_ws_class.parse_depth),
+}
+
+
+def load_frames(directory, exchange, count):
+    path = os.path.join(directory or "", f"{exchange}.frames")
+    if directory and os.path.exists(path):
+        with open(path) as infile:
+            frames = [line.rstrip("\n") for line in infile if line.strip()]
+        return frames, "recorded"
+    return generated_frames(exchange, count), "generated"
+
+
+def timed(decode, frames):
+    started = time.perf_counter()
+    for frame in frames:
+        decode(frame)
+    return (time.perf_counter() - started) / len(frames) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", help="Directory of <Exchange>.frames captures")
+    parser.add_argument("--count", type=int, default=20_000)
+    args = parser.parse_args()
+
+    random.seed(1)
+    backends = sorted(decoding.BACKENDS)
+    header = "".join(f"{name:>12}" for name in ["legacy"] + backends)
+    print(f"{'exchange':<10}{'frames':<12}{'bytes':>8}{header}   (us/frame)")
+    for exchange, (legacy, parse_depth) in EXCHANGES.items():
+        frames, source = load_frames(args.frames, exchange, args.count)
+        timings = [timed(legacy, frames)]
+        for name in backends:
+            decoding.use(name)
+            timings.append(
+                timed(lambda frame: parse_depth(decoding.loads(frame)), frames)
+            )
+        size = sum(map(len, frames)) // len(frames)
+        print(
+            f"{exchange:<10}{source:<12}{size:>8}"
+            + "".join(f"{timing:>12.2f}" for timing in timings)
+        )
+    decoding.use()
+
+
+if __name__ == "__main__":
+    main()
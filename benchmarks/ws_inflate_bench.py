@@ -0,0 +1,80 @@
+"""Compressed websocket frame decoding benchmark
+
+Replays gzip (Htx, BingX) and raw deflate (Bitmart) depth frames through
+the previous per-frame GzipFile / decompressobj decoding and through
+exchanges.inflate, and reports the cost per frame.
+
+Frames come from the same captures as ws_decode_bench, DIR/<Exchange>.frames
+with one decompressed text frame per line, and are compressed the way the
+venue sends them. Without --frames venue-shaped frames are generated.
+
+Usage: python -m benchmarks.ws_inflate_bench [--frames DIR] [--count 20000]
+"""
+import argparse
+import gzip
+import io
+import random
+import time
+import zlib
+
+from exchanges.inflate import DEFLATE, GZIP, inflate_deflate, inflate_gzip
+
+from .ws_decode_bench import load_frames
+
+
+def compress(frame, wbits):
+    compressor = zlib.compressobj(wbits=wbits)
+    return compressor.compress(frame.encode()) + compressor.flush()
+
+
+def gzip_file(data):
+    return gzip.GzipFile(fileobj=io.BytesIO(data), mode="rb").read()
+
+
+def decompressobj(data):
+    decompress = zlib.decompressobj(DEFLATE)
+    return decompress.decompress(data) + decompress.flush()
+
+
+VENUES = {
+    "Htx": (GZIP, gzip_file, inflate_gzip),
+    "BingX": (GZIP, gzip_file, inflate_gzip),
+    "Bitmart": (DEFLATE, decompressobj, inflate_deflate),
+}
+
+
+def timed(decode, frames):
+    started = time.perf_counter()
+    for frame in frames:
+        decode(frame)
+    return (time.perf_counter() - started) / len(frames) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", help="Directory of <Exchange>.frames captures")
+    parser.add_argument("--count", type=int, default=20_000)
+    args = parser.parse_args()
+
+    random.seed(1)
+    print(
+        f"{'exchange':<10}{'frames':<12}{'in':>8}{'out':>8}"
+        f"{'previous':>12}{'inflate':>12}   (us/frame)"
+    )
+    for exchange, (wbits, previous, inflate) in VENUES.items():
+        frames, source = load_frames(args.frames, exchange, args.count)
+        compressed = [compress(frame, wbits) for frame in frames]
+        for frame, data in zip(frames, compressed):
+            assert inflate(data) == previous(data) == frame.encode()
+
+        timings = [timed(previous, compressed), timed(inflate, compressed)]
+        size_in = sum(map(len, compressed)) // len(compressed)
+        size_out = sum(map(len, frames)) // len(frames)
+        print(
+            f"{exchange:<10}{source:<12}{size_in:>8}{size_out:>8}"
+            + "".join(f"{timing:>12.2f}" for timing in timings)
+        )
+
+
+if __name__ == "__main__":
+    main()
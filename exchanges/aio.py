@@ -0,0 +1,104 @@
+import asyncio
+import os
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from exchanges import rate_limit as rate_limiter
+from exchanges.sessions import POOL_MAXSIZE, TIMEOUT, PROXY
+
+CONCURRENCY = int(os.environ.get("EXCHANGE_ASYNC_CONCURRENCY", "8"))  # Per exchange
+
+_sessions = {}  # event loop -> ClientSession
+_semaphores = {}  # event loop -> {exchange: Semaphore}
+
+
+class Response:
+    """The part of requests.Response the parse_response helpers rely on"""
+
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+
+def prune():
+    """Drop the entries of loops that ended without close_session"""
+    for cache in (_sessions, _semaphores):
+        for loop in [loop for loop in cache if loop.is_closed()]:
+            del cache[loop]
+
+
+def get_session():
+    """aiohttp session shared by every coroutine of the running loop"""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        prune()
+        connector = aiohttp.TCPConnector(limit_per_host=POOL_MAXSIZE, ttl_dns_cache=300)
+        session = _sessions[loop] = aiohttp.ClientSession(connector=connector)
+    return session
+
+
+async def close_session():
+    """Close the session of the running loop, call it before the loop ends"""
+    loop = asyncio.get_running_loop()
+    _semaphores.pop(loop, None)
+    session = _sessions.pop(loop, None)
+    if session is not None:
+        await session.close()
+
+
+async def closing(coroutine):
+    """Await the coroutine, closing the loop's session however it ends"""
+    try:
+        return await coroutine
+    finally:
+        await close_session()
+
+
+def limit(exchange):
+    """Semaphore capping in-flight requests to one exchange"""
+    loop = asyncio.get_running_loop()
+    if loop not in _semaphores:
+        prune()
+    semaphores = _semaphores.setdefault(loop, {})
+    semaphore = semaphores.get(exchange)
+    if semaphore is None:
+        semaphore = semaphores[exchange] = asyncio.Semaphore(CONCURRENCY)
+    return semaphore
+
+
+def clean_params(params):
+    """requests drops None values and stringifies the rest, aiohttp does not"""
+    if not params:
+        return None
+    return {key: str(value) for key, value in params.items() if value is not None}
+
+
+async def request(
+    method, url, params=None, proxies=None, timeout=TIMEOUT, rate_limit=None, **kwargs
+):
+    """Async counterpart of sessions.request taking the same keyword arguments"""
+    if rate_limit:
+        await rate_limiter.async_acquire(*rate_limit, urlsplit(url).path)
+    if proxies is None and PROXY:
+        proxies = {"http": PROXY, "https": PROXY}
+    if proxies:
+        kwargs["proxy"] = proxies.get(urlsplit(url).scheme)
+    if kwargs.get("headers"):  # Some signers produce bytes header values
+        kwargs["headers"] = {
+            key: value.decode() if isinstance(value, bytes) else value
+            for key, value in kwargs["headers"].items()
+        }
+    if isinstance(kwargs.get("data"), str):  # Sent as is, like requests does
+        kwargs["data"] = kwargs["data"].encode()
+        kwargs["skip_auto_headers"] = ("Content-Type",)
+
+    async with get_session().request(
+        method,
+        url,
+        params=clean_params(params),
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        **kwargs,
+    ) as res:
+        return Response(res.status, await res.text())
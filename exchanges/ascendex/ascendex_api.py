@@ -1,9 +1,7 @@
-from .utils import request
+from .utils import request, async_request
 
 
-def get_tickers():
-    url = "/api/pro/v1/spot/ticker"
-    res = request("GET", url)
+def parse_tickers(res):
     res = res["data"]
 
     tickers = {}
@@ -26,3 +24,15 @@ def get_tickers():
             ) - 1
 
     return tickers
+
+
+def get_tickers():
+    url = "/api/pro/v1/spot/ticker"
+    res = request("GET", url)
+    return parse_tickers(res)
+
+
+async def async_get_tickers():
+    url = "/api/pro/v1/spot/ticker"
+    res = await async_request("GET", url)
+    return parse_tickers(res)
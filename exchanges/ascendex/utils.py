@@ -1,4 +1,4 @@
-import requests
+from exchanges import aio, sessions
 import hmac
 import base64
 import time
@@ -9,7 +9,13 @@ HOST = "https://ascendex.com"
 
 def request(method, url, params=None):
     url = "{}{}".format(HOST, url)
-    res = requests.request(method, url, params=params)
+    res = sessions.request(method, url, params=params)
+    return parse_response(res)
+
+
+async def async_request(method, url, params=None):
+    url = "{}{}".format(HOST, url)
+    res = await aio.request(method, url, params=params)
     return parse_response(res)
 
 
@@ -1,17 +1,26 @@
-from exchanges.bingx.utils import request
+from exchanges.bingx.utils import request, async_request
+
+
+def parse_product_details(res, ticker):
+    res = [coin for coin in res["data"]["symbols"] if coin["symbol"] == ticker][0]
+    return res
 
 
 def get_product_details(ticker):
     url = "/openApi/spot/v1/common/symbols"
 
     res = request("GET", url)
-    res = [coin for coin in res["data"]["symbols"] if coin["symbol"] == ticker][0]
-    return res
+    return parse_product_details(res, ticker)
 
 
-def get_tickers():
-    url = "/openApi/spot/v1/ticker/24hr"
-    res = request("GET", url)
+async def async_get_product_details(ticker):
+    url = "/openApi/spot/v1/common/symbols"
+
+    res = await async_request("GET", url)
+    return parse_product_details(res, ticker)
+
+
+def parse_tickers(res):
     res = res["data"]
 
     tickers = {}
@@ -38,21 +47,42 @@ def get_tickers():
     return tickers
 
 
+def get_tickers():
+    url = "/openApi/spot/v1/ticker/24hr"
+    res = request("GET", url)
+    return parse_tickers(res)
+
+
+async def async_get_tickers():
+    url = "/openApi/spot/v1/ticker/24hr"
+    res = await async_request("GET", url)
+    return parse_tickers(res)
+
+
+def parse_depth(res):
+    asks = res["data"]["asks"][::-1]
+    bids = res["data"]["bids"]
+
+    return asks, bids
+
+
 def get_depth(ticker):
     url = "/openApi/spot/v1/market/depth"
 
     params = {"symbol": ticker}
     res = request("GET", url, params=params)
-    asks = res["data"]["asks"][::-1]
-    bids = res["data"]["bids"]
+    return parse_depth(res)
 
-    return asks, bids
 
+async def async_get_depth(ticker):
+    url = "/openApi/spot/v1/market/depth"
 
-def get_allowed_symbols():
-    url = "/openApi/spot/v1/common/symbols"
+    params = {"symbol": ticker}
+    res = await async_request("GET", url, params=params)
+    return parse_depth(res)
 
-    res = request("GET", url)
+
+def parse_allowed_symbols(res):
     res = [
         coin["symbol"]
         for coin in res["data"]["symbols"]
@@ -60,3 +90,17 @@ def get_allowed_symbols():
     ]
 
     return res
+
+
+def get_allowed_symbols():
+    url = "/openApi/spot/v1/common/symbols"
+
+    res = request("GET", url)
+    return parse_allowed_symbols(res)
+
+
+async def async_get_allowed_symbols():
+    url = "/openApi/spot/v1/common/symbols"
+
+    res = await async_request("GET", url)
+    return parse_allowed_symbols(res)
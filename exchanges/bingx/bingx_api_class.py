@@ -1,15 +1,19 @@
+import asyncio
 import logging
-import requests
+from exchanges import sessions
 from tenacity import retry, stop, wait
 from django.core.cache import cache
 from app.celery import app
 
-from exchanges.bingx.utils import sign_request
+from exchanges.bingx.utils import sign_request, async_sign_request
+from exchanges.bingx.bingx_order_status import pending_count, request_order_status
 from exchanges.bingx.bingx_api import (
     get_tickers,
     get_depth,
     get_product_details,
     get_allowed_symbols,
+    async_get_tickers,
+    async_get_depth,
 )
 
 logger = logging.getLogger(__name__)
@@ -26,18 +30,18 @@ def telegram_bot_sendtext(bot_message):
         + "&parse_mode=Markdown&text="
         + bot_message
     )
-    response = requests.get(send_text)
+    response = sessions.request("GET", send_text)
     return response.json()
 
 
-def req_is_limited(key, limit, period):
-    if cache.set(key, limit, nx=True):
-        cache.expire(key, period)
-    cached_val = cache.get(key)
-    if cached_val and cached_val > 0:
-        cache.decr(key, 1)
-        return False
-    return True
+def alert(bot_message):
+    """telegram_bot_sendtext, on a thread when called from an event loop"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        telegram_bot_sendtext(bot_message)
+    else:
+        loop.run_in_executor(None, telegram_bot_sendtext, bot_message)
 
 
 class BingXAPI:
@@ -58,10 +62,18 @@ class BingXAPI:
         tickers = get_tickers()
         return tickers
 
+    async def async_get_tickers(self):
+        tickers = await async_get_tickers()
+        return tickers
+
     def get_depth(self):
         asks, bids = get_depth(self.ticker)
         return asks, bids
 
+    async def async_get_depth(self):
+        asks, bids = await async_get_depth(self.ticker)
+        return asks, bids
+
     def get_product_details(self):
         product_details = get_product_details(self.ticker)
         price_precision = product_details["tickSize"]
@@ -72,10 +84,7 @@ class BingXAPI:
         symbols = get_allowed_symbols()
         return self.ticker in symbols
 
-    def get_asset_details(self):
-        url = "/openApi/wallets/v1/capital/config/getall"
-
-        res = sign_request(self.public_key, self.private_key, self.group, "GET", url)
+    def parse_asset_details(self, res):
         if res["code"] != 0:
             logger.error(f"Bingx get_asset_details, error in response. {res}")
             return {}
@@ -103,42 +112,58 @@ class BingXAPI:
 
         return details
 
-    @retry(stop=stop.stop_after_attempt(2), wait=wait.wait_fixed(0.5))
-    def create_limit_order(self, side, price, quantity):
-        # Check rate limit
-        key = f"Bingx_create_limit_order_{self.kyc}"
-        limit = 4
-        period = 1
-
-        if req_is_limited(key, limit, period):
-            logger.warning(
-                f"Bingx create limit order Rate limit exceeded trying again."
-            )
-            raise Exception("Bingx create limit order Rate limit exceeded")
+    def get_asset_details(self):
+        url = "/openApi/wallets/v1/capital/config/getall"
 
-        url = "/openApi/spot/v1/trade/order"
+        res = sign_request(self.public_key, self.private_key, self.group, "GET", url)
+        return self.parse_asset_details(res)
 
-        params = {
+    async def async_get_asset_details(self):
+        url = "/openApi/wallets/v1/capital/config/getall"
+
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "GET", url
+        )
+        return self.parse_asset_details(res)
+
+    def limit_order_params(self, side, price, quantity):
+        return {
             "symbol": self.ticker,
             "side": "BUY" if side == "buy" else "SELL",
             "type": "LIMIT",
             "price": str(price),
             "quantity": str(quantity),
         }
-        res = sign_request(
-            self.public_key, self.private_key, self.group, "POST", url, params
-        )
 
+    def parse_created_order(self, res):
         if res["code"] == 100410 and res["msg"] == "rate limited":
             logger.error("Bingx create limit order rate limit exceeded")
             cache.set("Bingx_rate_limit_exceeded", True, timeout=310)
-            telegram_bot_sendtext(f"Bingx-{self.kyc} order rate limit exceeded")
+            alert(f"Bingx-{self.kyc} order rate limit exceeded")
 
         if res["code"] != 0:
             return None, res
 
         return res["data"]["orderId"], res
 
+    @retry(stop=stop.stop_after_attempt(2), wait=wait.wait_fixed(0.5))
+    def create_limit_order(self, side, price, quantity):
+        url = "/openApi/spot/v1/trade/order"
+        params = self.limit_order_params(side, price, quantity)
+        res = sign_request(
+            self.public_key, self.private_key, self.group, "POST", url, params
+        )
+        return self.parse_created_order(res)
+
+    @retry(stop=stop.stop_after_attempt(2), wait=wait.wait_fixed(0.5))
+    async def async_create_limit_order(self, side, price, quantity):
+        url = "/openApi/spot/v1/trade/order"
+        params = self.limit_order_params(side, price, quantity)
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "POST", url, params
+        )
+        return self.parse_created_order(res)
+
     def create_market_order(self, side, price, quantity):
         url = "/openApi/spot/v1/trade/order"
 
@@ -157,38 +182,14 @@ class BingXAPI:
 
         return res["data"]["orderId"], res
 
-    def fetch_order_status(self, order_id):
-        url = "/openApi/spot/v1/trade/query"
-        params = {"symbol": self.ticker, "orderId": order_id}
-        res = sign_request(
-            self.public_key, self.private_key, self.group, "GET", url, params
-        )
-        if res["code"] == 100410 and res["msg"] == "rate limited":
-            logger.error("Bingx order status rate limit exceeded")
-            cache.set("Bingx_rate_limit_exceeded", True, timeout=310)
-            keys = len(cache.keys("orderstatus_*"))
-            pending_keys = len(
-                [
-                    key
-                    for key in cache.keys("orderstatus_*")
-                    if cache.get(key)["result"] == "pending"
-                ]
-            )
-            telegram_bot_sendtext(
-                f"Bingx-{self.kyc} order status rate limit exceeded total keys: {keys} pending keys: {pending_keys}"
-            )
-            return 0, 0, res
-
-        if res["code"] != 0:
-            logger.error(f"Bingx get_order_status, error in response. {res}")
-            return 0, 0, res
-
-        res = res["data"]
+    def parse_order_status(self, order):
         try:
-            filled_price = float(res["cummulativeQuoteQty"]) / float(res["executedQty"])
+            filled_price = float(order["cummulativeQuoteQty"]) / float(
+                order["executedQty"]
+            )
         except ZeroDivisionError:
             filled_price = 0
-        filled_quantity = float(res["executedQty"])
+        filled_quantity = float(order["executedQty"])
 
         """
         Doğru fiyat cummulativeQuoteQty / executedQty
@@ -211,25 +212,62 @@ class BingXAPI:
             "clientOrderID": "",
         }
         """
+        return filled_price, filled_quantity
+
+    def parse_fetched_order_status(self, res):
+        if res["code"] == 100410 and res["msg"] == "rate limited":
+            logger.error("Bingx order status rate limit exceeded")
+            cache.set("Bingx_rate_limit_exceeded", True, timeout=310)
+            alert(
+                f"Bingx-{self.kyc} order status rate limit exceeded pending orders: {pending_count(self.kyc)}"
+            )
+            return 0, 0, res
+
+        if res["code"] != 0:
+            logger.error(f"Bingx get_order_status, error in response. {res}")
+            return 0, 0, res
+
+        res = res["data"]
+        filled_price, filled_quantity = self.parse_order_status(res)
         return filled_price, filled_quantity, res
 
-    @retry(
-        stop=stop.stop_after_attempt(35),
-        wait=wait.wait_fixed(0.3),
-    )
+    def fetch_order_status(self, order_id, ticker=None):
+        url = "/openApi/spot/v1/trade/query"
+        params = {"symbol": ticker or self.ticker, "orderId": order_id}
+        res = sign_request(
+            self.public_key, self.private_key, self.group, "GET", url, params
+        )
+        return self.parse_fetched_order_status(res)
+
+    async def async_fetch_order_status(self, order_id, ticker=None):
+        url = "/openApi/spot/v1/trade/query"
+        params = {"symbol": ticker or self.ticker, "orderId": order_id}
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "GET", url, params
+        )
+        return self.parse_fetched_order_status(res)
+
     def get_order_status(self, order_id):
-        key = f"orderstatus_{self.nominator}/{self.denominator}_{order_id}"
+        """Batched through the order status service of the account when it runs"""
+        result = request_order_status(self.kyc, self.ticker, order_id)
+        if result is None:
+            return self.fetch_order_status(order_id)
+        return result
 
-        cached_key = cache.get(key, None)
-        if cached_key and cached_key["result"] == "pending":
-            raise Exception("Order is still pending")
+    async def async_get_order_status(self, order_id):
+        """get_order_status, waiting for the service on a thread"""
+        result = await asyncio.get_running_loop().run_in_executor(
+            None, request_order_status, self.kyc, self.ticker, order_id
+        )
+        if result is None:
+            return await self.async_fetch_order_status(order_id)
+        return result
 
-        if cached_key and cached_key["result"] != "pending":
-            return cached_key["result"]
+    def parse_cancelled_order(self, res):
+        if res["code"] != 0:
+            return False, res
 
-        if cached_key is None:
-            cache.set(key, {"result": "pending"}, timeout=15)
-            raise Exception("Cached waiting for result")
+        return True, res
 
     def cancel_order(self, order_id):
         url = "/openApi/spot/v1/trade/cancel"
@@ -238,30 +276,32 @@ class BingXAPI:
         res = sign_request(
             self.public_key, self.private_key, self.group, "POST", url, params
         )
+        return self.parse_cancelled_order(res)
 
-        if res["code"] != 0:
-            return False, res
+    async def async_cancel_order(self, order_id):
+        url = "/openApi/spot/v1/trade/cancel"
 
-        return True, res
+        params = {"symbol": self.ticker, "orderId": order_id}
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "POST", url, params
+        )
+        return self.parse_cancelled_order(res)
 
     def get_account_balance_function(self):
-        key = f"Bingx_get_account_balance_{self.kyc}"
-        limit = 4
-        period = 1
-
-        if req_is_limited(key, limit, period):
-            logger.warning(
-                f"Bingx get account balance Rate limit exceeded trying again."
-            )
-            raise Exception("Bingx get account balance Rate limit exceeded")
-
         url = "/openApi/spot/v1/account/balance"
         res = sign_request(self.public_key, self.private_key, self.group, "GET", url)
         balances = res["data"]["balances"]
         return balances
 
-    def get_account_balance(self, coins=None):
-        _balances = self.get_account_balance_function()
+    async def async_get_account_balance_function(self):
+        url = "/openApi/spot/v1/account/balance"
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "GET", url
+        )
+        balances = res["data"]["balances"]
+        return balances
+
+    def parse_account_balance(self, _balances, coins=None):
         account_balance = {}
 
         for balance in _balances:
@@ -297,19 +337,16 @@ class BingXAPI:
 
         return result
 
+    def get_account_balance(self, coins=None):
+        _balances = self.get_account_balance_function()
+        return self.parse_account_balance(_balances, coins)
+
+    async def async_get_account_balance(self, coins=None):
+        _balances = await self.async_get_account_balance_function()
+        return self.parse_account_balance(_balances, coins)
+
     @retry(stop=stop.stop_after_attempt(5), wait=wait.wait_fixed(1))
     def cancel_open_orders(self):
-        # Check rate limit
-        key = f"Bingx_cancel_open_orders_{self.kyc}"
-        limit = 2
-        period = 1
-
-        if req_is_limited(key, limit, period):
-            logger.warning(
-                f"Bingx cancel open orders Rate limit exceeded trying again."
-            )
-            raise Exception("Bingx cancel open orders Rate limit exceeded")
-
         url = "/openApi/spot/v1/trade/cancelOpenOrders"
 
         params = {"symbol": self.ticker}
@@ -327,9 +364,16 @@ class BingXAPI:
 
         return res
 
-    def get_deposits(self):
-        url = "/openApi/api/v3/capital/deposit/hisrec"
-        res = sign_request(self.public_key, self.private_key, self.group, "GET", url)
+    def extend_ws_listen_key(self, listen_key):
+        url = "/openApi/user/auth/userDataStream"
+        params = {"listenKey": listen_key}
+        res = sign_request(
+            self.public_key, self.private_key, self.group, "PUT", url, params
+        )
+
+        return res
+
+    def parse_deposits(self, res):
         deposits = {}
         for deposit in res:
             coin = deposit["coin"]
@@ -344,11 +388,30 @@ class BingXAPI:
 
         return deposits
 
+    def get_deposits(self):
+        url = "/openApi/api/v3/capital/deposit/hisrec"
+        res = sign_request(self.public_key, self.private_key, self.group, "GET", url)
+        return self.parse_deposits(res)
+
+    async def async_get_deposits(self):
+        url = "/openApi/api/v3/capital/deposit/hisrec"
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "GET", url
+        )
+        return self.parse_deposits(res)
+
     def get_withdrawals(self):
         url = "/openApi/api/v3/capital/withdraw/history"
         res = sign_request(self.public_key, self.private_key, self.group, "GET", url)
         return res
 
+    async def async_get_withdrawals(self):
+        url = "/openApi/api/v3/capital/withdraw/history"
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "GET", url
+        )
+        return res
+
     def get_deposit_adresses(self, chain):
         url = "/openApi/wallets/v1/capital/deposit/address"
         params = {
@@ -381,3 +444,11 @@ class BingXAPI:
         url = "/openApi/spot/v1/trade/openOrders"
         res = sign_request(self.public_key, self.private_key, self.group, "GET", url)
         return res["data"]["orders"]
+
+    def get_order_history(self, ticker, start_time):
+        url = "/openApi/spot/v1/trade/historyOrders"
+        params = {"symbol": ticker, "startTime": start_time, "pageSize": 100}
+        res = sign_request(
+            self.public_key, self.private_key, self.group, "GET", url, params
+        )
+        return res["data"]["orders"]
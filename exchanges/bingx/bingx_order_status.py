@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import time
+import uuid
+from collections import defaultdict
+
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT = int(os.environ.get("BINGX_ORDER_STATUS_TIMEOUT", "5"))  # Seconds
+BATCH_WINDOW = 0.05  # Seconds to gather more order ids after a wake up
+HISTORY_WINDOW = 60 * 60  # Seconds of history searched before single queries
+ALIVE_TIMEOUT = 5
+ERROR_MIN_DELAY = 1  # Seconds before retrying after a Redis error, doubling
+ERROR_MAX_DELAY = 30
+
+
+def service_key(kyc, name):
+    return f"spread:bingx_order_status:{kyc}:{name}"
+
+
+def reply_key(kyc, request_id):
+    return service_key(kyc, f"reply:{request_id}")
+
+
+def request_order_id(request_id):
+    return request_id.rpartition(":")[0]
+
+
+def is_alive(redis, kyc):
+    return redis.exists(service_key(kyc, "alive"))
+
+
+def pending_count(kyc):
+    return get_redis_connection("default").hlen(service_key(kyc, "pending"))
+
+
+def request_order_status(kyc, ticker, order_id, timeout=TIMEOUT):
+    """(filled_price, filled_quantity, res) from the service of the account
+
+    None when the service is not running or did not answer in time, callers
+    then query the order themselves.
+    """
+    redis = get_redis_connection("default")
+    if not is_alive(redis, kyc):
+        return None
+
+    # Each request gets its own reply list, a late reply to an earlier request
+    # of the same order can never be taken for this one
+    request_id = f"{order_id}:{uuid.uuid4().hex}"
+    pipe = redis.pipeline()
+    pipe.hset(service_key(kyc, "pending"), request_id, ticker)
+    pipe.rpush(service_key(kyc, "wake"), request_id)
+    pipe.execute()
+
+    reply = redis.blpop(reply_key(kyc, request_id), timeout)
+    if reply is None:
+        return None
+    return tuple(json.loads(reply[1]))
+
+
+class BingXOrderStatusService:
+    """Resolves the order status requests of every bot on one BingX account
+
+    Callers leave request ids, the order id and a nonce, in a pending hash
+    and block on the reply list of the request. The service takes the whole
+    hash at once and answers it with one open orders call for the account
+    and one history call per symbol. Orders found in neither are queried one
+    by one.
+    """
+
+    def __init__(self, api):
+        self.api = api
+        self.kyc = api.kyc
+        self.redis = get_redis_connection("default")
+
+    def take_pending(self):
+        """{request_id: ticker} of the requests waiting for an answer"""
+        pipe = self.redis.pipeline()
+        pipe.hgetall(service_key(self.kyc, "pending"))
+        pipe.delete(service_key(self.kyc, "pending"), service_key(self.kyc, "wake"))
+        pending, _ = pipe.execute()
+        return {
+            request_id.decode(): ticker.decode()
+            for request_id, ticker in pending.items()
+        }
+
+    def resolve(self, pending):
+        results = {}
+        for order in self.api.get_open_orders():
+            order_id = str(order["orderId"])
+            if order_id in pending:
+                results[order_id] = self.api.parse_order_status(order) + (order,)
+
+        tickers = defaultdict(set)
+        for order_id, ticker in pending.items():
+            if order_id not in results:
+                tickers[ticker].add(order_id)
+
+        start_time = int((time.time() - HISTORY_WINDOW) * 1000)
+        for ticker, order_ids in tickers.items():
+            for order in self.api.get_order_history(ticker, start_time):
+                order_id = str(order["orderId"])
+                if order_id in order_ids:
+                    results[order_id] = self.api.parse_order_status(order) + (order,)
+
+        for order_id, ticker in pending.items():
+            if order_id not in results:
+                results[order_id] = self.api.fetch_order_status(order_id, ticker)
+
+        return results
+
+    def publish(self, requests, results):
+        pipe = self.redis.pipeline()
+        for request_id in requests:
+            result = results.get(request_order_id(request_id))
+            if result is None:
+                continue
+            key = reply_key(self.kyc, request_id)
+            pipe.rpush(key, json.dumps(result))
+            pipe.expire(key, TIMEOUT)
+        pipe.execute()
+
+    def serve(self):
+        """Answer one batch of requests, False when none came in"""
+        self.redis.set(service_key(self.kyc, "alive"), 1, ex=ALIVE_TIMEOUT)
+        if not self.redis.blpop(service_key(self.kyc, "wake"), 1):
+            return False
+
+        time.sleep(BATCH_WINDOW)
+        requests = self.take_pending()
+        if not requests:
+            return False
+
+        pending = {
+            request_order_id(request_id): ticker
+            for request_id, ticker in requests.items()
+        }
+        try:
+            results = self.resolve(pending)
+        except Exception as e:
+            logger.error(f"Bingx order status batch failed. {e}")
+            return True  # Callers time out and query the orders themselves
+
+        self.publish(requests, results)
+        return True
+
+    def run(self):
+        """Serve forever, a failing iteration is logged and retried with backoff"""
+        delay = ERROR_MIN_DELAY
+        while True:
+            try:
+                self.serve()
+                delay = ERROR_MIN_DELAY
+            except Exception:
+                logger.exception(
+                    f"Bingx order status service failed, retrying in {delay}s"
+                )
+                time.sleep(delay)
+                delay = min(delay * 2, ERROR_MAX_DELAY)
@@ -4,15 +4,42 @@ import json
 import traceback
 from uuid import uuid4
 import time
-import gzip
-import io
 
+from exchanges import decoding
+from exchanges.inflate import inflate_gzip
+from exchanges.ws_subscriptions import DepthSubscriptionMixin, from_ms
+from exchanges.ws_supervisor import supervise
+from exchanges.ws_orders import OrderStreamMixin
+from exchanges.ws_accounts import AccountStreamMixin
 from exchanges.bingx.utils import WS_HOST
 
 from exchanges.bingx.bingx_api_class import BingXAPI
 
+ORDER_TOPIC = "spot.executionReport"
+ACCOUNT_TOPIC = "ACCOUNT_UPDATE"
+
+
+def parse_depth(message):
+    """(topic, asks, bids, exchange time, None) of a depth frame or None
+
+    BingX sends the asks from the highest price, they are returned reversed.
+    """
+    data = message.get("data")
+    if not data or "asks" not in data:
+        return None
+    return (
+        message["dataType"],
+        data["asks"][::-1],
+        data["bids"],
+        from_ms(message.get("timestamp")),
+        None,
+    )
+
+
+class BingXWS(DepthSubscriptionMixin, OrderStreamMixin, AccountStreamMixin):
+    max_subscriptions = 100
+    subscriptions_per_message = 1
 
-class BingXWS:
     def __init__(
         self, ticker=None, public_key=None, private_key=None, group=None, kyc=None
     ):
@@ -23,98 +50,189 @@ class BingXWS:
         self.private_key = private_key
         self.group = group
         self.kyc = kyc
+        self.init_subscriptions(ticker)
+        self.init_order_stream()
 
-    async def on_message(self, message, depth=None, balance=None):
-        compressed_data = gzip.GzipFile(fileobj=io.BytesIO(message), mode="rb")
-        decompressed_data = compressed_data.read()
-        message = decompressed_data.decode("utf-8")
-        message = json.loads(message)
-        try:
-            if "data" in message and "asks" in message["data"]:
-                asks = message["data"]["asks"][::-1]
-                bids = message["data"]["bids"]
-                depth("BingX", asks, bids)
-        except:
-            print("Received message:", message)
+    def depth_topic(self, ticker):
+        return f"{ticker.split('/')[0]}-USDT@depth10"
 
-    async def connect_public_websocket(self, depth=None):
+    def subscription_message(self, topics, subscribe=True):
         ws_connect_id = str(uuid4()).replace("-", "")
-        params = json.dumps(
+        return json.dumps(
             {
                 "id": ws_connect_id,
-                "reqType": "sub",
-                "dataType": f"{self.tick}-USDT@depth10",
+                "reqType": "sub" if subscribe else "unsub",
+                "dataType": topics[0],
             }
         )
+
+    async def on_message(self, message, depth=None, balance=None):
+        message = decoding.loads(inflate_gzip(message))
         try:
-            async with websockets.connect(WS_HOST) as websocket:
-                await websocket.send(params)
-                while True:
-                    message = await websocket.recv()
-                    await self.on_message(message, depth=depth)
-        except (
-            websockets.exceptions.ConnectionClosed,
-            websockets.exceptions.InvalidHandshake,
-        ):
-
-            print("BingX Connection closed, restarting...")
-            await self.connect_public_websocket(depth=depth)
-
-    async def connect_private_websocket(self, listenKey, balance=None):
-        ws_connect_id = str(uuid4()).replace("-", "")
-        params = json.dumps(
-            {
-                "id": ws_connect_id,
-                "reqType": "sub",
-                "dataType": "ACCOUNT_UPDATE",
-            }
-        )
+            parsed = parse_depth(message)
+            if parsed and parsed[0] in self.topics:
+                topic, asks, bids, exchange_ts, seq = parsed
+                if self.in_sequence(topic, exchange_ts):
+                    depth(
+                        "BingX",
+                        asks,
+                        bids,
+                        ticker=self.topics[topic],
+                        exchange_ts=exchange_ts,
+                        seq=seq,
+                    )
+        except:
+            print("Received message:", message)
+
+    async def connect_public_websocket(self, depth=None):
+        async def session(health):
+            try:
+                async with websockets.connect(WS_HOST) as websocket:
+                    self.websocket = websocket
+                    await self.replay_subscriptions()
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_message(message, depth=depth)
+            finally:
+                self.websocket = None
+
+        await supervise("BingX depth stream", session)
+
+    async def on_account_message(self, message, balance, websocket):
+        message = inflate_gzip(message).decode("utf-8")
+        self.received()
+        if message == "Ping":
+            await websocket.send("Pong")
+            return
+
+        message = decoding.loads(message)
         try:
+            if message.get("id") == self.account_subscription_id:
+                if message["code"] == 0:
+                    self.account_subscribed()
+                else:
+                    print("Received message:", message)
+            elif (message.get("data") or message).get("e") == ACCOUNT_TOPIC:
+                data = message.get("data") or message
+                for asset in data["a"]["B"]:  # Wallet and available balances
+                    total = float(asset["wb"])
+                    frozen = float(asset.get("lk", 0))
+                    available = float(asset.get("cw", total - frozen))
+                    self.update_balance(asset["a"], available, total - available)
+                self.publish_balances("BingX", balance)
+        except:
+            print("Received message:", message)
+
+    async def connect_private_websocket(self, BingX, balance=None):
+        async def session(health):
+            listen_key = BingX.create_ws_listen_key()
+            self.account_subscription_id = str(uuid4()).replace("-", "")
+            params = json.dumps(
+                {
+                    "id": self.account_subscription_id,
+                    "reqType": "sub",
+                    "dataType": ACCOUNT_TOPIC,
+                }
+            )
             async with websockets.connect(
-                WS_HOST + f"?listenKey={listenKey}"
+                WS_HOST + f"?listenKey={listen_key}"
             ) as websocket:
-                await websocket.send(params)
-                while True:
-                    message = await websocket.recv()
-                    await self.on_message(message, balance=balance)
-        except (
-            websockets.exceptions.ConnectionClosed,
-            websockets.exceptions.InvalidHandshake,
-        ):
-
-            print("BingX Connection closed, restarting...")
-            await self.connect_private_websocket(balance=balance)
-
-    async def fetch_account_balance(self, balance):
-        BingX = BingXAPI(
-            self.ticker, self.public_key, self.private_key, self.group, self.kyc
-        )
+                keepalive = asyncio.create_task(
+                    self.keepalive(
+                        "BingX",
+                        websocket,
+                        extend=lambda: BingX.extend_ws_listen_key(listen_key),
+                    )
+                )  # BingX pings us every few seconds
+                try:
+                    await websocket.send(params)
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_account_message(message, balance, websocket)
+                finally:
+                    keepalive.cancel()
 
-        while True:
-            try:
-                self.account_balance = BingX.get_account_balance()
-                balance("BingX", self.kyc, self.account_balance)
-                await asyncio.sleep(0.5)
-            except:
-                await asyncio.sleep(3)
+        await supervise("BingX account stream", session)
 
-    async def main(self, depth=None, balance=None):
-        if depth:
-            tasks = [
-                self.connect_public_websocket(depth),
-            ]
+    async def on_order_message(self, message, order, websocket):
+        message = inflate_gzip(message).decode("utf-8")
+        self.received()
+        if message == "Ping":
+            await websocket.send("Pong")
+            return
+
+        message = decoding.loads(message)
+        try:
+            if message.get("id") == self.order_subscription_id:
+                if message["code"] == 0:
+                    self.order_subscribed()
+                else:
+                    print("Received message:", message)
+            elif message.get("dataType") == ORDER_TOPIC:
+                data = message["data"]
+                fill = self.order_fill(data["i"], data["z"], data["Z"], data["X"])
+                order("BingX", self.kyc, self.connected_at, [fill])
+        except:
+            print("Received message:", message)
 
-        # if balance:
-        #     BingX = BingXAPI(self.ticker, self.public_key, self.private_key, self.group)
-        #     listenKey = BingX.create_ws_listen_key()
-        #     self.account_balance = BingX.get_account_balance()
+    async def connect_order_websocket(self, order):
+        async def session(health):
+            BingX = BingXAPI(
+                self.ticker, self.public_key, self.private_key, self.group, self.kyc
+            )
+            listen_key = BingX.create_ws_listen_key()
+            self.order_subscription_id = str(uuid4()).replace("-", "")
+            params = json.dumps(
+                {
+                    "id": self.order_subscription_id,
+                    "reqType": "sub",
+                    "dataType": ORDER_TOPIC,
+                }
+            )
+            self.init_order_stream()
+            async with websockets.connect(
+                WS_HOST + f"?listenKey={listen_key}"
+            ) as websocket:
+                heartbeat = asyncio.create_task(
+                    self.order_heartbeat(
+                        "BingX",
+                        websocket,
+                        order,
+                        extend=lambda: BingX.extend_ws_listen_key(listen_key),
+                    )
+                )  # BingX pings us every few seconds
+                try:
+                    await websocket.send(params)
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_order_message(message, order, websocket)
+                finally:
+                    heartbeat.cancel()
 
-        #     tasks = [
-        #         self.connect_private_websocket(listenKey, balance),
-        #     ]
+        await supervise("BingX order stream", session)
+
+    async def main(self, depth=None, balance=None, order=None):
+        tasks = []
+        if depth:
+            tasks.append(self.connect_public_websocket(depth))
 
         if balance:
-            tasks = [
-                self.fetch_account_balance(balance),
-            ]
+            BingX = BingXAPI(
+                self.ticker, self.public_key, self.private_key, self.group, self.kyc
+            )
+            self.init_account_stream()
+            tasks.extend(
+                [
+                    self.connect_private_websocket(BingX, balance),
+                    self.reconcile_balances("BingX", BingX, balance),
+                ]
+            )
+
+        if order:
+            tasks.append(self.connect_order_websocket(order))
+        if not tasks:
+            raise ValueError("Pass depth, balance or order to start a stream")
         await asyncio.gather(*tasks)
@@ -1,4 +1,4 @@
-import requests
+from exchanges import aio, sessions
 import json
 import hmac
 from hashlib import sha256
@@ -8,6 +8,7 @@ import random
 from exchanges.utils import proxies
 
 HOST = "https://open-api.bingx.com"
+EXCHANGE = "BingX"  # Rate limit buckets
 WS_HOST = "wss://open-api-ws.bingx.com/market"
 
 
@@ -27,7 +28,7 @@ def parseParam(paramsMap):
         return paramsStr + "timestamp=" + str(int(time.time() * 1000))
 
 
-def sign_request(public_key, private_key, group, method, url, params={}):
+def prepare_sign_request(public_key, private_key, group, method, url, params={}):
     params_str = parseParam(params)
     url = "%s%s?%s&signature=%s" % (
         HOST,
@@ -39,23 +40,48 @@ def sign_request(public_key, private_key, group, method, url, params={}):
     headers = {
         "X-BX-APIKEY": public_key,
     }
+    return url, {"headers": headers}
+
 
-    res = requests.request(
+def sign_request(public_key, private_key, group, method, url, params={}):
+    url, kwargs = prepare_sign_request(
+        public_key, private_key, group, method, url, params
+    )
+    res = sessions.request(
         method,
         url,
-        headers=headers,
+        rate_limit=(EXCHANGE, public_key),
+        **kwargs,
         # proxies=random.choice([random.choice(proxies), None]),
     )
     return parse_response(res)
 
 
+async def async_sign_request(public_key, private_key, group, method, url, params={}):
+    url, kwargs = prepare_sign_request(
+        public_key, private_key, group, method, url, params
+    )
+    res = await aio.request(method, url, rate_limit=(EXCHANGE, public_key), **kwargs)
+    return parse_response(res)
+
+
 def request(method, url, params=None):
     url = "{}{}".format(HOST, url)
     if not params:
         params = {}
 
     params["timestamp"] = int(time.time() * 1000)
-    res = requests.request(method, url, params=params)
+    res = sessions.request(method, url, params=params, rate_limit=(EXCHANGE, None))
+    return parse_response(res)
+
+
+async def async_request(method, url, params=None):
+    url = "{}{}".format(HOST, url)
+    if not params:
+        params = {}
+
+    params["timestamp"] = int(time.time() * 1000)
+    res = await aio.request(method, url, params=params, rate_limit=(EXCHANGE, None))
     return parse_response(res)
 
 
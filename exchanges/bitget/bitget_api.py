@@ -1,10 +1,7 @@
-from .utils import request
+from .utils import request, async_request
 
 
-def get_tickers():
-    url = "/api/v2/spot/market/tickers"
-    res = request("GET", url)
-
+def parse_tickers(res):
     tickers = {}
 
     denominator = "USDT"
@@ -23,11 +20,19 @@ def get_tickers():
     return tickers
 
 
-def get_depth(ticker):
-    url = "/api/v2/spot/market/orderbook"
+def get_tickers():
+    url = "/api/v2/spot/market/tickers"
+    res = request("GET", url)
+    return parse_tickers(res)
 
-    params = {"symbol": ticker, "limit": 20}
-    res = request("GET", url, params=params)
+
+async def async_get_tickers():
+    url = "/api/v2/spot/market/tickers"
+    res = await async_request("GET", url)
+    return parse_tickers(res)
+
+
+def parse_depth(res):
     res = res["data"]
     asks = res["asks"]
     bids = res["bids"]
@@ -35,10 +40,38 @@ def get_depth(ticker):
     return asks, bids
 
 
+def get_depth(ticker):
+    url = "/api/v2/spot/market/orderbook"
+
+    params = {"symbol": ticker, "limit": 20}
+    res = request("GET", url, params=params)
+    return parse_depth(res)
+
+
+async def async_get_depth(ticker):
+    url = "/api/v2/spot/market/orderbook"
+
+    params = {"symbol": ticker, "limit": 20}
+    res = await async_request("GET", url, params=params)
+    return parse_depth(res)
+
+
+def parse_product_details(res):
+    res = res["data"][0]
+    return res
+
+
 def get_product_details(ticker):
     url = "/api/v2/spot/public/symbols"
 
     params = {"symbol": ticker}
     res = request("GET", url, params=params)
-    res = res["data"][0]
-    return res
+    return parse_product_details(res)
+
+
+async def async_get_product_details(ticker):
+    url = "/api/v2/spot/public/symbols"
+
+    params = {"symbol": ticker}
+    res = await async_request("GET", url, params=params)
+    return parse_product_details(res)
@@ -1,8 +1,14 @@
 import logging
 import time
 
-from .bitget_api import get_tickers, get_depth, get_product_details
-from .utils import sign_request, request
+from .bitget_api import (
+    get_tickers,
+    get_depth,
+    get_product_details,
+    async_get_tickers,
+    async_get_depth,
+)
+from .utils import sign_request, request, async_sign_request, async_request
 
 logger = logging.getLogger(__name__)
 
@@ -25,10 +31,18 @@ class BitgetAPI:
         tickers = get_tickers()
         return tickers
 
+    async def async_get_tickers(self):
+        tickers = await async_get_tickers()
+        return tickers
+
     def get_depth(self):
         asks, bids = get_depth(self.ticker)
         return asks, bids
 
+    async def async_get_depth(self):
+        asks, bids = await async_get_depth(self.ticker)
+        return asks, bids
+
     def get_product_details(self):
         product_details = get_product_details(self.ticker)
         price_precision = float(product_details["pricePrecision"])
@@ -37,10 +51,7 @@ class BitgetAPI:
         quantity_precision = 1 / 10**quantity_precision
         return price_precision, quantity_precision
 
-    def get_asset_details(self):
-        url = "/api/v2/spot/public/coins"
-
-        res = request("GET", url)
+    def parse_asset_details(self, res):
         res = res["data"]
         details = {}
 
@@ -66,10 +77,20 @@ class BitgetAPI:
 
         return details
 
-    def create_limit_order(self, side, price, quantity):
-        url = "/api/v2/spot/trade/place-order"
+    def get_asset_details(self):
+        url = "/api/v2/spot/public/coins"
 
-        params = {
+        res = request("GET", url)
+        return self.parse_asset_details(res)
+
+    async def async_get_asset_details(self):
+        url = "/api/v2/spot/public/coins"
+
+        res = await async_request("GET", url)
+        return self.parse_asset_details(res)
+
+    def limit_order_params(self, side, price, quantity):
+        return {
             "symbol": self.ticker,
             "side": "Buy" if side == "buy" else "Sell",
             "orderType": "limit",
@@ -77,17 +98,35 @@ class BitgetAPI:
             "price": str(price),
             "size": str(quantity),
         }
-        res = sign_request(
-            self.public_key, self.private_key, self.group, "POST", url, params
-        )
+
+    def parse_created_order(self, res):
         if res["code"] != "00000":
             return None, res
 
         return res["data"]["orderId"], res
 
+    def create_limit_order(self, side, price, quantity):
+        url = "/api/v2/spot/trade/place-order"
+        params = self.limit_order_params(side, price, quantity)
+        res = sign_request(
+            self.public_key, self.private_key, self.group, "POST", url, params
+        )
+        return self.parse_created_order(res)
+
+    async def async_create_limit_order(self, side, price, quantity):
+        url = "/api/v2/spot/trade/place-order"
+        params = self.limit_order_params(side, price, quantity)
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "POST", url, params
+        )
+        return self.parse_created_order(res)
+
     def create_market_order(self, side, price, quantity):
         pass
 
+    def parse_order_status(self, order):
+        return float(order["priceAvg"]), float(order["baseVolume"])
+
     def get_order_status(self, order_id):
         url = "/api/v2/spot/trade/orderInfo"
 
@@ -100,10 +139,27 @@ class BitgetAPI:
             logger.error(f"Bitget order status failed for order_id: {order_id}")
 
         res = res["data"][0]
-        filled_price = float(res["priceAvg"])
-        filled_quantity = float(res["baseVolume"])
+        return self.parse_order_status(res) + (res,)
 
-        return filled_price, filled_quantity, res
+    async def async_get_order_status(self, order_id):
+        url = "/api/v2/spot/trade/orderInfo"
+
+        params = {"orderId": order_id}
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "GET", url, params
+        )
+
+        if res["code"] != "00000":
+            logger.error(f"Bitget order status failed for order_id: {order_id}")
+
+        res = res["data"][0]
+        return self.parse_order_status(res) + (res,)
+
+    def parse_cancelled_order(self, res):
+        if res["code"] != "00000":
+            return False, res
+
+        return True, res
 
     def cancel_order(self, order_id):
         url = "/api/v2/spot/trade/cancel-order"
@@ -112,11 +168,16 @@ class BitgetAPI:
         res = sign_request(
             self.public_key, self.private_key, self.group, "POST", url, params
         )
+        return self.parse_cancelled_order(res)
 
-        if res["code"] != "00000":
-            return False, res
+    async def async_cancel_order(self, order_id):
+        url = "/api/v2/spot/trade/cancel-order"
 
-        return True, res
+        params = {"symbol": self.ticker, "orderId": order_id}
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "POST", url, params
+        )
+        return self.parse_cancelled_order(res)
 
     def get_account_balance_function(self):
         url = "/api/v2/spot/account/assets"
@@ -124,8 +185,15 @@ class BitgetAPI:
         balances = res["data"]
         return balances
 
-    def get_account_balance(self, coins=None):
-        _balances = self.get_account_balance_function()
+    async def async_get_account_balance_function(self):
+        url = "/api/v2/spot/account/assets"
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "GET", url
+        )
+        balances = res["data"]
+        return balances
+
+    def parse_account_balance(self, _balances, coins=None):
         account_balance = {}
 
         for balance in _balances:
@@ -161,6 +229,14 @@ class BitgetAPI:
 
         return result
 
+    def get_account_balance(self, coins=None):
+        _balances = self.get_account_balance_function()
+        return self.parse_account_balance(_balances, coins)
+
+    async def async_get_account_balance(self, coins=None):
+        _balances = await self.async_get_account_balance_function()
+        return self.parse_account_balance(_balances, coins)
+
     def cancel_open_orders(self):
         url = "/api/v2/spot/trade/cancel-symbol-order"
 
@@ -171,15 +247,7 @@ class BitgetAPI:
 
         return res
 
-    def get_deposits(self):
-        url = "/api/v2/spot/wallet/deposit-records"
-        # From 1 week ago to now
-        start_time = (int(time.time()) - 604800) * 1000
-        end_time = int(time.time()) * 1000
-        params = {"limit": 100, "startTime": start_time, "endTime": end_time}
-        res = sign_request(
-            self.public_key, self.private_key, self.group, "GET", url, params
-        )
+    def parse_deposits(self, res):
         res = res["data"]
         deposits = {}
         for deposit in res:
@@ -195,6 +263,28 @@ class BitgetAPI:
 
         return deposits
 
+    def get_deposits(self):
+        url = "/api/v2/spot/wallet/deposit-records"
+        # From 1 week ago to now
+        start_time = (int(time.time()) - 604800) * 1000
+        end_time = int(time.time()) * 1000
+        params = {"limit": 100, "startTime": start_time, "endTime": end_time}
+        res = sign_request(
+            self.public_key, self.private_key, self.group, "GET", url, params
+        )
+        return self.parse_deposits(res)
+
+    async def async_get_deposits(self):
+        url = "/api/v2/spot/wallet/deposit-records"
+        # From 1 week ago to now
+        start_time = (int(time.time()) - 604800) * 1000
+        end_time = int(time.time()) * 1000
+        params = {"limit": 100, "startTime": start_time, "endTime": end_time}
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "GET", url, params
+        )
+        return self.parse_deposits(res)
+
     def get_deposit_adresses(self, chain):
         url = "/api/v2/spot/wallet/deposit-address"
         params = {"coin": self.nominator, "chain": chain}
@@ -2,12 +2,52 @@ import asyncio
 import websockets
 import json
 import traceback
+import zlib
 
-from .utils import WS_HOST
+from exchanges import decoding
+from exchanges.ws_subscriptions import DepthSubscriptionMixin, from_ms
+from exchanges.ws_supervisor import supervise
+from exchanges.ws_accounts import AccountStreamMixin
+from exchanges.ws_orders import OrderStreamMixin
+
+from .utils import WS_HOST, WS_PRIVATE_HOST, ws_login_params
 from .bitget_api_class import BitgetAPI
 
+ORDER_ARGS = {"instType": "SPOT", "channel": "orders", "instId": "default"}
+ACCOUNT_ARGS = {"instType": "SPOT", "channel": "account", "coin": "default"}
+
+
+def parse_depth(message):
+    """(topic, asks, bids, exchange time, seq, checksum) of a depth frame or None"""
+    if "data" not in message:
+        return None
+    data = message["data"][0]
+    return (
+        message["arg"]["instId"],
+        data["asks"],
+        data["bids"],
+        from_ms(data.get("ts")),
+        data.get("seq"),
+        data.get("checksum"),
+    )
+
+
+def book_checksum(asks, bids):
+    """Signed CRC32 of the top 25 levels, bids and asks interleaved"""
+    parts = []
+    for i in range(25):
+        if i < len(bids):
+            parts.extend(bids[i][:2])
+        if i < len(asks):
+            parts.extend(asks[i][:2])
+    checksum = zlib.crc32(":".join(parts).encode())
+    return checksum - (1 << 32) if checksum >= 1 << 31 else checksum
+
+
+class BitgetWS(DepthSubscriptionMixin, OrderStreamMixin, AccountStreamMixin):
+    max_subscriptions = 50
+    subscriptions_per_message = 50
 
-class BitgetWS:
     def __init__(
         self, ticker=None, public_key=None, private_key=None, group=None, kyc=None
     ):
@@ -20,88 +60,194 @@ class BitgetWS:
         self.kyc = kyc
         self.keep_alive_interval = 25  # Interval for sending ping messages
         self.keep_alive_timeout = 30  # Timeout for receiving pong responses
+        self.init_subscriptions(ticker)
+        self.init_order_stream()
+
+    def depth_topic(self, ticker):
+        return f"{ticker.split('/')[0]}USDT"
+
+    def subscription_message(self, topics, subscribe=True):
+        args = [
+            {"instType": "SPOT", "channel": "books5", "instId": topic}
+            for topic in topics
+        ]
+        op = "subscribe" if subscribe else "unsubscribe"
+        return json.dumps({"op": op, "args": args})
 
     async def on_message(self, message, depth=None, balance=None):
         if message == "pong":
             self.last_pong_received = asyncio.get_event_loop().time()
 
         else:
-            message = json.loads(message)
+            message = decoding.loads(message)
             try:
-                if "data" in message:
-                    asks = message["data"][0]["asks"]
-                    bids = message["data"][0]["bids"]
-                    depth("Bitget", asks, bids)
+                parsed = parse_depth(message)
+                if parsed and parsed[0] in self.topics:
+                    topic, asks, bids, exchange_ts, seq, checksum = parsed
+                    if checksum and checksum != book_checksum(asks, bids):
+                        await self.resync(topic)
+                    elif self.in_sequence(topic, seq or exchange_ts):
+                        depth(
+                            "Bitget",
+                            asks,
+                            bids,
+                            ticker=self.topics[topic],
+                            exchange_ts=exchange_ts,
+                            seq=seq,
+                        )
             except:
                 print("Received message:", message)
 
     async def send_keep_alive(self, websocket):
-        while True:
-            try:
+        """Ping until the connection closes, close it when pongs stop"""
+        try:
+            while True:
                 await websocket.send("ping")  # Send ping message
                 await asyncio.sleep(self.keep_alive_interval)  # Wait for the interval
                 if (
-                    self.last_pong_received is None
-                    or (asyncio.get_event_loop().time() - self.last_pong_received)
+                    asyncio.get_event_loop().time() - self.last_pong_received
                     > self.keep_alive_timeout
                 ):
                     print("Pong response not received within timeout")
-                    raise ValueError("Pong response not received within timeout")
-            except Exception as e:
-                print(f"Error sending ping: {e}")
-                break
+                    await websocket.close()
+                    return
+        except websockets.exceptions.ConnectionClosed:
+            pass
 
     async def connect_public_websocket(self, depth=None):
-        params = json.dumps(
-            {
-                "op": "subscribe",
-                "args": [
-                    {
-                        "instType": "SPOT",
-                        "channel": "books5",
-                        "instId": f"{self.tick}USDT",
-                    }
-                ],
-            }
-        )
-        try:
-            async with websockets.connect(WS_HOST) as websocket:
-                await websocket.send(params)
-
-                keep_alive_task = asyncio.create_task(self.send_keep_alive(websocket))
-
-                while True:
-                    message = await websocket.recv()
-                    await self.on_message(message, depth=depth)
-        except (
-            websockets.exceptions.ConnectionClosed,
-            websockets.exceptions.InvalidHandshake,
-            Exception,
-        ) as e:
-            print("Bitget Connection closed, restarting...")
-            await self.connect_public_websocket(depth=depth)
-
-    async def fetch_account_balance(self, balance):
-        Bitget = BitgetAPI(
-            self.ticker, self.public_key, self.private_key, self.group, self.kyc
-        )
-
-        while True:
+        async def session(health):
             try:
-                self.account_balance = Bitget.get_account_balance()
-                balance("Bitget", self.kyc, self.account_balance)
-                await asyncio.sleep(0.5)
-            except:
-                await asyncio.sleep(3)
+                async with websockets.connect(WS_HOST) as websocket:
+                    self.websocket = websocket
+                    self.last_pong_received = asyncio.get_event_loop().time()
+                    keepalive = asyncio.create_task(self.send_keep_alive(websocket))
+                    try:
+                        await self.replay_subscriptions()
+                        while True:
+                            message = await websocket.recv()
+                            health.received()
+                            await self.on_message(message, depth=depth)
+                    finally:
+                        keepalive.cancel()
+            finally:
+                self.websocket = None
+
+        await supervise("Bitget depth stream", session)
 
-    async def main(self, depth=None, balance=None):
+    async def on_order_message(self, message, order, websocket):
+        self.received()
+        if message == "pong":
+            return
+
+        message = decoding.loads(message)
+        try:
+            if message.get("event") == "login":
+                if message["code"] == 0:
+                    await websocket.send(
+                        json.dumps({"op": "subscribe", "args": [ORDER_ARGS]})
+                    )
+                else:
+                    print("Received message:", message)
+            elif message.get("event") == "subscribe":
+                self.order_subscribed()
+            elif "data" in message and message["arg"]["channel"] == "orders":
+                fills = [
+                    self.order_fill(
+                        data["orderId"],
+                        data["accBaseVolume"],
+                        float(data["accBaseVolume"] or 0)
+                        * float(data["priceAvg"] or 0),
+                        data["status"],
+                    )
+                    for data in message["data"]
+                ]
+                order("Bitget", self.kyc, self.connected_at, fills)
+        except:
+            print("Received message:", message)
+
+    async def connect_order_websocket(self, order):
+        async def session(health):
+            self.init_order_stream()
+            async with websockets.connect(WS_PRIVATE_HOST) as websocket:
+                heartbeat = asyncio.create_task(
+                    self.order_heartbeat("Bitget", websocket, order, ping="ping")
+                )
+                try:
+                    await websocket.send(
+                        ws_login_params(self.public_key, self.private_key, self.group)
+                    )
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_order_message(message, order, websocket)
+                finally:
+                    heartbeat.cancel()
+
+        await supervise("Bitget order stream", session)
+
+    async def on_account_message(self, message, balance, websocket):
+        self.received()
+        if message == "pong":
+            return
+
+        message = decoding.loads(message)
+        try:
+            if message.get("event") == "login":
+                if message["code"] == 0:
+                    await websocket.send(
+                        json.dumps({"op": "subscribe", "args": [ACCOUNT_ARGS]})
+                    )
+                else:
+                    print("Received message:", message)
+            elif message.get("event") == "subscribe":
+                self.account_subscribed()
+            elif "data" in message and message["arg"]["channel"] == "account":
+                for asset in message["data"]:
+                    frozen = float(asset["frozen"] or 0)
+                    frozen += float(asset.get("locked") or 0)
+                    self.update_balance(asset["coin"], asset["available"], frozen)
+                self.publish_balances("Bitget", balance)
+        except:
+            print("Received message:", message)
+
+    async def connect_private_websocket(self, Bitget, balance=None):
+        async def session(health):
+            async with websockets.connect(WS_PRIVATE_HOST) as websocket:
+                keepalive = asyncio.create_task(
+                    self.keepalive("Bitget", websocket, ping="ping")
+                )
+                try:
+                    await websocket.send(
+                        ws_login_params(self.public_key, self.private_key, self.group)
+                    )
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_account_message(message, balance, websocket)
+                finally:
+                    keepalive.cancel()
+
+        await supervise("Bitget account stream", session)
+
+    async def main(self, depth=None, balance=None, order=None):
+        tasks = []
         if depth:
-            tasks = [
-                self.connect_public_websocket(depth),
-            ]
+            tasks.append(self.connect_public_websocket(depth))
 
         if balance:
-            tasks = [
-                self.fetch_account_balance(balance),
-            ]
+            Bitget = BitgetAPI(
+                self.ticker, self.public_key, self.private_key, self.group, self.kyc
+            )
+            self.init_account_stream()
+            tasks.extend(
+                [
+                    self.connect_private_websocket(Bitget, balance),
+                    self.reconcile_balances("Bitget", Bitget, balance),
+                ]
+            )
+
+        if order:
+            tasks.append(self.connect_order_websocket(order))
+        if not tasks:
+            raise ValueError("Pass depth, balance or order to start a stream")
         await asyncio.gather(*tasks)
@@ -1,11 +1,13 @@
-import requests
+from exchanges import aio, sessions
 import hmac
 import base64
 import time
 import json
 
 HOST = "https://api.bitget.com"
+EXCHANGE = "Bitget"  # Rate limit buckets
 WS_HOST = "wss://ws.bitget.com/v2/ws/public"
+WS_PRIVATE_HOST = "wss://ws.bitget.com/v2/ws/private"
 
 
 def get_timestamp():
@@ -22,6 +24,18 @@ def sign(message, secret_key):
     return base64.b64encode(d)
 
 
+def ws_login_params(public_key, private_key, group):
+    timestamp = str(int(time.time()))
+    signature = sign(pre_hash(timestamp, "GET", "/user/verify", ""), private_key)
+    args = {
+        "apiKey": public_key,
+        "passphrase": group,
+        "timestamp": timestamp,
+        "sign": signature.decode(),
+    }
+    return json.dumps({"op": "login", "args": [args]})
+
+
 def pre_hash(timestamp, method, request_path, body):
     return str(timestamp) + str.upper(method) + request_path + body
 
@@ -42,7 +56,7 @@ def toQueryWithNoEncode(params):
     return url[0:-1]
 
 
-def sign_request(public_key, private_key, group, method, path, params={}):
+def prepare_sign_request(public_key, private_key, group, method, path, params={}):
     url = "{}{}".format(HOST, path)
     timestamp = get_timestamp()
 
@@ -67,16 +81,36 @@ def sign_request(public_key, private_key, group, method, path, params={}):
     }
 
     if method == "GET":
-        res = requests.request(method, HOST + request_path, headers=headers)
+        return HOST + request_path, {"headers": headers}
     elif method == "POST":
-        res = requests.request(method, url, data=body, headers=headers)
+        return url, {"data": body, "headers": headers}
 
+
+def sign_request(public_key, private_key, group, method, path, params={}):
+    url, kwargs = prepare_sign_request(
+        public_key, private_key, group, method, path, params
+    )
+    res = sessions.request(method, url, rate_limit=(EXCHANGE, public_key), **kwargs)
+    return parse_response(res)
+
+
+async def async_sign_request(public_key, private_key, group, method, path, params={}):
+    url, kwargs = prepare_sign_request(
+        public_key, private_key, group, method, path, params
+    )
+    res = await aio.request(method, url, rate_limit=(EXCHANGE, public_key), **kwargs)
     return parse_response(res)
 
 
 def request(method, url, params=None):
     url = "{}{}".format(HOST, url)
-    res = requests.request(method, url, params=params)
+    res = sessions.request(method, url, params=params, rate_limit=(EXCHANGE, None))
+    return parse_response(res)
+
+
+async def async_request(method, url, params=None):
+    url = "{}{}".format(HOST, url)
+    res = await aio.request(method, url, params=params, rate_limit=(EXCHANGE, None))
     return parse_response(res)
 
 
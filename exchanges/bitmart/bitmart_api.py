@@ -1,17 +1,26 @@
-from .utils import request
+from .utils import request, async_request
+
+
+def parse_bitmart_product_details(res, ticker):
+    res = [coin for coin in res["data"]["symbols"] if coin["symbol"] == ticker][0]
+    return res
 
 
 def get_bitmart_product_details(ticker):
     url = "/spot/v1/symbols/details"
 
     res = request("GET", url)
-    res = [coin for coin in res["data"]["symbols"] if coin["symbol"] == ticker][0]
-    return res
+    return parse_bitmart_product_details(res, ticker)
 
 
-def get_bitmart_tickers():
-    url = "/spot/quotation/v3/tickers"
-    res = request("GET", url)
+async def async_get_bitmart_product_details(ticker):
+    url = "/spot/v1/symbols/details"
+
+    res = await async_request("GET", url)
+    return parse_bitmart_product_details(res, ticker)
+
+
+def parse_bitmart_tickers(res):
     res = res["data"]
 
     tickers = {}
@@ -32,12 +41,36 @@ def get_bitmart_tickers():
     return tickers
 
 
+def get_bitmart_tickers():
+    url = "/spot/quotation/v3/tickers"
+    res = request("GET", url)
+    return parse_bitmart_tickers(res)
+
+
+async def async_get_bitmart_tickers():
+    url = "/spot/quotation/v3/tickers"
+    res = await async_request("GET", url)
+    return parse_bitmart_tickers(res)
+
+
+def parse_bitmart_depth(res):
+    asks = res["data"]["asks"]
+    bids = res["data"]["bids"]
+
+    return asks, bids
+
+
 def get_bitmart_depth(ticker):
     url = "/spot/quotation/v3/books"
 
     params = {"symbol": ticker}
     res = request("GET", url, params=params)
-    asks = res["data"]["asks"]
-    bids = res["data"]["bids"]
+    return parse_bitmart_depth(res)
 
-    return asks, bids
+
+async def async_get_bitmart_depth(ticker):
+    url = "/spot/quotation/v3/books"
+
+    params = {"symbol": ticker}
+    res = await async_request("GET", url, params=params)
+    return parse_bitmart_depth(res)
@@ -1,11 +1,13 @@
 from tenacity import retry, stop, wait
 import logging
 
-from .utils import sign_request, request
+from .utils import sign_request, request, async_sign_request, async_request
 from .bitmart_api import (
     get_bitmart_tickers,
     get_bitmart_depth,
     get_bitmart_product_details,
+    async_get_bitmart_tickers,
+    async_get_bitmart_depth,
 )
 
 logger = logging.getLogger(__name__)
@@ -29,10 +31,18 @@ class BitmartAPI:
         tickers = get_bitmart_tickers()
         return tickers
 
+    async def async_get_tickers(self):
+        tickers = await async_get_bitmart_tickers()
+        return tickers
+
     def get_depth(self):
         asks, bids = get_bitmart_depth(self.ticker)
         return asks, bids
 
+    async def async_get_depth(self):
+        asks, bids = await async_get_bitmart_depth(self.ticker)
+        return asks, bids
+
     @retry(stop=stop.stop_after_attempt(20), wait=wait.wait_fixed(2))
     def get_product_details(self):
         product_details = get_bitmart_product_details(self.ticker)
@@ -42,10 +52,7 @@ class BitmartAPI:
         quantity_precision = float(quantity_precision)
         return price_precision, quantity_precision
 
-    def get_asset_details(self):
-        url = "/spot/v1/currencies"
-
-        res = request("GET", url)
+    def parse_asset_details(self, res):
         res = res["data"]["currencies"]
 
         details = {}
@@ -68,14 +75,33 @@ class BitmartAPI:
 
         return details
 
+    def get_asset_details(self):
+        url = "/spot/v1/currencies"
+
+        res = request("GET", url)
+        return self.parse_asset_details(res)
+
+    async def async_get_asset_details(self):
+        url = "/spot/v1/currencies"
+
+        res = await async_request("GET", url)
+        return self.parse_asset_details(res)
+
     def get_account_balance_function(self):
         url = "/spot/v1/wallet"
         res = sign_request(self.public_key, self.private_key, self.group, "GET", url)
         balances = res["data"]["wallet"]
         return balances
 
-    def get_account_balance(self, coins=None):
-        _balances = self.get_account_balance_function()
+    async def async_get_account_balance_function(self):
+        url = "/spot/v1/wallet"
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "GET", url
+        )
+        balances = res["data"]["wallet"]
+        return balances
+
+    def parse_account_balance(self, _balances, coins=None):
         account_balance = {}
 
         for balance in _balances:
@@ -111,24 +137,45 @@ class BitmartAPI:
 
         return result
 
-    def create_limit_order(self, side, price, quantity):
-        url = "/spot/v2/submit_order"
+    def get_account_balance(self, coins=None):
+        _balances = self.get_account_balance_function()
+        return self.parse_account_balance(_balances, coins)
 
-        params = {
+    async def async_get_account_balance(self, coins=None):
+        _balances = await self.async_get_account_balance_function()
+        return self.parse_account_balance(_balances, coins)
+
+    def limit_order_params(self, side, price, quantity):
+        return {
             "symbol": self.ticker,
             "side": "buy" if side == "buy" else "sell",
             "type": "limit",
             "price": price,
             "size": quantity,
         }
-        res = sign_request(
-            self.public_key, self.private_key, self.group, "POST", url, params
-        )
+
+    def parse_created_order(self, res):
         if res["code"] != 1000:
             return None, res
 
         return res["data"]["order_id"], res
 
+    def create_limit_order(self, side, price, quantity):
+        url = "/spot/v2/submit_order"
+        params = self.limit_order_params(side, price, quantity)
+        res = sign_request(
+            self.public_key, self.private_key, self.group, "POST", url, params
+        )
+        return self.parse_created_order(res)
+
+    async def async_create_limit_order(self, side, price, quantity):
+        url = "/spot/v2/submit_order"
+        params = self.limit_order_params(side, price, quantity)
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "POST", url, params
+        )
+        return self.parse_created_order(res)
+
     def create_market_order(self, side, price, quantity):
         url = "/spot/v2/submit_order"
 
@@ -150,16 +197,9 @@ class BitmartAPI:
 
         return res["data"]["order_id"], res
 
-    def get_order_status(self, order_id):
-        url = "/spot/v4/query/order"
-
-        params = {"orderId": order_id}
-        res = sign_request(
-            self.public_key, self.private_key, self.group, "POST", url, params
-        )
-        res = res["data"]
-        filled_price = float(res["priceAvg"])
-        filled_quantity = float(res["filledSize"])
+    def parse_order_status(self, order):
+        filled_price = float(order["priceAvg"])
+        filled_quantity = float(order["filledSize"])
 
         """
         {'code': 1000,
@@ -174,17 +214,29 @@ class BitmartAPI:
         'updateTime': 1714306076995}}
         """
 
-        return filled_price, filled_quantity, res
+        return filled_price, filled_quantity
 
-    @retry(stop=stop.stop_after_attempt(3), wait=wait.wait_fixed(2))
-    def cancel_order(self, order_id):
-        url = "/spot/v3/cancel_order"
+    def get_order_status(self, order_id):
+        url = "/spot/v4/query/order"
 
-        params = {"symbol": self.ticker, "order_id": order_id}
+        params = {"orderId": order_id}
         res = sign_request(
             self.public_key, self.private_key, self.group, "POST", url, params
         )
+        res = res["data"]
+        return self.parse_order_status(res) + (res,)
 
+    async def async_get_order_status(self, order_id):
+        url = "/spot/v4/query/order"
+
+        params = {"orderId": order_id}
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "POST", url, params
+        )
+        res = res["data"]
+        return self.parse_order_status(res) + (res,)
+
+    def parse_cancelled_order(self, res):
         if res["code"] == 50031:
             logger.debug(f"Order already completed: {res}")
             return True, res
@@ -199,6 +251,26 @@ class BitmartAPI:
 
         return True, res
 
+    @retry(stop=stop.stop_after_attempt(3), wait=wait.wait_fixed(2))
+    def cancel_order(self, order_id):
+        url = "/spot/v3/cancel_order"
+
+        params = {"symbol": self.ticker, "order_id": order_id}
+        res = sign_request(
+            self.public_key, self.private_key, self.group, "POST", url, params
+        )
+        return self.parse_cancelled_order(res)
+
+    @retry(stop=stop.stop_after_attempt(3), wait=wait.wait_fixed(2))
+    async def async_cancel_order(self, order_id):
+        url = "/spot/v3/cancel_order"
+
+        params = {"symbol": self.ticker, "order_id": order_id}
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "POST", url, params
+        )
+        return self.parse_cancelled_order(res)
+
     @retry(stop=stop.stop_after_attempt(60), wait=wait.wait_fixed(1))
     def cancel_open_orders(self):
         url = "/spot/v1/cancel_orders"
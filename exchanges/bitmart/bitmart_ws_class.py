@@ -1,14 +1,39 @@
 import asyncio
 import websockets
 import json
-import zlib
 import traceback
 
+from exchanges import decoding
+from exchanges.inflate import inflate_deflate
+from exchanges.ws_subscriptions import DepthSubscriptionMixin, from_ms
+from exchanges.ws_supervisor import supervise
+from exchanges.ws_accounts import AccountStreamMixin
+from exchanges.ws_orders import OrderStreamMixin
 from exchanges.bitmart.utils import WS_HOST, WS_LOGIN_HOST, sign, utc_timestamp
 from exchanges.bitmart.bitmart_api_class import BitmartAPI
 
+ORDER_TOPIC = "spot/user/orders:ALL_SYMBOLS"
+ACCOUNT_TOPIC = "spot/user/balance:BALANCE_UPDATE"
+
+
+def parse_depth(message):
+    """(topic, asks, bids, exchange time, None) of a depth frame or None"""
+    if message.get("table") != "spot/depth5":
+        return None
+    data = message["data"][0]
+    return (
+        f"spot/depth5:{data['symbol']}",
+        data["asks"],
+        data["bids"],
+        from_ms(data.get("ms_t")),
+        None,
+    )
+
+
+class BitmartWS(DepthSubscriptionMixin, OrderStreamMixin, AccountStreamMixin):
+    max_subscriptions = 50
+    subscriptions_per_message = 20
 
-class BitmartWS:
     def __init__(
         self, ticker=None, public_key=None, private_key=None, group=None, kyc=None
     ):
@@ -19,12 +44,18 @@ class BitmartWS:
         self.private_key = private_key
         self.group = group
         self.kyc = kyc
+        self.init_subscriptions(ticker)
+        self.init_order_stream()
+
+    def depth_topic(self, ticker):
+        return f"spot/depth5:{ticker.split('/')[0]}_USDT"
+
+    def subscription_message(self, topics, subscribe=True):
+        op = "subscribe" if subscribe else "unsubscribe"
+        return json.dumps({"op": op, "args": topics})
 
     def inflate(self, data):
-        decompress = zlib.decompressobj(-zlib.MAX_WBITS)
-        inflated = decompress.decompress(data)
-        inflated += decompress.flush()
-        return inflated.decode("UTF-8")
+        return inflate_deflate(data).decode("UTF-8")
 
     def convert(self, message):
         if type(message) == bytes:
@@ -33,83 +64,162 @@ class BitmartWS:
             return message
 
     async def on_message(self, message, depth=None, balance=None):
-        message = json.loads(self.convert(message))
-        if depth and "table" in message and message["table"] == "spot/depth5":
-            asks = message["data"][0]["asks"]
-            bids = message["data"][0]["bids"]
-            depth("Bitmart", asks, bids)
+        if type(message) == bytes:
+            message = inflate_deflate(message)  # The decoder takes the bytes
+        message = decoding.loads(message)
+        parsed = parse_depth(message) if depth else None
+        if parsed:
+            topic, asks, bids, exchange_ts, seq = parsed
+            if topic not in self.topics or not self.in_sequence(topic, exchange_ts):
+                return
+            depth(
+                "Bitmart",
+                asks,
+                bids,
+                ticker=self.topics[topic],
+                exchange_ts=exchange_ts,
+                seq=seq,
+            )
         else:
             print("Received message:", message)
 
-    async def authorize(self, message):
-        message = json.loads(message)
-        if message["event"] == "login":
-            return True
-        return False
-
     async def connect_public_websocket(self, depth=None):
-        params = json.dumps(
-            {"op": "subscribe", "args": [f"spot/depth5:{self.tick}_USDT"]}
-        )
-        try:
-            async with websockets.connect(WS_HOST) as websocket:
-                await websocket.send(params)
-                while True:
-                    message = await websocket.recv()
-                    await self.on_message(message, depth=depth)
-        except (
-            websockets.exceptions.ConnectionClosed,
-            websockets.exceptions.InvalidHandshake,
-        ):
-
-            print("Bitmart Connection closed, restarting...")
-            await self.connect_public_websocket(depth=depth)
-
-    async def connect_private_websocket(self, balance=None):
-        ts = utc_timestamp()
-        substring = f"{str(ts)}#{self.group}#bitmart.WebSocket"
-        signature = sign(self.private_key, substring)
-        login_params = json.dumps(
-            {"op": "login", "args": [self.public_key, ts, signature]}
-        )
-        params = json.dumps(
-            {"op": "subscribe", "args": ["spot/user/balance:BALANCE_UPDATE"]}
-        )
-
-        async with websockets.connect(WS_LOGIN_HOST) as websocket:
-            await websocket.send(login_params)
-            message = await websocket.recv()
-            print(f"[websockets] Recv:{message}")
-            result = await self.authorize(message)
-            if result:
-                print("OK lets go")
-                await websocket.send(params)
-
-            while True:
-                message = await websocket.recv()
-                await self.on_message(message, balance=balance)
-
-    async def fetch_account_balance(self, balance):
-        Bitmart = BitmartAPI(
-            self.ticker, self.public_key, self.private_key, self.group, self.kyc
-        )
-
-        while True:
+        async def session(health):
             try:
-                self.account_balance = Bitmart.get_account_balance()
-                balance("Bitmart", self.kyc, self.account_balance)
-                await asyncio.sleep(0.2)
-            except:
-                await asyncio.sleep(3)
+                async with websockets.connect(WS_HOST) as websocket:
+                    self.websocket = websocket
+                    await self.replay_subscriptions()
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_message(message, depth=depth)
+            finally:
+                self.websocket = None
+
+        await supervise("Bitmart depth stream", session)
+
+    async def on_order_message(self, message, order, websocket):
+        message = self.convert(message)
+        self.received()
+        if message == "pong":
+            return
+
+        message = decoding.loads(message)
+        try:
+            if message.get("event") == "login":
+                await websocket.send(
+                    json.dumps({"op": "subscribe", "args": [ORDER_TOPIC]})
+                )
+            elif message.get("event") == "subscribe":
+                self.order_subscribed()
+            elif message.get("table", "").startswith("spot/user/order"):
+                fills = [
+                    self.order_fill(
+                        data["order_id"],
+                        data["filled_size"],
+                        data["filled_notional"],
+                        data["order_state"],
+                    )
+                    for data in message["data"]
+                ]
+                order("Bitmart", self.kyc, self.connected_at, fills)
+            else:
+                print("Received message:", message)
+        except:
+            print("Received message:", message)
+
+    async def connect_order_websocket(self, order):
+        async def session(health):
+            ts = utc_timestamp()
+            substring = f"{str(ts)}#{self.group}#bitmart.WebSocket"
+            signature = sign(self.private_key, substring)
+            login_params = json.dumps(
+                {"op": "login", "args": [self.public_key, ts, signature]}
+            )
+            self.init_order_stream()
+            async with websockets.connect(WS_LOGIN_HOST) as websocket:
+                heartbeat = asyncio.create_task(
+                    self.order_heartbeat("Bitmart", websocket, order, ping="ping")
+                )
+                try:
+                    await websocket.send(login_params)
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_order_message(message, order, websocket)
+                finally:
+                    heartbeat.cancel()
+
+        await supervise("Bitmart order stream", session)
+
+    async def on_account_message(self, message, balance, websocket):
+        message = self.convert(message)
+        self.received()
+        if message == "pong":
+            return
+
+        message = decoding.loads(message)
+        try:
+            if message.get("event") == "login":
+                await websocket.send(
+                    json.dumps({"op": "subscribe", "args": [ACCOUNT_TOPIC]})
+                )
+            elif message.get("event") == "subscribe":
+                self.account_subscribed()
+            elif message.get("table") == "spot/user/balance":
+                for event in message["data"]:
+                    for asset in event["balance_details"]:
+                        self.update_balance(
+                            asset["ccy"], asset["av_bal"], asset["fz_bal"]
+                        )
+                self.publish_balances("Bitmart", balance)
+            else:
+                print("Received message:", message)
+        except:
+            print("Received message:", message)
 
-    async def main(self, depth=None, balance=None):
+    async def connect_private_websocket(self, Bitmart, balance=None):
+        async def session(health):
+            ts = utc_timestamp()
+            substring = f"{str(ts)}#{self.group}#bitmart.WebSocket"
+            signature = sign(self.private_key, substring)
+            login_params = json.dumps(
+                {"op": "login", "args": [self.public_key, ts, signature]}
+            )
+            async with websockets.connect(WS_LOGIN_HOST) as websocket:
+                keepalive = asyncio.create_task(
+                    self.keepalive("Bitmart", websocket, ping="ping")
+                )
+                try:
+                    await websocket.send(login_params)
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_account_message(message, balance, websocket)
+                finally:
+                    keepalive.cancel()
+
+        await supervise("Bitmart account stream", session)
+
+    async def main(self, depth=None, balance=None, order=None):
+        tasks = []
         if depth:
-            tasks = [
-                self.connect_public_websocket(depth),
-            ]
+            tasks.append(self.connect_public_websocket(depth))
 
         if balance:
-            tasks = [
-                self.fetch_account_balance(balance),
-            ]
+            Bitmart = BitmartAPI(
+                self.ticker, self.public_key, self.private_key, self.group, self.kyc
+            )
+            self.init_account_stream()
+            tasks.extend(
+                [
+                    self.connect_private_websocket(Bitmart, balance),
+                    self.reconcile_balances("Bitmart", Bitmart, balance),
+                ]
+            )
+
+        if order:
+            tasks.append(self.connect_order_websocket(order))
+        if not tasks:
+            raise ValueError("Pass depth, balance or order to start a stream")
         await asyncio.gather(*tasks)
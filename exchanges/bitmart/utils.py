@@ -1,9 +1,10 @@
-import requests
+from exchanges import aio, sessions
 import json
 import hmac
 import datetime
 
 HOST = "https://api-cloud.bitmart.com"
+EXCHANGE = "Bitmart"  # Rate limit buckets
 WS_HOST = "wss://ws-manager-compress.bitmart.com/api?protocol=1.1"
 WS_LOGIN_HOST = "wss://ws-manager-compress.bitmart.com/user?protocol=1.1"
 
@@ -25,7 +26,7 @@ def pre_substring(timestamp, memo, body):
     return f"{str(timestamp)}#{memo}#{body}"
 
 
-def sign_request(public_key, private_key, group, method, url, params=None):
+def prepare_sign_request(public_key, private_key, group, method, url, params=None):
     url = "{}{}".format(HOST, url)
     ts = utc_timestamp()
     headers = {
@@ -35,14 +36,34 @@ def sign_request(public_key, private_key, group, method, url, params=None):
         ),
         "X-BM-TIMESTAMP": ts,
     }
+    return url, {"json": params, "headers": headers}
+
+
+def sign_request(public_key, private_key, group, method, url, params=None):
+    url, kwargs = prepare_sign_request(
+        public_key, private_key, group, method, url, params
+    )
+    res = sessions.request(method, url, rate_limit=(EXCHANGE, public_key), **kwargs)
+    return parse_response(res, url)
 
-    res = requests.request(method, url, json=params, headers=headers)
+
+async def async_sign_request(public_key, private_key, group, method, url, params=None):
+    url, kwargs = prepare_sign_request(
+        public_key, private_key, group, method, url, params
+    )
+    res = await aio.request(method, url, rate_limit=(EXCHANGE, public_key), **kwargs)
     return parse_response(res, url)
 
 
 def request(method, url, params=None):
     url = "{}{}".format(HOST, url)
-    res = requests.request(method, url, params=params)
+    res = sessions.request(method, url, params=params, rate_limit=(EXCHANGE, None))
+    return parse_response(res, url)
+
+
+async def async_request(method, url, params=None):
+    url = "{}{}".format(HOST, url)
+    res = await aio.request(method, url, params=params, rate_limit=(EXCHANGE, None))
     return parse_response(res, url)
 
 
@@ -1,11 +1,7 @@
-from .utils import request
+from .utils import request, async_request
 
 
-def get_tickers():
-    url = "/v5/market/tickers"
-    params = {"category": "spot"}
-    res = request("GET", url, params=params)
-
+def parse_tickers(res):
     tickers = {}
 
     denominator = "USDT"
@@ -30,11 +26,21 @@ def get_tickers():
     return tickers
 
 
-def get_depth(ticker):
-    url = "/v5/market/orderbook"
-
-    params = {"symbol": ticker, "category": "spot", "limit": 20}
+def get_tickers():
+    url = "/v5/market/tickers"
+    params = {"category": "spot"}
     res = request("GET", url, params=params)
+    return parse_tickers(res)
+
+
+async def async_get_tickers():
+    url = "/v5/market/tickers"
+    params = {"category": "spot"}
+    res = await async_request("GET", url, params=params)
+    return parse_tickers(res)
+
+
+def parse_depth(res):
     res = res["result"]
     asks = res["a"]
     bids = res["b"]
@@ -42,10 +48,38 @@ def get_depth(ticker):
     return asks, bids
 
 
+def get_depth(ticker):
+    url = "/v5/market/orderbook"
+
+    params = {"symbol": ticker, "category": "spot", "limit": 20}
+    res = request("GET", url, params=params)
+    return parse_depth(res)
+
+
+async def async_get_depth(ticker):
+    url = "/v5/market/orderbook"
+
+    params = {"symbol": ticker, "category": "spot", "limit": 20}
+    res = await async_request("GET", url, params=params)
+    return parse_depth(res)
+
+
+def parse_product_details(res):
+    res = res["result"]["list"][0]
+    return res
+
+
 def get_product_details(ticker):
     url = "/v5/market/instruments-info"
 
     params = {"symbol": ticker, "category": "spot"}
     res = request("GET", url, params=params)
-    res = res["result"]["list"][0]
-    return res
+    return parse_product_details(res)
+
+
+async def async_get_product_details(ticker):
+    url = "/v5/market/instruments-info"
+
+    params = {"symbol": ticker, "category": "spot"}
+    res = await async_request("GET", url, params=params)
+    return parse_product_details(res)
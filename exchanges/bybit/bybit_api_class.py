@@ -4,8 +4,14 @@ from uuid import uuid4
 
 # from tenacity import retry, stop, wait
 
-from exchanges.bybit.utils import sign_request
-from exchanges.bybit.bybit_api import get_tickers, get_depth, get_product_details
+from exchanges.bybit.utils import sign_request, async_sign_request
+from exchanges.bybit.bybit_api import (
+    get_tickers,
+    get_depth,
+    get_product_details,
+    async_get_tickers,
+    async_get_depth,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -28,20 +34,25 @@ class BybitAPI:
         tickers = get_tickers()
         return tickers
 
+    async def async_get_tickers(self):
+        tickers = await async_get_tickers()
+        return tickers
+
     def get_depth(self):
         asks, bids = get_depth(self.ticker)
         return asks, bids
 
+    async def async_get_depth(self):
+        asks, bids = await async_get_depth(self.ticker)
+        return asks, bids
+
     def get_product_details(self):
         product_details = get_product_details(self.ticker)
         price_precision = float(product_details["priceFilter"]["tickSize"])
         quantity_precision = float(product_details["lotSizeFilter"]["basePrecision"])
         return price_precision, quantity_precision
 
-    def get_asset_details(self):
-        url = "/v5/asset/coin/query-info"
-
-        res = sign_request(self.public_key, self.private_key, self.group, "GET", url)
+    def parse_asset_details(self, res):
         res = res["result"]["rows"]
         details = {}
 
@@ -68,10 +79,22 @@ class BybitAPI:
 
         return details
 
-    def create_limit_order(self, side, price, quantity):
-        url = "/v5/order/create"
+    def get_asset_details(self):
+        url = "/v5/asset/coin/query-info"
 
-        params = {
+        res = sign_request(self.public_key, self.private_key, self.group, "GET", url)
+        return self.parse_asset_details(res)
+
+    async def async_get_asset_details(self):
+        url = "/v5/asset/coin/query-info"
+
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "GET", url
+        )
+        return self.parse_asset_details(res)
+
+    def limit_order_params(self, side, price, quantity):
+        return {
             "category": "spot",
             "symbol": self.ticker,
             "side": "Buy" if side == "buy" else "Sell",
@@ -79,17 +102,35 @@ class BybitAPI:
             "price": str(price),
             "qty": str(quantity),
         }
-        res = sign_request(
-            self.public_key, self.private_key, self.group, "POST", url, params
-        )
+
+    def parse_created_order(self, res):
         if res["retCode"] != 0:
             return None, res
 
         return res["result"]["orderId"], res
 
+    def create_limit_order(self, side, price, quantity):
+        url = "/v5/order/create"
+        params = self.limit_order_params(side, price, quantity)
+        res = sign_request(
+            self.public_key, self.private_key, self.group, "POST", url, params
+        )
+        return self.parse_created_order(res)
+
+    async def async_create_limit_order(self, side, price, quantity):
+        url = "/v5/order/create"
+        params = self.limit_order_params(side, price, quantity)
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "POST", url, params
+        )
+        return self.parse_created_order(res)
+
     def create_market_order(self, side, price, quantity):
         pass
 
+    def parse_order_status(self, order):
+        return float(order["avgPrice"]), float(order["cumExecQty"])
+
     def get_order_status(self, order_id):
         url = "/v5/order/realtime"
 
@@ -102,10 +143,27 @@ class BybitAPI:
             logger.error(f"Bybit order status failed for order_id: {order_id}")
 
         res = res["result"]["list"][0]
-        filled_price = float(res["avgPrice"])
-        filled_quantity = float(res["cumExecQty"])
+        return self.parse_order_status(res) + (res,)
+
+    async def async_get_order_status(self, order_id):
+        url = "/v5/order/realtime"
 
-        return filled_price, filled_quantity, res
+        params = {"category": "spot", "orderId": order_id}
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "GET", url, params
+        )
+
+        if res["retCode"] != 0:
+            logger.error(f"Bybit order status failed for order_id: {order_id}")
+
+        res = res["result"]["list"][0]
+        return self.parse_order_status(res) + (res,)
+
+    def parse_cancelled_order(self, res):
+        if res["retCode"] != 0:
+            return False, res
+
+        return True, res
 
     def cancel_order(self, order_id):
         url = "/v5/order/cancel"
@@ -114,11 +172,16 @@ class BybitAPI:
         res = sign_request(
             self.public_key, self.private_key, self.group, "POST", url, params
         )
+        return self.parse_cancelled_order(res)
 
-        if res["retCode"] != 0:
-            return False, res
+    async def async_cancel_order(self, order_id):
+        url = "/v5/order/cancel"
 
-        return True, res
+        params = {"category": "spot", "symbol": self.ticker, "orderId": order_id}
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "POST", url, params
+        )
+        return self.parse_cancelled_order(res)
 
     def get_account_balance_function(self):
         url = "/v5/account/wallet-balance"
@@ -129,8 +192,16 @@ class BybitAPI:
         balances = res["result"]["list"][0]["coin"]
         return balances
 
-    def get_account_balance(self, coins=None):
-        _balances = self.get_account_balance_function()
+    async def async_get_account_balance_function(self):
+        url = "/v5/account/wallet-balance"
+        params = {"accountType": "UNIFIED"}
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "GET", url, params
+        )
+        balances = res["result"]["list"][0]["coin"]
+        return balances
+
+    def parse_account_balance(self, _balances, coins=None):
         account_balance = {}
 
         for balance in _balances:
@@ -166,6 +237,14 @@ class BybitAPI:
 
         return result
 
+    def get_account_balance(self, coins=None):
+        _balances = self.get_account_balance_function()
+        return self.parse_account_balance(_balances, coins)
+
+    async def async_get_account_balance(self, coins=None):
+        _balances = await self.async_get_account_balance_function()
+        return self.parse_account_balance(_balances, coins)
+
     def cancel_open_orders(self):
         url = "/v5/order/cancel-all"
 
@@ -176,9 +255,7 @@ class BybitAPI:
 
         return res
 
-    def get_deposits(self):
-        url = "/v5/asset/deposit/query-record"
-        res = sign_request(self.public_key, self.private_key, self.group, "GET", url)
+    def parse_deposits(self, res):
         res = res["result"]["rows"]
         deposits = {}
         for deposit in res:
@@ -194,6 +271,18 @@ class BybitAPI:
 
         return deposits
 
+    def get_deposits(self):
+        url = "/v5/asset/deposit/query-record"
+        res = sign_request(self.public_key, self.private_key, self.group, "GET", url)
+        return self.parse_deposits(res)
+
+    async def async_get_deposits(self):
+        url = "/v5/asset/deposit/query-record"
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "GET", url
+        )
+        return self.parse_deposits(res)
+
     def get_deposit_adresses(self, chain):
         url = "/v5/asset/deposit/query-address"
         params = {
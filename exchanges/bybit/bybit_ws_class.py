@@ -6,11 +6,40 @@ from uuid import uuid4
 import gzip
 import io
 
-from .utils import WS_HOST
+from exchanges import decoding
+from exchanges.orderbook import OrderBook
+from exchanges.ws_subscriptions import DepthSubscriptionMixin, from_ms
+from exchanges.ws_supervisor import supervise
+from exchanges.ws_accounts import AccountStreamMixin
+from exchanges.ws_orders import OrderStreamMixin
+
+from .utils import WS_HOST, WS_PRIVATE_HOST, ws_auth_params
 from .bybit_api_class import BybitAPI
 
+ORDER_TOPIC = "order.spot"
+ACCOUNT_TOPIC = "wallet"
+
+
+def parse_depth(message):
+    """(topic, snapshot, asks, bids, exchange time, update id) or None"""
+    topic = message["topic"]
+    if "orderbook" not in topic:
+        return None
+    data = message.get("data", {})
+    return (
+        topic,
+        message.get("type") == "snapshot",
+        data.get("a", []),
+        data.get("b", []),
+        from_ms(message.get("ts")),
+        data.get("u"),
+    )
+
+
+class BybitWS(DepthSubscriptionMixin, OrderStreamMixin, AccountStreamMixin):
+    max_subscriptions = 50
+    subscriptions_per_message = 10
 
-class BybitWS:
     def __init__(
         self, ticker=None, public_key=None, private_key=None, group=None, kyc=None
     ):
@@ -22,94 +51,187 @@ class BybitWS:
         self.group = group
         self.kyc = kyc
 
-        self.orderbooks = {"b": [], "a": []}
+        self.orderbooks = {}
+        self.init_subscriptions(ticker)
+        self.init_order_stream()
 
-    def _process_delta_orderbook(self, message, topic):
-        data = message.get("data", {})
+    def depth_topic(self, ticker):
+        return f"orderbook.50.{ticker.split('/')[0]}USDT"
 
-        # Check if it's a snapshot
-        if "type" in message and message["type"] == "snapshot":
-            self._reset_orderbook(data)
-        else:
-            self._apply_delta(data)
-
-    def _reset_orderbook(self, data):
-        self.orderbooks["b"] = sorted(
-            [[price, size] for price, size in data.get("b", [])],
-            key=lambda x: float(x[0]),
-            reverse=True,
-        )
-        self.orderbooks["a"] = sorted(
-            [[price, size] for price, size in data.get("a", [])],
-            key=lambda x: float(x[0]),
-        )
-
-    def _apply_delta(self, data):
-        for side in ["b", "a"]:
-            updates = {float(price): float(size) for price, size in data.get(side, [])}
-            book = {float(price): float(size) for price, size in self.orderbooks[side]}
-
-            for price, size in updates.items():
-                if size == 0:
-                    if price in book:
-                        del book[price]
-                else:
-                    book[price] = size
+    def subscription_message(self, topics, subscribe=True):
+        op = "subscribe" if subscribe else "unsubscribe"
+        return json.dumps({"op": op, "args": topics})
 
-            sorted_book = sorted(
-                book.items(), key=lambda x: x[0], reverse=(side == "b")
-            )
-            self.orderbooks[side] = [[price, size] for price, size in sorted_book]
+    def follows_on(self, topic, update_id):
+        """Deltas carry consecutive update ids from the snapshot on"""
+        last = self.sequences.get(topic)
+        return update_id is None or last is None or update_id == last + 1
+
+    def _process_delta_orderbook(self, topic, snapshot, asks, bids):
+        orderbook = self.orderbooks.setdefault(topic, OrderBook())
+        if snapshot:
+            orderbook.reset(asks, bids)
+        else:
+            orderbook.update(asks, bids)
+        return orderbook
 
     async def on_message(self, message, depth=None, balance=None):
-        message = json.loads(message)
+        message = decoding.loads(message)
         try:
-            topic = message["topic"]
-            if "orderbook" in topic:
-                self._process_delta_orderbook(message, topic)
-                depth("Bybit", self.orderbooks["a"], self.orderbooks["b"])
+            parsed = parse_depth(message)
+            if parsed and parsed[0] in self.topics:
+                topic, snapshot, asks, bids, exchange_ts, update_id = parsed
+                if not snapshot and topic not in self.orderbooks:
+                    return  # Waiting for the snapshot of a resync
+                if not snapshot and not self.follows_on(topic, update_id):
+                    self.orderbooks.pop(topic, None)
+                    await self.resync(topic)
+                    return
+
+                self.sequences[topic] = update_id
+                orderbook = self._process_delta_orderbook(topic, snapshot, asks, bids)
+                depth(
+                    "Bybit",
+                    orderbook.asks(),
+                    orderbook.bids(),
+                    ticker=self.topics[topic],
+                    exchange_ts=exchange_ts,
+                    seq=update_id,
+                )
         except:
             print("Received message:", message)
 
+    async def unsubscribe(self, tickers):
+        await super().unsubscribe(tickers)
+        for ticker in tickers:
+            self.orderbooks.pop(self.depth_topic(ticker), None)
+
     async def connect_public_websocket(self, depth=None):
-        params = json.dumps(
-            {"op": "subscribe", "args": [f"orderbook.50.{self.tick}USDT"]}
-        )
-        try:
-            async with websockets.connect(WS_HOST) as websocket:
-                await websocket.send(params)
-                while True:
-                    message = await websocket.recv()
-                    await self.on_message(message, depth=depth)
-        except (
-            websockets.exceptions.ConnectionClosed,
-            websockets.exceptions.InvalidHandshake,
-        ):
-
-            print("Bybit Connection closed, restarting...")
-            await self.connect_public_websocket(depth=depth)
-
-    async def fetch_account_balance(self, balance):
-        Bybit = BybitAPI(
-            self.ticker, self.public_key, self.private_key, self.group, self.kyc
-        )
-
-        while True:
+        async def session(health):
             try:
-                self.account_balance = Bybit.get_account_balance()
-                balance("Bybit", self.kyc, self.account_balance)
-                await asyncio.sleep(0.5)
-            except:
-                await asyncio.sleep(3)
+                async with websockets.connect(WS_HOST) as websocket:
+                    self.websocket = websocket
+                    self.orderbooks = {}
+                    await self.replay_subscriptions()
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_message(message, depth=depth)
+            finally:
+                self.websocket = None
+
+        await supervise("Bybit depth stream", session)
+
+    async def on_order_message(self, message, order, websocket):
+        message = decoding.loads(message)
+        self.received()
+        try:
+            if message.get("op") == "auth":
+                if message["success"]:
+                    await websocket.send(
+                        json.dumps({"op": "subscribe", "args": [ORDER_TOPIC]})
+                    )
+                else:
+                    print("Received message:", message)
+            elif message.get("op") == "subscribe" and message["success"]:
+                self.order_subscribed()
+            elif message.get("topic") == ORDER_TOPIC:
+                fills = [
+                    self.order_fill(
+                        data["orderId"],
+                        data["cumExecQty"],
+                        data["cumExecValue"],
+                        data["orderStatus"],
+                    )
+                    for data in message["data"]
+                ]
+                order("Bybit", self.kyc, self.connected_at, fills)
+        except:
+            print("Received message:", message)
 
-    async def main(self, depth=None, balance=None):
+    async def connect_order_websocket(self, order):
+        async def session(health):
+            self.init_order_stream()
+            async with websockets.connect(WS_PRIVATE_HOST) as websocket:
+                heartbeat = asyncio.create_task(
+                    self.order_heartbeat(
+                        "Bybit", websocket, order, ping=json.dumps({"op": "ping"})
+                    )
+                )
+                try:
+                    await websocket.send(
+                        ws_auth_params(self.public_key, self.private_key)
+                    )
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_order_message(message, order, websocket)
+                finally:
+                    heartbeat.cancel()
+
+        await supervise("Bybit order stream", session)
+
+    async def on_account_message(self, message, balance, websocket):
+        message = decoding.loads(message)
+        self.received()
+        try:
+            if message.get("op") == "auth":
+                if message["success"]:
+                    await websocket.send(
+                        json.dumps({"op": "subscribe", "args": [ACCOUNT_TOPIC]})
+                    )
+                else:
+                    print("Received message:", message)
+            elif message.get("op") == "subscribe" and message["success"]:
+                self.account_subscribed()
+            elif message.get("topic") == ACCOUNT_TOPIC:
+                for account in message["data"]:
+                    for coin in account["coin"]:
+                        wallet = float(coin["walletBalance"] or 0)
+                        locked = float(coin["locked"] or 0)
+                        self.update_balance(coin["coin"], wallet - locked, locked)
+                self.publish_balances("Bybit", balance)
+        except:
+            print("Received message:", message)
+
+    async def connect_private_websocket(self, Bybit, balance=None):
+        async def session(health):
+            async with websockets.connect(WS_PRIVATE_HOST) as websocket:
+                keepalive = asyncio.create_task(
+                    self.keepalive("Bybit", websocket, ping=json.dumps({"op": "ping"}))
+                )
+                try:
+                    await websocket.send(
+                        ws_auth_params(self.public_key, self.private_key)
+                    )
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_account_message(message, balance, websocket)
+                finally:
+                    keepalive.cancel()
+
+        await supervise("Bybit account stream", session)
+
+    async def main(self, depth=None, balance=None, order=None):
+        tasks = []
         if depth:
-            tasks = [
-                self.connect_public_websocket(depth),
-            ]
+            tasks.append(self.connect_public_websocket(depth))
 
         if balance:
-            tasks = [
-                self.fetch_account_balance(balance),
-            ]
+            Bybit = BybitAPI(
+                self.ticker, self.public_key, self.private_key, self.group, self.kyc
+            )
+            self.init_account_stream()
+            tasks.extend(
+                [
+                    self.connect_private_websocket(Bybit, balance),
+                    self.reconcile_balances("Bybit", Bybit, balance),
+                ]
+            )
+
+        if order:
+            tasks.append(self.connect_order_websocket(order))
+        if not tasks:
+            raise ValueError("Pass depth, balance or order to start a stream")
         await asyncio.gather(*tasks)
@@ -1,11 +1,13 @@
-import requests
+from exchanges import aio, sessions
 import hmac
 import hashlib
 import time
 import json
 
 HOST = "https://api.bybit.com"
+EXCHANGE = "Bybit"  # Rate limit buckets
 WS_HOST = "wss://stream.bybit.com/v5/public/spot"
+WS_PRIVATE_HOST = "wss://stream.bybit.com/v5/private"
 
 
 proxy = {
@@ -32,7 +34,7 @@ def cast_values(parameters):
                 parameters[key] = int(value)
 
 
-def sign_request(public_key, private_key, group, method, url, params={}):
+def prepare_sign_request(public_key, private_key, group, method, url, params={}):
     if params is not None:
         for i in params.keys():
             if isinstance(params[i], float) and params[i] == int(params[i]):
@@ -59,36 +61,55 @@ def sign_request(public_key, private_key, group, method, url, params={}):
         "X-BAPI-RECV-WINDOW": str(5000),
     }
 
+    kwargs = {"headers": headers, "proxies": proxy}
     if method == "GET":
         if payload:
-            res = requests.request(
-                method,
-                HOST + url + f"?{payload}",
-                headers=headers,
-                proxies=proxy,
-            )
-        else:
-            res = requests.request(
-                method,
-                HOST + url,
-                headers=headers,
-                proxies=proxy,
-            )
-    else:
-        res = requests.request(
-            method,
-            HOST + url,
-            headers=headers,
-            data=payload,
-            proxies=proxy,
-        )
+            return HOST + url + f"?{payload}", kwargs
+        return HOST + url, kwargs
+
+    kwargs["data"] = payload
+    return HOST + url, kwargs
+
+
+def ws_auth_params(public_key, private_key):
+    expires = int((time.time() + 10) * 1000)
+    signature = hmac.new(
+        bytes(private_key, "utf-8"),
+        f"GET/realtime{expires}".encode("utf-8"),
+        hashlib.sha256,
+    ).hexdigest()
+    return json.dumps({"op": "auth", "args": [public_key, expires, signature]})
+
 
+def sign_request(public_key, private_key, group, method, url, params={}):
+    url, kwargs = prepare_sign_request(
+        public_key, private_key, group, method, url, params
+    )
+    res = sessions.request(method, url, rate_limit=(EXCHANGE, public_key), **kwargs)
+    return parse_response(res)
+
+
+async def async_sign_request(public_key, private_key, group, method, url, params={}):
+    url, kwargs = prepare_sign_request(
+        public_key, private_key, group, method, url, params
+    )
+    res = await aio.request(method, url, rate_limit=(EXCHANGE, public_key), **kwargs)
     return parse_response(res)
 
 
 def request(method, url, params=None):
     url = "{}{}".format(HOST, url)
-    res = requests.request(method, url, params=params, proxies=proxy)
+    res = sessions.request(
+        method, url, params=params, proxies=proxy, rate_limit=(EXCHANGE, None)
+    )
+    return parse_response(res)
+
+
+async def async_request(method, url, params=None):
+    url = "{}{}".format(HOST, url)
+    res = await aio.request(
+        method, url, params=params, proxies=proxy, rate_limit=(EXCHANGE, None)
+    )
     return parse_response(res)
 
 
@@ -1,4 +1,4 @@
-import requests
+from exchanges import aio, sessions
 import time
 import hmac
 import hashlib
@@ -10,7 +10,13 @@ HOST = "https://api.coinex.com/v2"
 
 def request(method, url, params=None):
     url = "{}{}".format(HOST, url)
-    res = requests.request(method, url, params=params)
+    res = sessions.request(method, url, params=params)
+    return parse_response(res)
+
+
+async def async_request(method, url, params=None):
+    url = "{}{}".format(HOST, url)
+    res = await aio.request(method, url, params=params)
     return parse_response(res)
 
 
@@ -0,0 +1,35 @@
+"""JSON decoding of websocket frames
+
+Adapters decode frames with decoding.loads, which is orjson when it is
+installed and the standard library otherwise. WS_JSON_DECODER selects the
+backend ("orjson" or "json"), use() switches it at runtime. Both accept str
+and bytes and return the same plain dicts, lists and strings.
+"""
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+BACKENDS = {"json": json.loads}
+if orjson is not None:
+    BACKENDS["orjson"] = orjson.loads
+
+DEFAULT_BACKEND = "orjson" if orjson is not None else "json"
+
+
+def use(name=None):
+    """Decode with the named backend, unknown or missing ones fall back to json"""
+    global loads, backend
+    name = name or os.environ.get("WS_JSON_DECODER", DEFAULT_BACKEND)
+    backend = name if name in BACKENDS else "json"
+    loads = BACKENDS[backend]
+    return backend
+
+
+loads = json.loads
+backend = "json"
+use()
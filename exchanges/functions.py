@@ -1,6 +1,7 @@
 import asyncio
 from channels.db import database_sync_to_async
 
+from exchanges import aio
 from exchanges.api_classes import api_classes
 
 from exchanges.mexc import mexc_api
@@ -19,55 +20,69 @@ from spread.models import ExchangeApi
 exchange_functions = {
     "Mexc": {
         "tickers": mexc_api.get_mexc_tickers,
+        "async_tickers": mexc_api.async_get_mexc_tickers,
         "depth": mexc_api.get_mexc_depth,
         "allowed": mexc_api.get_allowed_symbols,
+        "async_allowed": mexc_api.async_get_allowed_symbols,
     },
     "Bitmart": {
         "tickers": bitmart_api.get_bitmart_tickers,
+        "async_tickers": bitmart_api.async_get_bitmart_tickers,
         "depth": bitmart_api.get_bitmart_depth,
     },
     "Bybit": {
         "tickers": bybit_api.get_tickers,
+        "async_tickers": bybit_api.async_get_tickers,
         "depth": bybit_api.get_depth,
     },
     "Kucoin": {
         "tickers": kucoin_api.get_tickers,
+        "async_tickers": kucoin_api.async_get_tickers,
         "depth": kucoin_api.get_depth,
     },
     "BingX": {
         "tickers": bingx_api.get_tickers,
+        "async_tickers": bingx_api.async_get_tickers,
         "depth": bingx_api.get_depth,
         "allowed": bingx_api.get_allowed_symbols,
+        "async_allowed": bingx_api.async_get_allowed_symbols,
     },
     "Bitget": {
         "tickers": bitget_api.get_tickers,
+        "async_tickers": bitget_api.async_get_tickers,
     },
     "Ascendex": {
         "tickers": ascendex_api.get_tickers,
+        "async_tickers": ascendex_api.async_get_tickers,
     },
     "Coinex": {
         "tickers": coinex_api.get_tickers,
+        "async_tickers": coinex_api.async_get_tickers,
     },
     "XT": {
         "tickers": xt_api.get_tickers,
+        "async_tickers": xt_api.async_get_tickers,
         "allowed": xt_api.get_allowed_symbols,
+        "async_allowed": xt_api.async_get_allowed_symbols,
     },
     "Htx": {
         "tickers": htx_api.get_tickers,
+        "async_tickers": htx_api.async_get_tickers,
     },
 }
 
 
+async def limited(exchange, coroutine):
+    """Await the coroutine within the concurrency limit of the exchange"""
+    async with aio.limit(exchange):
+        return await coroutine
+
+
 async def async_exchange_tickers(exchanges):
     tickers = {}
-    loop = asyncio.get_event_loop()
     tasks = []
-    _exchanges = []
     for exchange in exchanges:
-        tasks.append(
-            loop.run_in_executor(None, exchange_functions[exchange]["tickers"])
-        )
-        _exchanges.append(exchange)
+        tasks.append(limited(exchange, exchange_functions[exchange]["async_tickers"]()))
 
     results = await asyncio.gather(*tasks)
     for index, exchange in enumerate(exchanges):
@@ -83,12 +98,11 @@ def get_exchange_api_model(exchange):
 
 async def async_exchange_balances(apis):
     balances = {}
-    loop = asyncio.get_event_loop()
     tasks = []
     exchange_api_pairs = []
     for exchange in apis:
         for api in apis[exchange]:
-            tasks.append(loop.run_in_executor(None, api.get_account_balance))
+            tasks.append(limited(exchange, api.async_get_account_balance()))
             exchange_api_pairs.append((exchange, api))
 
     results = await asyncio.gather(*tasks)
@@ -103,16 +117,13 @@ async def async_exchange_balances(apis):
 
 async def async_exchange_allowed_symbols(exchanges):
     tickers = {}
-    loop = asyncio.get_event_loop()
     tasks = []
     _exchanges = []
     for exchange in exchanges:
-        if "allowed" not in exchange_functions[exchange]:
+        if "async_allowed" not in exchange_functions[exchange]:
             continue
 
-        tasks.append(
-            loop.run_in_executor(None, exchange_functions[exchange]["allowed"])
-        )
+        tasks.append(limited(exchange, exchange_functions[exchange]["async_allowed"]()))
         _exchanges.append(exchange)
 
     results = await asyncio.gather(*tasks)
@@ -124,17 +135,14 @@ async def async_exchange_allowed_symbols(exchanges):
 
 async def async_exchange_asset_details(apis):
     details = {}
-    loop = asyncio.get_event_loop()
     tasks = []
     exchange_api_pairs = []
     for exchange in apis:
         for api in apis[exchange]:
-            if not (
-                hasattr(api, "get_asset_details") and callable(api.get_asset_details)
-            ):
+            if not hasattr(api, "async_get_asset_details"):
                 continue
 
-            tasks.append(loop.run_in_executor(None, api.get_asset_details))
+            tasks.append(limited(exchange, api.async_get_asset_details()))
             exchange_api_pairs.append((exchange, api))
 
     results = await asyncio.gather(*tasks)
@@ -148,17 +156,13 @@ async def async_exchange_asset_details(apis):
 
 async def async_exchange_withdrawal_details(apis):
     details = {}
-    loop = asyncio.get_event_loop()
     tasks = []
     _exchanges = []
     for exchange in apis:
-        if not (
-            hasattr(apis[exchange], "get_withdrawals")
-            and callable(apis[exchange].get_withdrawals)
-        ):
+        if not hasattr(apis[exchange], "async_get_withdrawals"):
             continue
 
-        tasks.append(loop.run_in_executor(None, apis[exchange].get_withdrawals))
+        tasks.append(limited(exchange, apis[exchange].async_get_withdrawals()))
         _exchanges.append(exchange)
 
     results = await asyncio.gather(*tasks)
@@ -170,15 +174,14 @@ async def async_exchange_withdrawal_details(apis):
 
 async def async_exchange_deposit_details(apis):
     details = {}
-    loop = asyncio.get_event_loop()
     tasks = []
     exchange_api_pairs = []
     for exchange in apis:
         for api in apis[exchange]:
-            if not (hasattr(api, "get_deposits") and callable(api.get_deposits)):
+            if not hasattr(api, "async_get_deposits"):
                 continue
 
-            tasks.append(loop.run_in_executor(None, api.get_deposits))
+            tasks.append(limited(exchange, api.async_get_deposits()))
             exchange_api_pairs.append((exchange, api))
 
     results = await asyncio.gather(*tasks)
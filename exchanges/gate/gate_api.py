@@ -1,11 +1,7 @@
-from .utils import request
+from .utils import request, async_request
 
 
-def get_gate_tickers():
-    url = "/spot/tickers"
-    params = {"category": "spot"}
-    res = request("GET", url, params=params)
-
+def parse_gate_tickers(res):
     tickers = {}
 
     denominator = "USDT"
@@ -24,3 +20,17 @@ def get_gate_tickers():
             tickers[symbol]["rate"] = float(_ticker["price24hPcnt"])
 
     return tickers
+
+
+def get_gate_tickers():
+    url = "/spot/tickers"
+    params = {"category": "spot"}
+    res = request("GET", url, params=params)
+    return parse_gate_tickers(res)
+
+
+async def async_get_gate_tickers():
+    url = "/spot/tickers"
+    params = {"category": "spot"}
+    res = await async_request("GET", url, params=params)
+    return parse_gate_tickers(res)
@@ -1,4 +1,4 @@
-import requests
+from exchanges import aio, sessions
 import json
 
 HOST = "https://api.gateio.ws/api/v4"
@@ -6,7 +6,13 @@ HOST = "https://api.gateio.ws/api/v4"
 
 def request(method, url, params=None):
     url = "{}{}".format(HOST, url)
-    res = requests.request(method, url, params=params)
+    res = sessions.request(method, url, params=params)
+    return parse_response(res)
+
+
+async def async_request(method, url, params=None):
+    url = "{}{}".format(HOST, url)
+    res = await aio.request(method, url, params=params)
     return parse_response(res)
 
 
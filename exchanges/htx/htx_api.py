@@ -1,10 +1,7 @@
-from .utils import request
+from .utils import request, async_request
 
 
-def get_tickers():
-    url = "/market/tickers"
-    res = request("GET", url)
-
+def parse_tickers(res):
     tickers = {}
 
     denominator = "USDT"
@@ -29,11 +26,19 @@ def get_tickers():
     return tickers
 
 
-def get_depth(ticker):
-    url = "/market/depth"
+def get_tickers():
+    url = "/market/tickers"
+    res = request("GET", url)
+    return parse_tickers(res)
 
-    params = {"symbol": ticker, "depth": 5, "type": "step0"}
-    res = request("GET", url, params=params)
+
+async def async_get_tickers():
+    url = "/market/tickers"
+    res = await async_request("GET", url)
+    return parse_tickers(res)
+
+
+def parse_depth(res):
     res = res["tick"]
     asks = res["asks"]
     bids = res["bids"]
@@ -41,9 +46,36 @@ def get_depth(ticker):
     return asks, bids
 
 
+def get_depth(ticker):
+    url = "/market/depth"
+
+    params = {"symbol": ticker, "depth": 5, "type": "step0"}
+    res = request("GET", url, params=params)
+    return parse_depth(res)
+
+
+async def async_get_depth(ticker):
+    url = "/market/depth"
+
+    params = {"symbol": ticker, "depth": 5, "type": "step0"}
+    res = await async_request("GET", url, params=params)
+    return parse_depth(res)
+
+
+def parse_product_details(res, ticker):
+    res = [coin for coin in res["data"] if coin["sc"] == ticker][0]
+    return res
+
+
 def get_product_details(ticker):
     url = "/v2/settings/common/symbols"
 
     res = request("GET", url)
-    res = [coin for coin in res["data"] if coin["sc"] == ticker][0]
-    return res
+    return parse_product_details(res, ticker)
+
+
+async def async_get_product_details(ticker):
+    url = "/v2/settings/common/symbols"
+
+    res = await async_request("GET", url)
+    return parse_product_details(res, ticker)
@@ -1,8 +1,20 @@
 import logging
 import time
 
-from .htx_api import get_tickers, get_depth, get_product_details
-from .utils import request, sign_request
+from .htx_api import (
+    get_tickers,
+    get_depth,
+    get_product_details,
+    async_get_tickers,
+    async_get_depth,
+)
+from .utils import (
+    ACCOUNT_ID,
+    request,
+    sign_request,
+    async_request,
+    async_sign_request,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -25,10 +37,18 @@ class HtxAPI:
         tickers = get_tickers()
         return tickers
 
+    async def async_get_tickers(self):
+        tickers = await async_get_tickers()
+        return tickers
+
     def get_depth(self):
         asks, bids = get_depth(self.ticker)
         return asks, bids
 
+    async def async_get_depth(self):
+        asks, bids = await async_get_depth(self.ticker)
+        return asks, bids
+
     def get_product_details(self):
         product_details = get_product_details(self.ticker)
         price_precision = float(product_details["tpp"])
@@ -37,10 +57,7 @@ class HtxAPI:
         quantity_precision = 1 / 10**quantity_precision
         return price_precision, quantity_precision
 
-    def get_asset_details(self):
-        url = "/v2/reference/currencies"
-
-        res = request("GET", url)
+    def parse_asset_details(self, res):
         res = res["data"]
         details = {}
 
@@ -72,6 +89,18 @@ class HtxAPI:
 
         return details
 
+    def get_asset_details(self):
+        url = "/v2/reference/currencies"
+
+        res = request("GET", url)
+        return self.parse_asset_details(res)
+
+    async def async_get_asset_details(self):
+        url = "/v2/reference/currencies"
+
+        res = await async_request("GET", url)
+        return self.parse_asset_details(res)
+
     def get_accounts(self):
         url = "/v1/account/accounts"
         res = sign_request(self.public_key, self.private_key, "GET", url)
@@ -79,13 +108,18 @@ class HtxAPI:
         return balances
 
     def get_account_balance_function(self):
-        url = "/v1/account/accounts/32213981/balance"
+        url = f"/v1/account/accounts/{ACCOUNT_ID}/balance"
         res = sign_request(self.public_key, self.private_key, "GET", url)
         balances = res["data"]["list"]
         return balances
 
-    def get_account_balance(self, coins=None):
-        _balances = self.get_account_balance_function()
+    async def async_get_account_balance_function(self):
+        url = f"/v1/account/accounts/{ACCOUNT_ID}/balance"
+        res = await async_sign_request(self.public_key, self.private_key, "GET", url)
+        balances = res["data"]["list"]
+        return balances
+
+    def parse_account_balance(self, _balances, coins=None):
         account_balance = {}
 
         for balance in _balances:
@@ -130,39 +164,54 @@ class HtxAPI:
 
         return result
 
-    def create_limit_order(self, side, price, quantity):
-        url = "/v1/order/orders/place"
+    def get_account_balance(self, coins=None):
+        _balances = self.get_account_balance_function()
+        return self.parse_account_balance(_balances, coins)
 
-        data = {
-            "account-id": "32213981",
+    async def async_get_account_balance(self, coins=None):
+        _balances = await self.async_get_account_balance_function()
+        return self.parse_account_balance(_balances, coins)
+
+    def limit_order_data(self, side, price, quantity):
+        return {
+            "account-id": ACCOUNT_ID,
             "symbol": self.ticker,
             "type": "buy-limit" if side == "buy" else "sell-limit",
             "price": price,
             "amount": quantity,
         }
-        res = sign_request(self.public_key, self.private_key, "POST", url, data=data)
+
+    def parse_created_order(self, res):
         if res["status"] != "ok":
             return None, res
 
         return res["data"], res
 
-    def create_market_order(self, side, price, quantity):
-        pass
-
-    def get_order_status(self, order_id):
-        url = f"/v1/order/orders/{order_id}"
+    def create_limit_order(self, side, price, quantity):
+        url = "/v1/order/orders/place"
+        data = self.limit_order_data(side, price, quantity)
+        res = sign_request(self.public_key, self.private_key, "POST", url, data=data)
+        return self.parse_created_order(res)
 
-        res = sign_request(self.public_key, self.private_key, "GET", url)
+    async def async_create_limit_order(self, side, price, quantity):
+        url = "/v1/order/orders/place"
+        data = self.limit_order_data(side, price, quantity)
+        res = await async_sign_request(
+            self.public_key, self.private_key, "POST", url, data=data
+        )
+        return self.parse_created_order(res)
 
-        if res["status"] != "ok":
-            logger.error(f"HTX order status failed for order_id: {order_id}")
+    def create_market_order(self, side, price, quantity):
+        pass
 
-        res = res["data"]
+    def parse_order_status(self, order):
         try:
-            filled_price = float(res["field-cash-amount"]) / float(res["field-amount"])
+            filled_price = float(order["field-cash-amount"]) / float(
+                order["field-amount"]
+            )
         except ZeroDivisionError:
             filled_price = 0
-        filled_quantity = float(res["field-amount"])
+        filled_quantity = float(order["field-amount"])
 
         """
         {
@@ -181,18 +230,48 @@ class HtxAPI:
             },
         }
         """
-        return filled_price, filled_quantity, res
+        return filled_price, filled_quantity
 
-    def cancel_order(self, order_id):
-        url = f"/v1/order/orders/{order_id}/submitcancel"
+    def get_order_status(self, order_id):
+        url = f"/v1/order/orders/{order_id}"
 
-        res = sign_request(self.public_key, self.private_key, "POST", url)
+        res = sign_request(self.public_key, self.private_key, "GET", url)
+
+        if res["status"] != "ok":
+            logger.error(f"HTX order status failed for order_id: {order_id}")
+
+        res = res["data"]
+        return self.parse_order_status(res) + (res,)
+
+    async def async_get_order_status(self, order_id):
+        url = f"/v1/order/orders/{order_id}"
+
+        res = await async_sign_request(self.public_key, self.private_key, "GET", url)
+
+        if res["status"] != "ok":
+            logger.error(f"HTX order status failed for order_id: {order_id}")
+
+        res = res["data"]
+        return self.parse_order_status(res) + (res,)
 
+    def parse_cancelled_order(self, res):
         if res["status"] != "ok":
             return False, res
 
         return True, res
 
+    def cancel_order(self, order_id):
+        url = f"/v1/order/orders/{order_id}/submitcancel"
+
+        res = sign_request(self.public_key, self.private_key, "POST", url)
+        return self.parse_cancelled_order(res)
+
+    async def async_cancel_order(self, order_id):
+        url = f"/v1/order/orders/{order_id}/submitcancel"
+
+        res = await async_sign_request(self.public_key, self.private_key, "POST", url)
+        return self.parse_cancelled_order(res)
+
     def cancel_open_orders(self):
         url = "/v1/order/orders/batchCancelOpenOrders"
 
@@ -200,11 +279,7 @@ class HtxAPI:
         res = sign_request(self.public_key, self.private_key, "POST", url, params)
         return res
 
-    def get_deposits(self):
-        url = "/v1/query/deposit-withdraw"
-        params = {"type": "deposit"}
-        res = sign_request(self.public_key, self.private_key, "GET", url, params=params)
-
+    def parse_deposits(self, res):
         deposits = {}
         for deposit in res["data"]:
             coin = deposit["currency"].upper()
@@ -219,6 +294,20 @@ class HtxAPI:
 
         return deposits
 
+    def get_deposits(self):
+        url = "/v1/query/deposit-withdraw"
+        params = {"type": "deposit"}
+        res = sign_request(self.public_key, self.private_key, "GET", url, params=params)
+        return self.parse_deposits(res)
+
+    async def async_get_deposits(self):
+        url = "/v1/query/deposit-withdraw"
+        params = {"type": "deposit"}
+        res = await async_sign_request(
+            self.public_key, self.private_key, "GET", url, params=params
+        )
+        return self.parse_deposits(res)
+
     def get_deposit_adresses(self, chain):
         url = "/v2/account/deposit/address"
         params = {
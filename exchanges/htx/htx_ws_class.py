@@ -4,14 +4,37 @@ import json
 import traceback
 from uuid import uuid4
 import time
-import gzip
-import io
 
-from .utils import WS_HOST
+from exchanges import decoding
+from exchanges.inflate import inflate_gzip
+from exchanges.ws_subscriptions import DepthSubscriptionMixin, from_ms
+from exchanges.ws_supervisor import supervise
+from exchanges.ws_accounts import AccountStreamMixin
+
+from .utils import WS_HOST, WS_PRIVATE_HOST, ACCOUNT_ID, ws_auth_params
 from .htx_api_class import HtxAPI
 
+ACCOUNT_TOPIC = "accounts.update#2"
+
+
+def parse_depth(message):
+    """(topic, asks, bids, exchange time, version) of a depth frame or None"""
+    tick = message.get("tick")
+    if tick is None:
+        return None
+    return (
+        message["ch"],
+        tick["asks"],
+        tick["bids"],
+        from_ms(tick.get("ts") or message.get("ts")),
+        tick.get("version"),
+    )
+
+
+class HtxWS(DepthSubscriptionMixin, AccountStreamMixin):
+    max_subscriptions = 50
+    subscriptions_per_message = 1
 
-class HtxWS:
     def __init__(
         self, ticker=None, public_key=None, private_key=None, group=None, kyc=None
     ):
@@ -22,17 +45,32 @@ class HtxWS:
         self.private_key = private_key
         self.group = group
         self.kyc = kyc
+        self.init_subscriptions(ticker)
+
+    def depth_topic(self, ticker):
+        return f"market.{ticker.split('/')[0].lower()}usdt.depth.step0"
+
+    def subscription_message(self, topics, subscribe=True):
+        ws_connect_id = str(uuid4()).replace("-", "")
+        return json.dumps(
+            {"sub" if subscribe else "unsub": topics[0], "id": ws_connect_id}
+        )
 
     async def on_message(self, message, websocket, depth=None, balance=None):
-        compressed_data = gzip.GzipFile(fileobj=io.BytesIO(message), mode="rb")
-        decompressed_data = compressed_data.read()
-        message = decompressed_data.decode("utf-8")
-        message = json.loads(message)
+        message = decoding.loads(inflate_gzip(message))
         try:
-            if "tick" in message:
-                asks = message["tick"]["asks"]
-                bids = message["tick"]["bids"]
-                depth("Htx", asks, bids)
+            parsed = parse_depth(message)
+            if parsed and parsed[0] in self.topics:
+                topic, asks, bids, exchange_ts, seq = parsed
+                if self.in_sequence(topic, seq):
+                    depth(
+                        "Htx",
+                        asks,
+                        bids,
+                        ticker=self.topics[topic],
+                        exchange_ts=exchange_ts,
+                        seq=seq,
+                    )
             if "ping" in message:
                 pong = {"pong": message["ping"]}
                 await websocket.send(json.dumps(pong))
@@ -40,50 +78,83 @@ class HtxWS:
             print("Received message:", message)
 
     async def connect_public_websocket(self, depth=None):
-        ws_connect_id = str(uuid4()).replace("-", "")
-        params = json.dumps(
-            {
-                "sub": f"market.{self.tick.lower()}usdt.depth.step0",
-                "id": ws_connect_id,
-            }
-        )
+        async def session(health):
+            try:
+                async with websockets.connect(WS_HOST) as websocket:
+                    self.websocket = websocket
+                    await self.replay_subscriptions()
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_message(message, websocket, depth=depth)
+            finally:
+                self.websocket = None
+
+        await supervise("Htx depth stream", session)
+
+    async def on_account_message(self, message, balance, websocket):
+        message = decoding.loads(message)
+        self.received()
         try:
-            async with websockets.connect(WS_HOST) as websocket:
-                await websocket.send(params)
-                while True:
-                    message = await websocket.recv()
-                    await self.on_message(message, websocket, depth=depth)
-        except (
-            websockets.exceptions.ConnectionClosed,
-            websockets.exceptions.InvalidHandshake,
-        ):
-
-            print("Htx Connection closed, restarting...")
-            await self.connect_public_websocket(depth=depth)
-
-    async def fetch_account_balance(self, balance):
-        Htx = HtxAPI(
-            self.ticker, self.public_key, self.private_key, self.group, self.kyc
-        )
+            if message["action"] == "ping":
+                pong = {"action": "pong", "data": message["data"]}
+                await websocket.send(json.dumps(pong))
+            elif message["action"] == "req" and message["ch"] == "auth":
+                if message["code"] == 200:
+                    await websocket.send(
+                        json.dumps({"action": "sub", "ch": ACCOUNT_TOPIC})
+                    )
+                else:
+                    print("Received message:", message)
+            elif message["action"] == "sub" and message["code"] == 200:
+                self.account_subscribed()
+            elif message["action"] == "push" and message["ch"] == ACCOUNT_TOPIC:
+                data = message["data"]
+                if str(data.get("accountId")) != ACCOUNT_ID:
+                    return
+                total = float(data["balance"])
+                available = float(data["available"])
+                self.update_balance(data["currency"], available, total - available)
+                self.publish_balances("Htx", balance)
+        except:
+            print("Received message:", message)
 
-        while True:
-            try:
-                self.account_balance = Htx.get_account_balance()
-                balance("Htx", self.kyc, self.account_balance)
-                await asyncio.sleep(0.5)
-            except:
-                await asyncio.sleep(3)
+    async def connect_private_websocket(self, Htx, balance=None):
+        async def session(health):
+            async with websockets.connect(WS_PRIVATE_HOST) as websocket:
+                # Htx pings us every few seconds
+                keepalive = asyncio.create_task(self.keepalive("Htx", websocket))
+                try:
+                    await websocket.send(
+                        ws_auth_params(self.public_key, self.private_key)
+                    )
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_account_message(message, balance, websocket)
+                finally:
+                    keepalive.cancel()
+
+        await supervise("Htx account stream", session)
 
     async def main(self, depth=None, balance=None):
+        tasks = []
         if depth:
-            tasks = [
-                self.connect_public_websocket(depth),
-            ]
+            tasks.append(self.connect_public_websocket(depth))
 
         if balance:
-            tasks = [
-                self.fetch_account_balance(balance),
-            ]
+            Htx = HtxAPI(
+                self.ticker, self.public_key, self.private_key, self.group, self.kyc
+            )
+            self.init_account_stream()
+            tasks.extend(
+                [
+                    self.connect_private_websocket(Htx, balance),
+                    self.reconcile_balances("Htx", Htx, balance),
+                ]
+            )
+        if not tasks:
+            raise ValueError("Pass depth or balance to start a stream")
         await asyncio.gather(*tasks)
 
 
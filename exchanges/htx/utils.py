@@ -1,4 +1,4 @@
-import requests
+from exchanges import aio, sessions
 import json
 import base64
 from uuid import uuid1
@@ -8,10 +8,13 @@ import hmac
 import urllib.parse
 
 HOST = "https://api.huobi.pro"
+EXCHANGE = "Htx"  # Rate limit buckets
 WS_HOST = "wss://api.huobi.pro/ws"
+WS_PRIVATE_HOST = "wss://api.huobi.pro/ws/v2"
+ACCOUNT_ID = "32213981"  # Spot account the bots trade with
 
 
-def sign_request(public_key, private_key, method, path, params={}, data={}):
+def prepare_sign_request(public_key, private_key, method, path, params={}, data={}):
     params.update(
         {
             "AccessKeyId": public_key,
@@ -39,15 +42,52 @@ def sign_request(public_key, private_key, method, path, params={}, data={}):
     }
 
     if method == "GET":
-        res = requests.request(method, url, headers=headers)
-    else:
-        res = requests.request(method, url, headers=headers, json=data)
+        return url, {"headers": headers}
+    return url, {"headers": headers, "json": data}
+
+
+def ws_auth_params(public_key, private_key):
+    params = {
+        "accessKey": public_key,
+        "signatureMethod": "HmacSHA256",
+        "signatureVersion": "2.1",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime()),
+    }
+    encoded_params = urllib.parse.urlencode(sorted(params.items()))
+    pre_signed_text = f"GET\napi.huobi.pro\n/ws/v2\n{encoded_params}"
+    digest = hmac.new(
+        private_key.encode("utf-8"), pre_signed_text.encode("utf-8"), hashlib.sha256
+    ).digest()
+    params["signature"] = base64.b64encode(digest).decode("utf-8")
+    params["authType"] = "api"
+    return json.dumps({"action": "req", "ch": "auth", "params": params})
+
+
+def sign_request(public_key, private_key, method, path, params={}, data={}):
+    url, kwargs = prepare_sign_request(
+        public_key, private_key, method, path, params, data
+    )
+    res = sessions.request(method, url, rate_limit=(EXCHANGE, public_key), **kwargs)
+    return parse_response(res)
+
+
+async def async_sign_request(public_key, private_key, method, path, params={}, data={}):
+    url, kwargs = prepare_sign_request(
+        public_key, private_key, method, path, params, data
+    )
+    res = await aio.request(method, url, rate_limit=(EXCHANGE, public_key), **kwargs)
     return parse_response(res)
 
 
 def request(method, url, params=None):
     url = "{}{}".format(HOST, url)
-    res = requests.request(method, url, params=params)
+    res = sessions.request(method, url, params=params, rate_limit=(EXCHANGE, None))
+    return parse_response(res)
+
+
+async def async_request(method, url, params=None):
+    url = "{}{}".format(HOST, url)
+    res = await aio.request(method, url, params=params, rate_limit=(EXCHANGE, None))
     return parse_response(res)
 
 
@@ -0,0 +1,19 @@
+"""Decompression of gzip and raw deflate websocket frames
+
+Htx, BingX and Bitmart compress every frame as a stream of its own, there
+is no dictionary or window to carry from one frame to the next. Each frame
+goes straight to zlib.decompress, which skips the GzipFile / BytesIO or
+decompressobj set up per frame and decodes into a single output buffer.
+"""
+import zlib
+
+GZIP = 16 + zlib.MAX_WBITS
+DEFLATE = -zlib.MAX_WBITS  # Raw deflate, no header or checksum
+
+
+def inflate_gzip(data):
+    return zlib.decompress(data, GZIP)
+
+
+def inflate_deflate(data):
+    return zlib.decompress(data, DEFLATE)
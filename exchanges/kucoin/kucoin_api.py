@@ -1,17 +1,26 @@
-from .utils import request
+from .utils import request, async_request
+
+
+def parse_product_details(res, ticker):
+    res = [coin for coin in res["data"] if coin["symbol"] == ticker][0]
+    return res
 
 
 def get_product_details(ticker):
     url = "/api/v2/symbols"
 
     res = request("GET", url)
-    res = [coin for coin in res["data"] if coin["symbol"] == ticker][0]
-    return res
+    return parse_product_details(res, ticker)
 
 
-def get_tickers():
-    url = "/api/v1/market/allTickers"
-    res = request("GET", url)
+async def async_get_product_details(ticker):
+    url = "/api/v2/symbols"
+
+    res = await async_request("GET", url)
+    return parse_product_details(res, ticker)
+
+
+def parse_tickers(res):
     res = res["data"]["ticker"]
 
     tickers = {}
@@ -36,12 +45,36 @@ def get_tickers():
     return tickers
 
 
+def get_tickers():
+    url = "/api/v1/market/allTickers"
+    res = request("GET", url)
+    return parse_tickers(res)
+
+
+async def async_get_tickers():
+    url = "/api/v1/market/allTickers"
+    res = await async_request("GET", url)
+    return parse_tickers(res)
+
+
+def parse_depth(res):
+    asks = res["data"]["asks"]
+    bids = res["data"]["bids"]
+
+    return asks, bids
+
+
 def get_depth(ticker):
     url = "/api/v1/market/orderbook/level2_20"
 
     params = {"symbol": ticker}
     res = request("GET", url, params=params)
-    asks = res["data"]["asks"]
-    bids = res["data"]["bids"]
+    return parse_depth(res)
 
-    return asks, bids
+
+async def async_get_depth(ticker):
+    url = "/api/v1/market/orderbook/level2_20"
+
+    params = {"symbol": ticker}
+    res = await async_request("GET", url, params=params)
+    return parse_depth(res)
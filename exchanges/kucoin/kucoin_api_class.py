@@ -1,7 +1,13 @@
 from uuid import uuid1
 
-from .utils import sign_request, request
-from .kucoin_api import get_product_details, get_tickers, get_depth
+from .utils import sign_request, request, async_sign_request
+from .kucoin_api import (
+    get_product_details,
+    get_tickers,
+    get_depth,
+    async_get_tickers,
+    async_get_depth,
+)
 
 
 class KucoinAPI:
@@ -22,20 +28,26 @@ class KucoinAPI:
         tickers = get_tickers()
         return tickers
 
+    async def async_get_tickers(self):
+        tickers = await async_get_tickers()
+        return tickers
+
     def get_depth(self):
         asks, bids = get_depth(self.ticker)
         return asks, bids
 
+    async def async_get_depth(self):
+        asks, bids = await async_get_depth(self.ticker)
+        return asks, bids
+
     def get_product_details(self):
         product_details = get_product_details(self.ticker)
         price_precision = float(product_details["priceIncrement"])
         quantity_precision = product_details["baseIncrement"]
         return price_precision, quantity_precision
 
-    def create_limit_order(self, side, price, quantity):
-        url = "/api/v1/orders"
-
-        params = {
+    def limit_order_params(self, side, price, quantity):
+        return {
             "clientOid": "".join([each for each in str(uuid1()).split("-")]),
             "symbol": self.ticker,
             "side": "buy" if side == "buy" else "sell",
@@ -43,15 +55,29 @@ class KucoinAPI:
             "price": str(price),
             "size": str(quantity),
         }
-        res = sign_request(
-            self.public_key, self.private_key, self.group, "POST", url, params
-        )
 
+    def parse_created_order(self, res):
         if res["code"] != "200000":
             return None, res
 
         return res["data"]["orderId"], res
 
+    def create_limit_order(self, side, price, quantity):
+        url = "/api/v1/orders"
+        params = self.limit_order_params(side, price, quantity)
+        res = sign_request(
+            self.public_key, self.private_key, self.group, "POST", url, params
+        )
+        return self.parse_created_order(res)
+
+    async def async_create_limit_order(self, side, price, quantity):
+        url = "/api/v1/orders"
+        params = self.limit_order_params(side, price, quantity)
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "POST", url, params
+        )
+        return self.parse_created_order(res)
+
     def create_market_order(self, side, price, quantity):
         url = "/api/v1/orders"
 
@@ -71,16 +97,12 @@ class KucoinAPI:
 
         return res["data"]["orderId"], res
 
-    def get_order_status(self, order_id):
-        url = f"/api/v1/orders/{order_id}"
-
-        res = sign_request(self.public_key, self.private_key, self.group, "GET", url)
-        res = res["data"]
+    def parse_order_status(self, order):
         try:
-            filled_price = float(res["dealFunds"]) / float(res["dealSize"])
+            filled_price = float(order["dealFunds"]) / float(order["dealSize"])
         except ZeroDivisionError:
             filled_price = 0
-        filled_quantity = float(res["dealSize"])
+        filled_quantity = float(order["dealSize"])
 
         """
         Doğru fiyat dealFunds / dealSize
@@ -93,26 +115,59 @@ class KucoinAPI:
         'side': 'SELL'}
         """
 
-        return filled_price, filled_quantity, res
+        return filled_price, filled_quantity
 
-    def cancel_order(self, order_id):
+    def get_order_status(self, order_id):
         url = f"/api/v1/orders/{order_id}"
 
-        res = sign_request(self.public_key, self.private_key, self.group, "DELETE", url)
+        res = sign_request(self.public_key, self.private_key, self.group, "GET", url)
+        res = res["data"]
+        return self.parse_order_status(res) + (res,)
+
+    async def async_get_order_status(self, order_id):
+        url = f"/api/v1/orders/{order_id}"
+
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "GET", url
+        )
+        res = res["data"]
+        return self.parse_order_status(res) + (res,)
 
+    def parse_cancelled_order(self, res):
         if res["code"] != "200000":
             return False, res
 
         return True, res
 
+    def cancel_order(self, order_id):
+        url = f"/api/v1/orders/{order_id}"
+
+        res = sign_request(self.public_key, self.private_key, self.group, "DELETE", url)
+        return self.parse_cancelled_order(res)
+
+    async def async_cancel_order(self, order_id):
+        url = f"/api/v1/orders/{order_id}"
+
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "DELETE", url
+        )
+        return self.parse_cancelled_order(res)
+
     def get_account_balance_function(self):
         url = "/api/v1/accounts"
         res = sign_request(self.public_key, self.private_key, self.group, "GET", url)
         balances = res["data"]
         return balances
 
-    def get_account_balance(self, coins=None):
-        _balances = self.get_account_balance_function()
+    async def async_get_account_balance_function(self):
+        url = "/api/v1/accounts"
+        res = await async_sign_request(
+            self.public_key, self.private_key, self.group, "GET", url
+        )
+        balances = res["data"]
+        return balances
+
+    def parse_account_balance(self, _balances, coins=None):
         account_balance = {}
 
         for balance in _balances:
@@ -151,6 +206,14 @@ class KucoinAPI:
 
         return result
 
+    def get_account_balance(self, coins=None):
+        _balances = self.get_account_balance_function()
+        return self.parse_account_balance(_balances, coins)
+
+    async def async_get_account_balance(self, coins=None):
+        _balances = await self.async_get_account_balance_function()
+        return self.parse_account_balance(_balances, coins)
+
     def create_ws_listen_key(self):
         url = "/api/v1/bullet-private"
         res = sign_request(self.public_key, self.private_key, self.group, "POST", url)
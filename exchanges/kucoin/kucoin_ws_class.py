@@ -5,10 +5,34 @@ import traceback
 from uuid import uuid4
 import time
 
+from exchanges import decoding
+from exchanges.ws_subscriptions import DepthSubscriptionMixin, from_ms
+from exchanges.ws_supervisor import supervise
+from exchanges.ws_accounts import AccountStreamMixin
+from exchanges.ws_orders import OrderStreamMixin
 from exchanges.kucoin.kucoin_api_class import KucoinAPI
 
+DEPTH_TOPIC = "/spotMarket/level2Depth5"
+ORDER_TOPIC = "/spotMarket/tradeOrdersV2"
+ACCOUNT_TOPIC = "/account/balance"
+
+
+def parse_depth(message):
+    """(topic, asks, bids, exchange time, None) of a depth frame or None
+
+    level2Depth5 pushes are whole snapshots without a sequence number.
+    """
+    topic = message["topic"]
+    if "Depth" not in topic:
+        return None
+    data = message["data"]
+    return topic, data["asks"], data["bids"], from_ms(data.get("timestamp")), None
+
+
+class KucoinWS(DepthSubscriptionMixin, OrderStreamMixin, AccountStreamMixin):
+    max_subscriptions = 300
+    subscriptions_per_message = 100
 
-class KucoinWS:
     def __init__(
         self, ticker=None, public_key=None, private_key=None, group=None, kyc=None
     ):
@@ -19,69 +43,197 @@ class KucoinWS:
         self.private_key = private_key
         self.group = group
         self.kyc = kyc
+        self.init_subscriptions(ticker)
+        self.init_order_stream()
 
-    async def on_message(self, message, depth=None, balance=None):
-        message = json.loads(message)
-        try:
-            if "Depth" in message["topic"]:
-                asks = message["data"]["asks"]
-                bids = message["data"]["bids"]
-                depth("Kucoin", asks, bids)
-        except:
-            print("Received message:", message)
+    def depth_topic(self, ticker):
+        return f"{DEPTH_TOPIC}:{ticker.split('/')[0]}-USDT"
 
-    async def connect_public_websocket(self, depth=None):
-        Kucoin = KucoinAPI(
-            self.ticker, self.public_key, self.private_key, self.group, self.kyc
-        )
-        token, endpoint = Kucoin.create_ws_listen_key()
-        ws_connect_id = str(uuid4()).replace("-", "")
-        ws_endpoint = f"{endpoint}?token={token}&connectId={ws_connect_id}"
-
-        params = json.dumps(
+    def subscription_message(self, topics, subscribe=True):
+        symbols = ",".join(topic.split(":")[1] for topic in topics)
+        return json.dumps(
             {
                 "id": str(int(time.time() * 1000)),
-                "type": "subscribe",
-                "topic": f"/spotMarket/level2Depth5:{self.tick}-USDT",
+                "type": "subscribe" if subscribe else "unsubscribe",
+                "topic": f"{DEPTH_TOPIC}:{symbols}",
                 "privateChannel": False,
                 "response": True,
             }
         )
+
+    async def on_message(self, message, depth=None, balance=None):
+        message = decoding.loads(message)
         try:
-            async with websockets.connect(ws_endpoint) as websocket:
-                await websocket.send(params)
-                while True:
-                    message = await websocket.recv()
-                    await self.on_message(message, depth=depth)
-        except (
-            websockets.exceptions.ConnectionClosed,
-            websockets.exceptions.InvalidHandshake,
-        ):
-
-            print("Kucoin Connection closed, restarting...")
-            await self.connect_public_websocket(depth=depth)
-
-    async def fetch_account_balance(self, balance):
-        Kucoin = KucoinAPI(
-            self.ticker, self.public_key, self.private_key, self.group, self.kyc
-        )
+            parsed = parse_depth(message)
+            if parsed and parsed[0] in self.topics:
+                topic, asks, bids, exchange_ts, seq = parsed
+                if self.in_sequence(topic, exchange_ts):
+                    depth(
+                        "Kucoin",
+                        asks,
+                        bids,
+                        ticker=self.topics[topic],
+                        exchange_ts=exchange_ts,
+                        seq=seq,
+                    )
+        except:
+            print("Received message:", message)
+
+    async def connect_public_websocket(self, depth=None):
+        async def session(health):
+            Kucoin = KucoinAPI(
+                self.ticker, self.public_key, self.private_key, self.group, self.kyc
+            )
+            token, endpoint = Kucoin.create_ws_listen_key()
+            ws_connect_id = str(uuid4()).replace("-", "")
+            ws_endpoint = f"{endpoint}?token={token}&connectId={ws_connect_id}"
 
-        while True:
             try:
-                self.account_balance = Kucoin.get_account_balance()
-                balance("Kucoin", self.kyc, self.account_balance)
-                await asyncio.sleep(0.2)
-            except:
-                await asyncio.sleep(3)
+                async with websockets.connect(ws_endpoint) as websocket:
+                    self.websocket = websocket
+                    await self.replay_subscriptions()
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_message(message, depth=depth)
+            finally:
+                self.websocket = None
+
+        await supervise("Kucoin depth stream", session)
+
+    async def on_order_message(self, message, order):
+        message = decoding.loads(message)
+        self.received()
+        try:
+            if message["type"] == "ack" and message["id"] == self.order_subscription_id:
+                self.order_subscribed()
+            elif message["type"] == "message" and message["topic"] == ORDER_TOPIC:
+                data = message["data"]
+                order_id = data["orderId"]
+                if data["type"] == "match":  # Pushes carry no cumulative funds
+                    self.order_quotes[order_id] = self.order_quotes.get(
+                        order_id, 0
+                    ) + float(data["matchPrice"]) * float(data["matchSize"])
+
+                quote = self.order_quotes.get(order_id, 0)
+                if data["status"] == "done":
+                    self.order_quotes.pop(order_id, None)
+                fill = self.order_fill(
+                    order_id, data.get("filledSize"), quote, data["type"]
+                )
+                order("Kucoin", self.kyc, self.connected_at, [fill])
+        except:
+            print("Received message:", message)
+
+    async def connect_order_websocket(self, order):
+        async def session(health):
+            Kucoin = KucoinAPI(
+                self.ticker, self.public_key, self.private_key, self.group, self.kyc
+            )
+            token, endpoint = Kucoin.create_ws_listen_key()
+            ws_connect_id = str(uuid4()).replace("-", "")
+            ws_endpoint = f"{endpoint}?token={token}&connectId={ws_connect_id}"
+            self.order_subscription_id = str(int(time.time() * 1000))
+            params = json.dumps(
+                {
+                    "id": self.order_subscription_id,
+                    "type": "subscribe",
+                    "topic": ORDER_TOPIC,
+                    "privateChannel": True,
+                    "response": True,
+                }
+            )
+            self.order_quotes = {}  # orderId -> filled funds
+            self.init_order_stream()
+            async with websockets.connect(ws_endpoint) as websocket:
+                heartbeat = asyncio.create_task(
+                    self.order_heartbeat(
+                        "Kucoin",
+                        websocket,
+                        order,
+                        ping=json.dumps({"id": ws_connect_id, "type": "ping"}),
+                    )
+                )
+                try:
+                    await websocket.send(params)
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_order_message(message, order)
+                finally:
+                    heartbeat.cancel()
 
-    async def main(self, depth=None, balance=None):
+        await supervise("Kucoin order stream", session)
+
+    async def on_account_message(self, message, balance):
+        message = decoding.loads(message)
+        self.received()
+        try:
+            if (
+                message["type"] == "ack"
+                and message["id"] == self.account_subscription_id
+            ):
+                self.account_subscribed()
+            elif message["type"] == "message" and message["topic"] == ACCOUNT_TOPIC:
+                data = message["data"]
+                self.update_balance(data["currency"], data["available"], data["hold"])
+                self.publish_balances("Kucoin", balance)
+        except:
+            print("Received message:", message)
+
+    async def connect_private_websocket(self, Kucoin, balance=None):
+        async def session(health):
+            token, endpoint = Kucoin.create_ws_listen_key()
+            ws_connect_id = str(uuid4()).replace("-", "")
+            ws_endpoint = f"{endpoint}?token={token}&connectId={ws_connect_id}"
+            self.account_subscription_id = str(int(time.time() * 1000))
+            params = json.dumps(
+                {
+                    "id": self.account_subscription_id,
+                    "type": "subscribe",
+                    "topic": ACCOUNT_TOPIC,
+                    "privateChannel": True,
+                    "response": True,
+                }
+            )
+            async with websockets.connect(ws_endpoint) as websocket:
+                keepalive = asyncio.create_task(
+                    self.keepalive(
+                        "Kucoin",
+                        websocket,
+                        ping=json.dumps({"id": ws_connect_id, "type": "ping"}),
+                    )
+                )
+                try:
+                    await websocket.send(params)
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_account_message(message, balance)
+                finally:
+                    keepalive.cancel()
+
+        await supervise("Kucoin account stream", session)
+
+    async def main(self, depth=None, balance=None, order=None):
+        tasks = []
         if depth:
-            tasks = [
-                self.connect_public_websocket(depth),
-            ]
+            tasks.append(self.connect_public_websocket(depth))
 
         if balance:
-            tasks = [
-                self.fetch_account_balance(balance),
-            ]
+            Kucoin = KucoinAPI(
+                self.ticker, self.public_key, self.private_key, self.group, self.kyc
+            )
+            self.init_account_stream()
+            tasks.extend(
+                [
+                    self.connect_private_websocket(Kucoin, balance),
+                    self.reconcile_balances("Kucoin", Kucoin, balance),
+                ]
+            )
+
+        if order:
+            tasks.append(self.connect_order_websocket(order))
+        if not tasks:
+            raise ValueError("Pass depth, balance or order to start a stream")
         await asyncio.gather(*tasks)
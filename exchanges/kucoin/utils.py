@@ -1,4 +1,4 @@
-import requests
+from exchanges import aio, sessions
 import json
 import base64
 from uuid import uuid1
@@ -7,9 +7,10 @@ import hashlib
 import hmac
 
 HOST = "https://api.kucoin.com"
+EXCHANGE = "Kucoin"  # Rate limit buckets
 
 
-def sign_request(public_key, private_key, group, method, url, params=None):
+def prepare_sign_request(public_key, private_key, group, method, url, params=None):
     now = int(time.time() * 1000)
 
     str_to_sign = str(now) + method + url
@@ -38,13 +39,34 @@ def sign_request(public_key, private_key, group, method, url, params=None):
     if params:
         headers["Content-Type"] = "application/json"
 
-    res = requests.request(method, HOST + url, data=data, headers=headers)
+    return HOST + url, {"data": data, "headers": headers}
+
+
+def sign_request(public_key, private_key, group, method, url, params=None):
+    url, kwargs = prepare_sign_request(
+        public_key, private_key, group, method, url, params
+    )
+    res = sessions.request(method, url, rate_limit=(EXCHANGE, public_key), **kwargs)
+    return parse_response(res)
+
+
+async def async_sign_request(public_key, private_key, group, method, url, params=None):
+    url, kwargs = prepare_sign_request(
+        public_key, private_key, group, method, url, params
+    )
+    res = await aio.request(method, url, rate_limit=(EXCHANGE, public_key), **kwargs)
     return parse_response(res)
 
 
 def request(method, url, params=None):
     url = "{}{}".format(HOST, url)
-    res = requests.request(method, url, params=params)
+    res = sessions.request(method, url, params=params, rate_limit=(EXCHANGE, None))
+    return parse_response(res)
+
+
+async def async_request(method, url, params=None):
+    url = "{}{}".format(HOST, url)
+    res = await aio.request(method, url, params=params, rate_limit=(EXCHANGE, None))
     return parse_response(res)
 
 
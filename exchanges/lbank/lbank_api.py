@@ -1,9 +1,7 @@
-from .utils import request
+from .utils import request, async_request
 
 
-def get_tickers():
-    url = "/v2/ticker/24hr.do?symbol=all"
-    res = request("GET", url)
+def parse_tickers(res):
     res = res["data"]
 
     tickers = {}
@@ -24,3 +22,15 @@ def get_tickers():
             tickers[symbol]["rate"] = float(_ticker["ticker"]["change"]) / 100
 
     return tickers
+
+
+def get_tickers():
+    url = "/v2/ticker/24hr.do?symbol=all"
+    res = request("GET", url)
+    return parse_tickers(res)
+
+
+async def async_get_tickers():
+    url = "/v2/ticker/24hr.do?symbol=all"
+    res = await async_request("GET", url)
+    return parse_tickers(res)
@@ -1,4 +1,9 @@
-from .utils import request
+from .utils import request, async_request
+
+
+def parse_mexc_product_details(res):
+    res = res["symbols"][0]
+    return res
 
 
 def get_mexc_product_details(ticker):
@@ -6,14 +11,18 @@ def get_mexc_product_details(ticker):
 
     params = {"symbol": ticker}
     res = request("GET", url, params=params)
-    res = res["symbols"][0]
-    return res
+    return parse_mexc_product_details(res)
 
 
-def get_mexc_tickers():
-    url = "/api/v3/ticker/24hr"
-    res = request("GET", url)
+async def async_get_mexc_product_details(ticker):
+    url = "/api/v3/exchangeInfo"
+
+    params = {"symbol": ticker}
+    res = await async_request("GET", url, params=params)
+    return parse_mexc_product_details(res)
+
 
+def parse_mexc_tickers(res):
     tickers = {}
 
     denominator = "USDT"
@@ -32,21 +41,56 @@ def get_mexc_tickers():
     return tickers
 
 
+def get_mexc_tickers():
+    url = "/api/v3/ticker/24hr"
+    res = request("GET", url)
+    return parse_mexc_tickers(res)
+
+
+async def async_get_mexc_tickers():
+    url = "/api/v3/ticker/24hr"
+    res = await async_request("GET", url)
+    return parse_mexc_tickers(res)
+
+
+def parse_mexc_depth(res):
+    asks = res["asks"]
+    bids = res["bids"]
+
+    return asks, bids
+
+
 def get_mexc_depth(ticker):
     url = "/api/v3/depth"
 
     params = {"symbol": ticker}
     res = request("GET", url, params=params)
-    asks = res["asks"]
-    bids = res["bids"]
+    return parse_mexc_depth(res)
 
-    return asks, bids
+
+async def async_get_mexc_depth(ticker):
+    url = "/api/v3/depth"
+
+    params = {"symbol": ticker}
+    res = await async_request("GET", url, params=params)
+    return parse_mexc_depth(res)
+
+
+def parse_allowed_symbols(res):
+    res = res["data"]
+
+    return res
 
 
 def get_allowed_symbols():
     url = "/api/v3/defaultSymbols"
 
     res = request("GET", url)
-    res = res["data"]
+    return parse_allowed_symbols(res)
 
-    return res
+
+async def async_get_allowed_symbols():
+    url = "/api/v3/defaultSymbols"
+
+    res = await async_request("GET", url)
+    return parse_allowed_symbols(res)
@@ -1,11 +1,13 @@
 import logging
 
-from .utils import sign_request, request
+from .utils import sign_request, request, async_sign_request
 from .mexc_api import (
     get_mexc_tickers,
     get_mexc_depth,
     get_mexc_product_details,
     get_allowed_symbols,
+    async_get_mexc_tickers,
+    async_get_mexc_depth,
 )
 from tenacity import retry, stop, wait
 
@@ -29,10 +31,18 @@ class MexcAPI:
         tickers = get_mexc_tickers()
         return tickers
 
+    async def async_get_tickers(self):
+        tickers = await async_get_mexc_tickers()
+        return tickers
+
     def get_depth(self):
         asks, bids = get_mexc_depth(self.ticker)
         return asks, bids
 
+    async def async_get_depth(self):
+        asks, bids = await async_get_mexc_depth(self.ticker)
+        return asks, bids
+
     def get_product_details(self):
         product_details = get_mexc_product_details(self.ticker)
         price_precision = product_details["quotePrecision"]
@@ -41,10 +51,7 @@ class MexcAPI:
         quantity_precision = 1 / 10**quantity_precision
         return price_precision, quantity_precision
 
-    def get_asset_details(self):
-        url = "/api/v3/capital/config/getall"
-
-        res = sign_request(self.public_key, self.private_key, "GET", url)
+    def parse_asset_details(self, res):
         details = {}
 
         for asset in res:
@@ -67,27 +74,51 @@ class MexcAPI:
 
         return details
 
+    def get_asset_details(self):
+        url = "/api/v3/capital/config/getall"
+
+        res = sign_request(self.public_key, self.private_key, "GET", url)
+        return self.parse_asset_details(res)
+
+    async def async_get_asset_details(self):
+        url = "/api/v3/capital/config/getall"
+
+        res = await async_sign_request(self.public_key, self.private_key, "GET", url)
+        return self.parse_asset_details(res)
+
     def is_ticker_allowed(self):
         symbols = get_allowed_symbols()
         return self.ticker in symbols
 
-    def create_limit_order(self, side, price, quantity):
-        url = "/api/v3/order"
-
-        params = {
+    def limit_order_params(self, side, price, quantity):
+        return {
             "symbol": self.ticker,
             "side": "BUY" if side == "buy" else "SELL",
             "type": "LIMIT",
             "price": price,
             "quantity": quantity,
         }
-        res = sign_request(self.public_key, self.private_key, "POST", url, params)
 
+    def parse_created_order(self, res):
         if "orderId" not in res:
             return None, res
 
         return res["orderId"], res
 
+    def create_limit_order(self, side, price, quantity):
+        url = "/api/v3/order"
+        params = self.limit_order_params(side, price, quantity)
+        res = sign_request(self.public_key, self.private_key, "POST", url, params)
+        return self.parse_created_order(res)
+
+    async def async_create_limit_order(self, side, price, quantity):
+        url = "/api/v3/order"
+        params = self.limit_order_params(side, price, quantity)
+        res = await async_sign_request(
+            self.public_key, self.private_key, "POST", url, params
+        )
+        return self.parse_created_order(res)
+
     def create_market_order(self, side, price, quantity):
         url = "/api/v3/order"
 
@@ -108,20 +139,17 @@ class MexcAPI:
 
         return res["orderId"], res
 
-    @retry(stop=stop.stop_after_attempt(2), wait=wait.wait_fixed(0.7))
-    def get_order_status(self, order_id):
-        url = "/api/v3/order"
-
-        params = {"symbol": self.ticker, "orderId": order_id}
-        res = sign_request(self.public_key, self.private_key, "GET", url, params)
+    def parse_order_status(self, order):
         try:
-            filled_price = float(res["cummulativeQuoteQty"]) / float(res["executedQty"])
-            filled_quantity = float(res["executedQty"])
+            filled_price = float(order["cummulativeQuoteQty"]) / float(
+                order["executedQty"]
+            )
+            filled_quantity = float(order["executedQty"])
         except ZeroDivisionError:
             filled_price = 0
             filled_quantity = 0
         except KeyError:
-            logger.error(f"Error in mexc get_order_status: {res}")
+            logger.error(f"Error in mexc get_order_status: {order}")
             raise Exception("Error in mexc get_order_status: Try Again")
 
         """
@@ -135,27 +163,61 @@ class MexcAPI:
         'side': 'SELL'}
         """
 
-        return filled_price, filled_quantity, res
+        return filled_price, filled_quantity
 
-    def cancel_order(self, order_id):
+    @retry(stop=stop.stop_after_attempt(2), wait=wait.wait_fixed(0.7))
+    def get_order_status(self, order_id):
         url = "/api/v3/order"
 
         params = {"symbol": self.ticker, "orderId": order_id}
-        res = sign_request(self.public_key, self.private_key, "DELETE", url, params)
+        res = sign_request(self.public_key, self.private_key, "GET", url, params)
+        return self.parse_order_status(res) + (res,)
+
+    @retry(stop=stop.stop_after_attempt(2), wait=wait.wait_fixed(0.7))
+    async def async_get_order_status(self, order_id):
+        url = "/api/v3/order"
 
+        params = {"symbol": self.ticker, "orderId": order_id}
+        res = await async_sign_request(
+            self.public_key, self.private_key, "GET", url, params
+        )
+        return self.parse_order_status(res) + (res,)
+
+    def parse_cancelled_order(self, res):
         if "code" in res:
             return False, res
 
         return True, res
 
+    def cancel_order(self, order_id):
+        url = "/api/v3/order"
+
+        params = {"symbol": self.ticker, "orderId": order_id}
+        res = sign_request(self.public_key, self.private_key, "DELETE", url, params)
+        return self.parse_cancelled_order(res)
+
+    async def async_cancel_order(self, order_id):
+        url = "/api/v3/order"
+
+        params = {"symbol": self.ticker, "orderId": order_id}
+        res = await async_sign_request(
+            self.public_key, self.private_key, "DELETE", url, params
+        )
+        return self.parse_cancelled_order(res)
+
     def get_account_balance_function(self):
         url = "/api/v3/account"
         res = sign_request(self.public_key, self.private_key, "GET", url)
         balances = res["balances"]
         return balances
 
-    def get_account_balance(self, coins=None):
-        _balances = self.get_account_balance_function()
+    async def async_get_account_balance_function(self):
+        url = "/api/v3/account"
+        res = await async_sign_request(self.public_key, self.private_key, "GET", url)
+        balances = res["balances"]
+        return balances
+
+    def parse_account_balance(self, _balances, coins=None):
         account_balance = {}
 
         for balance in _balances:
@@ -191,6 +253,14 @@ class MexcAPI:
 
         return result
 
+    def get_account_balance(self, coins=None):
+        _balances = self.get_account_balance_function()
+        return self.parse_account_balance(_balances, coins)
+
+    async def async_get_account_balance(self, coins=None):
+        _balances = await self.async_get_account_balance_function()
+        return self.parse_account_balance(_balances, coins)
+
     def create_ws_listen_key(self):
         url = "/api/v3/userDataStream"
         res = sign_request(self.public_key, self.private_key, "POST", url)
@@ -198,15 +268,20 @@ class MexcAPI:
 
         return listen_key
 
+    def extend_ws_listen_key(self, listen_key):
+        url = "/api/v3/userDataStream"
+        params = {"listenKey": listen_key}
+        res = sign_request(self.public_key, self.private_key, "PUT", url, params)
+
+        return res
+
     def cancel_open_orders(self):
         url = "/api/v3/openOrders"
         params = {"symbol": self.ticker}
         res = sign_request(self.public_key, self.private_key, "DELETE", url, params)
         return res
 
-    def get_deposits(self):
-        url = "/api/v3/capital/deposit/hisrec"
-        res = sign_request(self.public_key, self.private_key, "GET", url)
+    def parse_deposits(self, res):
         deposits = {}
         for deposit in res:
             coin = deposit["coin"]
@@ -221,11 +296,26 @@ class MexcAPI:
 
         return deposits
 
+    def get_deposits(self):
+        url = "/api/v3/capital/deposit/hisrec"
+        res = sign_request(self.public_key, self.private_key, "GET", url)
+        return self.parse_deposits(res)
+
+    async def async_get_deposits(self):
+        url = "/api/v3/capital/deposit/hisrec"
+        res = await async_sign_request(self.public_key, self.private_key, "GET", url)
+        return self.parse_deposits(res)
+
     def get_withdrawals(self):
         url = "/api/v3/capital/withdraw/history"
         res = sign_request(self.public_key, self.private_key, "GET", url)
         return res
 
+    async def async_get_withdrawals(self):
+        url = "/api/v3/capital/withdraw/history"
+        res = await async_sign_request(self.public_key, self.private_key, "GET", url)
+        return res
+
     def get_withdraw_adresses(self):
         url = "/api/v3/capital/withdraw/address"
         res = sign_request(self.public_key, self.private_key, "GET", url)
@@ -2,12 +2,42 @@ import asyncio
 import websockets
 import json
 import traceback
+from operator import itemgetter
 
+from exchanges import decoding
+from exchanges.ws_subscriptions import DepthSubscriptionMixin, from_ms
+from exchanges.ws_supervisor import supervise
+from exchanges.ws_orders import OrderStreamMixin
+from exchanges.ws_accounts import AccountStreamMixin
 from exchanges.mexc.utils import WS_HOST
 from exchanges.mexc.mexc_api_class import MexcAPI
 
+ORDER_TOPIC = "spot@private.orders.v3.api"
+ACCOUNT_TOPIC = "spot@private.account.v3.api"
+
+level = itemgetter("p", "v")
+
+
+def parse_depth(message):
+    """(topic, asks, bids, exchange time, version) of a depth frame or None"""
+    topic = message.get("c")
+    if topic is None or "depth" not in topic:
+        return None
+    data = message["d"]
+    version = data.get("r")
+    return (
+        topic,
+        list(map(level, data["asks"])),
+        list(map(level, data["bids"])),
+        from_ms(message.get("t")),
+        int(version) if version else None,
+    )
+
+
+class MexcWS(DepthSubscriptionMixin, OrderStreamMixin, AccountStreamMixin):
+    max_subscriptions = 30
+    subscriptions_per_message = 30
 
-class MexcWS:
     def __init__(
         self, ticker=None, public_key=None, private_key=None, group=None, kyc=None
     ):
@@ -18,67 +48,150 @@ class MexcWS:
         self.private_key = private_key
         self.group = group
         self.kyc = kyc
+        self.init_subscriptions(ticker)
+        self.init_order_stream()
+
+    def depth_topic(self, ticker):
+        return f"spot@public.limit.depth.v3.api@{ticker.split('/')[0]}USDT@5"
+
+    def subscription_message(self, topics, subscribe=True):
+        method = "SUBSCRIPTION" if subscribe else "UNSUBSCRIPTION"
+        return json.dumps({"method": method, "params": topics})
 
     async def on_message(self, message, depth=None, balance=None):
-        message = json.loads(message)
+        message = decoding.loads(message)
+        self.received()
         try:
-            if "depth" in message["c"]:
-                asks = message["d"]["asks"]
-                bids = message["d"]["bids"]
-                asks = [[ask["p"], ask["v"]] for ask in asks]
-                bids = [[bid["p"], bid["v"]] for bid in bids]
-                depth("Mexc", asks, bids)
-            elif "account" in message["c"]:
-                tick = message["d"]["a"]
-                self.account_balance[tick] = {
-                    "available": float(message["d"]["f"]),
-                    "frozen": float(message["d"]["l"]),
-                    "total": float(message["d"]["f"]) + float(message["d"]["l"]),
-                }
-                balance("Mexc", self.kyc, self.account_balance)
+            parsed = parse_depth(message)
+            if message.get("msg") == ACCOUNT_TOPIC:
+                self.account_subscribed()
+            elif parsed:
+                topic, asks, bids, exchange_ts, seq = parsed
+                if topic in self.topics and self.in_sequence(topic, seq):
+                    depth(
+                        "Mexc",
+                        asks,
+                        bids,
+                        ticker=self.topics[topic],
+                        exchange_ts=exchange_ts,
+                        seq=seq,
+                    )
+            elif message["c"] == ACCOUNT_TOPIC:
+                data = message["d"]
+                self.update_balance(data["a"], data["f"], data["l"])
+                self.publish_balances("Mexc", balance)
         except:
             print("Received message:", message)
 
-    async def main(self, depth=None, balance=None):
-        Mexc = MexcAPI(
-            self.ticker, self.public_key, self.private_key, self.group, self.kyc
-        )
-        listen_key = Mexc.create_ws_listen_key()
-        key = f"?listenKey={listen_key}"
+    async def connect_public_websocket(self, depth=None):
+        async def session(health):
+            try:
+                async with websockets.connect(WS_HOST) as websocket:
+                    self.websocket = websocket
+                    await self.replay_subscriptions()
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_message(message, depth=depth)
+            finally:
+                self.websocket = None
+
+        await supervise("Mexc depth stream", session)
+
+    async def connect_private_websocket(self, Mexc, balance=None):
+        async def session(health):
+            listen_key = Mexc.create_ws_listen_key()
+            key = f"?listenKey={listen_key}"
 
-        if depth:
             params = json.dumps(
                 {
                     "method": "SUBSCRIPTION",
-                    "params": [
-                        f"spot@public.limit.depth.v3.api@{self.tick}USDT@5",
-                    ],
+                    "params": [ACCOUNT_TOPIC],
                 }
             )
+            async with websockets.connect(WS_HOST + key) as websocket:
+                keepalive = asyncio.create_task(
+                    self.keepalive(
+                        "Mexc",
+                        websocket,
+                        ping=json.dumps({"method": "PING"}),
+                        extend=lambda: Mexc.extend_ws_listen_key(listen_key),
+                    )
+                )
+                try:
+                    await websocket.send(params)
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_message(message, balance=balance)
+                finally:
+                    keepalive.cancel()
+
+        await supervise("Mexc account stream", session)
+
+    async def on_order_message(self, message, order):
+        message = decoding.loads(message)
+        self.received()
+        try:
+            if message.get("msg") == ORDER_TOPIC:
+                self.order_subscribed()
+            elif message.get("c") == ORDER_TOPIC:
+                data = message["d"]
+                fill = self.order_fill(data["i"], data["cv"], data["ca"], data["s"])
+                order("Mexc", self.kyc, self.connected_at, [fill])
+        except:
+            print("Received message:", message)
+
+    async def connect_order_websocket(self, order):
+        async def session(health):
+            Mexc = MexcAPI(
+                self.ticker, self.public_key, self.private_key, self.group, self.kyc
+            )
+            listen_key = Mexc.create_ws_listen_key()
+            params = json.dumps({"method": "SUBSCRIPTION", "params": [ORDER_TOPIC]})
+            self.init_order_stream()
+            async with websockets.connect(
+                WS_HOST + f"?listenKey={listen_key}"
+            ) as websocket:
+                heartbeat = asyncio.create_task(
+                    self.order_heartbeat(
+                        "Mexc",
+                        websocket,
+                        order,
+                        ping=json.dumps({"method": "PING"}),
+                        extend=lambda: Mexc.extend_ws_listen_key(listen_key),
+                    )
+                )
+                try:
+                    await websocket.send(params)
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_order_message(message, order)
+                finally:
+                    heartbeat.cancel()
+
+        await supervise("Mexc order stream", session)
+
+    async def main(self, depth=None, balance=None, order=None):
+        tasks = []
+        if depth:
+            tasks.append(self.connect_public_websocket(depth))
 
         if balance:
-            self.account_balance = Mexc.get_account_balance()
-            balance(
-                "Mexc", self.kyc, self.account_balance
-            )  # Send initial account balance
-            params = json.dumps(
-                {
-                    "method": "SUBSCRIPTION",
-                    "params": [
-                        "spot@private.account.v3.api",
-                    ],
-                }
+            Mexc = MexcAPI(
+                self.ticker, self.public_key, self.private_key, self.group, self.kyc
             )
-        try:
-            async with websockets.connect(WS_HOST + key) as websocket:
-                await websocket.send(params)
-                while True:
-                    message = await websocket.recv()
-                    await self.on_message(message, depth=depth, balance=balance)
-        except (
-            websockets.exceptions.ConnectionClosed,
-            websockets.exceptions.InvalidHandshake,
-        ):
-
-            print("Mexc Connection closed, restarting...")
-            await self.main(depth=depth, balance=balance)
+            self.init_account_stream()
+            tasks.extend(
+                [
+                    self.connect_private_websocket(Mexc, balance),
+                    self.reconcile_balances("Mexc", Mexc, balance),
+                ]
+            )
+
+        if order:
+            tasks.append(self.connect_order_websocket(order))
+        if not tasks:
+            raise ValueError("Pass depth, balance or order to start a stream")
+        await asyncio.gather(*tasks)
@@ -1,4 +1,4 @@
-import requests
+from exchanges import aio, sessions
 import time
 import hmac
 import hashlib
@@ -6,6 +6,7 @@ from urllib.parse import urlencode, quote
 import json
 
 HOST = "https://api.mexc.com"
+EXCHANGE = "Mexc"  # Rate limit buckets
 WS_HOST = "wss://wbs.mexc.com/ws"
 
 
@@ -21,7 +22,7 @@ def sign(private_key, req_time, sign_params=None):
     return sign
 
 
-def sign_request(public_key, private_key, method, url, params=None):
+def prepare_sign_request(public_key, private_key, method, url, params=None):
     url = "{}{}".format(HOST, url)
     req_time = str(int(time.time() * 1000))
     if params:
@@ -34,13 +35,30 @@ def sign_request(public_key, private_key, method, url, params=None):
         "x-mexc-apikey": public_key,
         "Content-Type": "application/json",
     }
-    res = requests.request(method, url, params=params, headers=headers)
+    return url, {"params": params, "headers": headers}
+
+
+def sign_request(public_key, private_key, method, url, params=None):
+    url, kwargs = prepare_sign_request(public_key, private_key, method, url, params)
+    res = sessions.request(method, url, rate_limit=(EXCHANGE, public_key), **kwargs)
+    return parse_response(res)
+
+
+async def async_sign_request(public_key, private_key, method, url, params=None):
+    url, kwargs = prepare_sign_request(public_key, private_key, method, url, params)
+    res = await aio.request(method, url, rate_limit=(EXCHANGE, public_key), **kwargs)
     return parse_response(res)
 
 
 def request(method, url, params=None):
     url = "{}{}".format(HOST, url)
-    res = requests.request(method, url, params=params)
+    res = sessions.request(method, url, params=params, rate_limit=(EXCHANGE, None))
+    return parse_response(res)
+
+
+async def async_request(method, url, params=None):
+    url = "{}{}".format(HOST, url)
+    res = await aio.request(method, url, params=params, rate_limit=(EXCHANGE, None))
     return parse_response(res)
 
 
@@ -0,0 +1,79 @@
+from bisect import bisect_left, insort
+
+
+class OrderBook:
+    """Sorted price levels updated in place from snapshot and delta messages
+
+    Levels are kept in a price -> size dict per side plus a sorted list of
+    price keys, so a level insert/delete is a binary search on the keys and
+    the best bid/ask is always at index 0. Bid keys are stored negated so
+    both sides sort ascending from the best level.
+    """
+
+    def __init__(self, max_depth=None):
+        self.max_depth = max_depth
+        self.clear()
+
+    def clear(self):
+        self._bids = {}
+        self._asks = {}
+        self._bid_keys = []
+        self._ask_keys = []
+
+    def reset(self, asks, bids):
+        """Replace the whole book with a snapshot"""
+        self.clear()
+        self.update(asks, bids)
+
+    def update(self, asks=(), bids=()):
+        """Apply price levels, a size of 0 removes the level"""
+        for price, size in asks:
+            self._set_level(self._asks, self._ask_keys, float(price), float(size), 1)
+        for price, size in bids:
+            self._set_level(self._bids, self._bid_keys, float(price), float(size), -1)
+
+        if self.max_depth:
+            self._trim(self._asks, self._ask_keys, 1)
+            self._trim(self._bids, self._bid_keys, -1)
+
+    def _set_level(self, levels, keys, price, size, sign):
+        if size == 0:
+            if price in levels:
+                del levels[price]
+                del keys[bisect_left(keys, price * sign)]
+            return
+
+        if price not in levels:
+            insort(keys, price * sign)
+        levels[price] = size
+
+    def _trim(self, levels, keys, sign):
+        while len(keys) > self.max_depth:
+            del levels[keys.pop() * sign]
+
+    def best_ask(self):
+        if not self._ask_keys:
+            return None
+        price = self._ask_keys[0]
+        return price, self._asks[price]
+
+    def best_bid(self):
+        if not self._bid_keys:
+            return None
+        price = -self._bid_keys[0]
+        return price, self._bids[price]
+
+    def asks(self, limit=None):
+        """Ask levels as [[price, size], ...] from the lowest ask"""
+        keys = self._ask_keys if limit is None else self._ask_keys[:limit]
+        levels = self._asks
+        return [[price, levels[price]] for price in keys]
+
+    def bids(self, limit=None):
+        """Bid levels as [[price, size], ...] from the highest bid"""
+        keys = self._bid_keys if limit is None else self._bid_keys[:limit]
+        levels = self._bids
+        return [[-key, levels[-key]] for key in keys]
+
+    def __len__(self):
+        return len(self._ask_keys) + len(self._bid_keys)
@@ -0,0 +1,337 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from collections import defaultdict
+
+from django_redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("EXCHANGE_RATE_LIMIT_ENABLED", "1") == "1"
+MAX_WAIT = float(os.environ.get("EXCHANGE_RATE_LIMIT_MAX_WAIT", "10"))  # Seconds
+LEASE = int(os.environ.get("EXCHANGE_RATE_LIMIT_LEASE", "5"))  # Calls per Redis trip
+LEASE_FRACTION = 0.1  # Never lease more than this share of a bucket
+LEASE_TTL = 1.0  # Seconds a leased token can be spent locally
+METRICS_KEY = "spread:ratelimit:metrics"  # process -> its metrics as JSON
+METRICS_INTERVAL = 10  # Seconds between two shares of the metrics of a process
+
+# exchange -> bucket -> (capacity, tokens per second), from the spot API limits.
+# "public" is shared by the host, every other bucket is per API key.
+LIMITS = {
+    "Mexc": {"public": (500, 50), "private": (500, 50)},
+    "BingX": {
+        "public": (100, 10),
+        "private": (200, 20),
+        "order": (4, 4),
+        "query": (10, 10),
+        "balance": (4, 4),
+        "cancel_all": (2, 2),
+    },
+    "Kucoin": {"public": (2000, 66), "private": (4000, 133)},
+    "Bitmart": {
+        "public": (15, 7.5),
+        "private": (150, 75),
+        "order": (40, 20),
+        "query": (50, 25),
+        "balance": (12, 6),
+    },
+    "Bybit": {"public": (600, 120), "private": (20, 20), "order": (20, 20)},
+    "Bitget": {"public": (20, 20), "private": (10, 10), "order": (10, 10)},
+    "XT": {"public": (10, 10), "private": (10, 10), "order": (50, 50)},
+    "Htx": {"public": (800, 800), "private": (100, 50)},
+}
+
+# exchange -> [(path prefix, {bucket: weight})], first match wins. Private calls
+# also spend from "private", unlisted paths cost 1 from "public" or "private".
+ENDPOINTS = {
+    "BingX": [
+        ("/openApi/spot/v1/trade/order", {"order": 1}),
+        ("/openApi/spot/v1/trade/query", {"query": 1}),
+        ("/openApi/spot/v1/account/balance", {"balance": 1}),
+        ("/openApi/spot/v1/trade/cancelOpenOrders", {"cancel_all": 1}),
+    ],
+    "Kucoin": [
+        ("/api/v1/orders", {"private": 2}),
+        ("/api/v1/accounts", {"private": 5}),
+        ("/api/v1/market/orderbook", {"public": 2}),
+    ],
+    "Bitmart": [
+        ("/spot/v2/submit_order", {"order": 1}),
+        ("/spot/v4/query/order", {"query": 1}),
+        ("/spot/v1/wallet", {"balance": 1}),
+    ],
+    "Bybit": [("/v5/order/create", {"order": 1})],
+    "Bitget": [("/api/v2/spot/trade/place-order", {"order": 1})],
+    "XT": [("/v4/order", {"order": 1})],
+    "Htx": [("/v1/account/accounts", {"private": 2})],
+}
+
+# Gives back the tokens of the refund calls an expired lease left unspent, then
+# takes n * weight tokens from every bucket for the largest n <= lease all of
+# them can pay for. Returns {n, remaining tokens...} or {0, seconds to wait}.
+TOKEN_BUCKET = """
+local now = tonumber(ARGV[1])
+local lease = tonumber(ARGV[2])
+local refund = tonumber(ARGV[3])
+local states = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 3 + 1])
+    local rate = tonumber(ARGV[i * 3 + 2])
+    local weight = tonumber(ARGV[i * 3 + 3])
+    local state = redis.call("HMGET", key, "tokens", "ts")
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = tokens + math.max(0, now - ts) * rate + refund * weight
+    tokens = math.min(capacity, tokens)
+    states[i] = tokens
+    if tokens < weight then
+        wait = math.max(wait, (weight - tokens) / rate)
+    else
+        local affordable = math.floor(tokens / weight)
+        local share = math.max(1, math.floor(capacity * ARGV[#ARGV] / weight))
+        lease = math.min(lease, affordable, share)
+    end
+end
+if wait > 0 then
+    lease = 0
+end
+local result = {lease}
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 3 + 1])
+    local rate = tonumber(ARGV[i * 3 + 2])
+    local tokens = states[i] - lease * tonumber(ARGV[i * 3 + 3])
+    redis.call("HSET", key, "tokens", tostring(tokens), "ts", tostring(now))
+    redis.call("PEXPIRE", key, math.ceil(capacity / rate * 1000) + 1000)
+    result[#result + 1] = tostring(tokens)
+end
+if wait > 0 then
+    return {0, tostring(wait)}
+end
+return result
+"""
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+class RateLimiter:
+    """Token buckets per exchange, API key and endpoint shared over Redis
+
+    Every call pays the weights of its endpoint atomically with one Lua
+    script. Up to LEASE calls worth of tokens are taken at once and spent
+    from memory for LEASE_TTL seconds, the next trip to Redis gives back
+    what an expired lease left. A process told to wait does not ask Redis
+    again before the wait is over. Callers wait for a token, up to MAX_WAIT
+    seconds, instead of being rejected.
+
+    Every process shares its metrics() in the METRICS_KEY hash on its trips
+    to Redis, shared_metrics() reads them back.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.script = None
+        self.pid = os.getpid()
+        self.leases = {}  # costs -> (calls left, expires at)
+        self.blocked = {}  # costs -> blocked until
+        self.budget = {}  # (exchange, key_id, bucket) -> tokens left
+        self.requests = defaultdict(int)  # (exchange, key_id, bucket) -> calls
+        self.waited = defaultdict(float)  # (exchange, key_id, bucket) -> seconds
+        self.metrics_shared_at = 0
+
+    def costs(self, exchange, key, path):
+        """((bucket key, capacity, rate, weight), ...) paid by one call"""
+        limits = LIMITS.get(exchange)
+        if not limits:
+            return ()
+
+        weights = {}
+        for prefix, endpoint_weights in ENDPOINTS.get(exchange, ()):
+            if path.startswith(prefix):
+                weights.update(endpoint_weights)
+                break
+        default = "private" if key else "public"
+        weights.setdefault(default, 1)
+
+        key_id = hashlib.sha1(key.encode()).hexdigest()[:12] if key else "host"
+        return tuple(
+            (exchange, key_id if bucket != "public" else "host", bucket)
+            + limits[bucket]
+            + (weight,)
+            for bucket, weight in sorted(weights.items())
+        )
+
+    def take(self, costs):
+        """0 when a call can go now, else the seconds to wait"""
+        now = time.time()
+        wait = self.take_leased(costs, now)
+        if wait is None:
+            wait = self.take_shared(costs, now)
+        return wait
+
+    def take_leased(self, costs, now):
+        """take from the local lease or block, None when Redis must be asked"""
+        with self.lock:
+            if self.pid != os.getpid():  # Leases of a forked parent are not ours
+                self.leases.clear()
+                self.blocked.clear()
+                self.pid = os.getpid()
+            calls, expires = self.leases.get(costs, (0, 0))
+            if calls and now < expires:
+                self.leases[costs] = (calls - 1, expires)
+                self.count(costs)
+                return 0
+            if self.blocked.get(costs, 0) > now:
+                return self.blocked[costs] - now
+        return None
+
+    def take_shared(self, costs, now):
+        """take from the shared Redis buckets, blocking on the round trip"""
+        redis = get_redis_connection("default")
+        if self.script is None:
+            self.script = redis.register_script(TOKEN_BUCKET)
+
+        with self.lock:  # Calls of an expired lease go back to the buckets
+            unspent, _ = self.leases.pop(costs, (0, 0))
+        args = [now, LEASE, unspent]
+        for _, _, _, capacity, rate, weight in costs:
+            args += [capacity, rate, weight]
+        args.append(LEASE_FRACTION)
+        try:
+            keys = [self.bucket_key(cost) for cost in costs]
+            result = self.script(keys=keys, args=args)
+        except Exception:
+            logger.warning("Rate limiter unavailable, letting the call through")
+            return 0
+
+        calls = int(result[0])
+        with self.lock:
+            if not calls:
+                wait = float(result[1])
+                self.blocked[costs] = now + wait
+            else:
+                wait = 0
+                self.leases[costs] = (calls - 1, now + LEASE_TTL)
+                for cost, tokens in zip(costs, result[1:]):
+                    self.budget[cost[:3]] = float(tokens)
+                self.count(costs)
+
+        self.share_metrics(redis, now)
+        return wait
+
+    def bucket_key(self, cost):
+        exchange, key_id, bucket = cost[:3]
+        return f"spread:ratelimit:{exchange}:{key_id}:{bucket}"
+
+    def count(self, costs):
+        for cost in costs:
+            self.requests[cost[:3]] += 1
+
+    def record_wait(self, costs, seconds):
+        with self.lock:
+            for cost in costs:
+                self.waited[cost[:3]] += seconds
+
+    def check_deadline(self, exchange, path, deadline, wait):
+        if time.time() + wait > deadline:
+            raise RateLimitExceeded(f"{exchange} {path} rate limit exceeded")
+
+    def acquire(self, exchange, key, path, max_wait=None):
+        """Block until the call fits the buckets of the endpoint"""
+        costs = self.costs(exchange, key, path)
+        if not ENABLED or not costs:
+            return
+
+        deadline = time.time() + (MAX_WAIT if max_wait is None else max_wait)
+        while True:
+            wait = self.take(costs)
+            if not wait:
+                return
+            self.check_deadline(exchange, path, deadline, wait)
+            self.record_wait(costs, wait)
+            time.sleep(wait)
+
+    async def async_acquire(self, exchange, key, path, max_wait=None):
+        """Same as acquire without blocking the event loop on waits or Redis"""
+        costs = self.costs(exchange, key, path)
+        if not ENABLED or not costs:
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = time.time() + (MAX_WAIT if max_wait is None else max_wait)
+        while True:
+            now = time.time()
+            wait = self.take_leased(costs, now)
+            if wait is None:  # Redis round trips run off the event loop
+                wait = await loop.run_in_executor(None, self.take_shared, costs, now)
+            if not wait:
+                return
+            self.check_deadline(exchange, path, deadline, wait)
+            self.record_wait(costs, wait)
+            await asyncio.sleep(wait)
+
+    def metrics(self):
+        """{(exchange, key_id, bucket): {...}} as seen by this process"""
+        with self.lock:
+            return {
+                bucket: {
+                    "capacity": LIMITS[bucket[0]][bucket[2]][0],
+                    "remaining": self.budget.get(bucket),
+                    "requests": self.requests[bucket],
+                    "waited": round(self.waited[bucket], 3),
+                }
+                for bucket in set(self.requests) | set(self.waited)
+            }
+
+    def share_metrics(self, redis, now):
+        """Write metrics() to METRICS_KEY, at most every METRICS_INTERVAL"""
+        with self.lock:
+            if now - self.metrics_shared_at < METRICS_INTERVAL:
+                return
+            self.metrics_shared_at = now
+
+        buckets = {
+            ":".join(bucket): values for bucket, values in self.metrics().items()
+        }
+        process = f"{socket.gethostname()}:{os.getpid()}"
+        pipe = redis.pipeline()
+        pipe.hset(METRICS_KEY, process, json.dumps({"at": now, "buckets": buckets}))
+        pipe.expire(METRICS_KEY, 3 * METRICS_INTERVAL)
+        try:
+            pipe.execute()
+        except Exception:
+            logger.warning("Rate limiter metrics could not be shared")
+
+
+limiter = RateLimiter()
+
+
+def acquire(exchange, key, path, max_wait=None):
+    limiter.acquire(exchange, key, path, max_wait)
+
+
+async def async_acquire(exchange, key, path, max_wait=None):
+    await limiter.async_acquire(exchange, key, path, max_wait)
+
+
+def metrics():
+    return limiter.metrics()
+
+
+def shared_metrics():
+    """{process: {"exchange:key_id:bucket": {...}}} of the recently active processes"""
+    since = time.time() - 3 * METRICS_INTERVAL
+    shared = get_redis_connection("default").hgetall(METRICS_KEY)
+    metrics = {}
+    for process, value in shared.items():
+        value = json.loads(value)
+        if value["at"] >= since:
+            metrics[process.decode()] = value["buckets"]
+    return metrics
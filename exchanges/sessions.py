@@ -0,0 +1,55 @@
+import os
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from exchanges import rate_limit as rate_limiter
+
+# Tunable per process, defaults fit one bot or cacher per process
+POOL_CONNECTIONS = int(os.environ.get("EXCHANGE_HTTP_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(os.environ.get("EXCHANGE_HTTP_POOL_MAXSIZE", "16"))
+TIMEOUT = float(os.environ.get("EXCHANGE_HTTP_TIMEOUT", "10"))
+PROXY = os.environ.get("EXCHANGE_HTTP_PROXY")  # Binds every session of the process
+
+_sessions = {}
+_pid = None
+
+
+def get_session(url, proxy=None):
+    """Keep-alive session shared by every request to the same host and proxy"""
+    global _pid
+    if _pid != os.getpid():  # Never share sockets with a forked parent
+        _sessions.clear()
+        _pid = os.getpid()
+
+    parts = urlsplit(url)
+    if proxy is None and PROXY:
+        proxy = {"http": PROXY, "https": PROXY}
+    key = (parts.scheme, parts.netloc, tuple(sorted((proxy or {}).items())))
+
+    session = _sessions.get(key)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if proxy:
+            session.proxies.update(proxy)
+        _sessions[key] = session
+
+    return session
+
+
+def request(method, url, proxies=None, rate_limit=None, **kwargs):
+    """Drop-in for requests.request over the pooled session of the host
+
+    rate_limit=(exchange, public_key) waits for the endpoint's rate limit
+    tokens before sending.
+    """
+    if rate_limit:
+        rate_limiter.acquire(*rate_limit, urlsplit(url).path)
+    kwargs.setdefault("timeout", TIMEOUT)
+    return get_session(url, proxies).request(method, url, **kwargs)
@@ -0,0 +1,74 @@
+import asyncio
+import os
+import time
+
+from exchanges.ws_private import PrivateStreamMixin
+
+# Seconds between REST snapshots correcting balances kept from pushes
+RECONCILE_INTERVAL = float(os.environ.get("EXCHANGE_BALANCE_RECONCILE_INTERVAL", "60"))
+
+
+class AccountStreamMixin(PrivateStreamMixin):
+    """Balances kept from private account pushes
+
+    Adapters call update_balance for every pushed coin and publish_balances
+    once per push. Nothing is published before the first REST snapshot, which
+    reconcile_balances takes on start, on every (re)subscription and every
+    RECONCILE_INTERVAL seconds. Coins pushed while a snapshot was in flight
+    keep their pushed value.
+    """
+
+    def init_account_stream(self):
+        self.account_balance = {}
+        self.balance_updated = {}  # coin -> time of the last push
+        self.balance_seeded = False
+        self.reconcile_event = asyncio.Event()
+
+    def update_balance(self, coin, available, frozen):
+        coin = coin.upper()
+        available = float(available)
+        frozen = float(frozen)
+        self.balance_updated[coin] = time.time()
+        if available + frozen > 0:
+            self.account_balance[coin] = {
+                "available": available,
+                "frozen": frozen,
+                "total": available + frozen,
+            }
+        else:
+            self.account_balance.pop(coin, None)
+
+    def publish_balances(self, exchange, balance):
+        if self.balance_seeded:
+            balance(exchange, self.kyc, self.account_balance)
+
+    def account_subscribed(self):
+        self.reconcile_event.set()  # Pushes may have been missed while down
+
+    async def reconcile_balances(self, exchange, api, balance):
+        while True:
+            self.reconcile_event.clear()
+            started = time.time()
+            try:
+                snapshot = await api.async_get_account_balance()
+            except Exception:
+                print(f"{exchange} balance snapshot failed, retrying...")
+                await asyncio.sleep(3)
+                continue
+
+            for coin, updated in self.balance_updated.items():
+                if updated < started:
+                    continue
+                if coin in self.account_balance:
+                    snapshot[coin] = self.account_balance[coin]
+                else:
+                    snapshot.pop(coin, None)
+
+            self.account_balance = snapshot
+            self.balance_seeded = True
+            balance(exchange, self.kyc, self.account_balance)
+
+            try:
+                await asyncio.wait_for(self.reconcile_event.wait(), RECONCILE_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
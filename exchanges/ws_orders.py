@@ -0,0 +1,38 @@
+import time
+
+from exchanges.ws_private import PrivateStreamMixin
+
+
+class OrderStreamMixin(PrivateStreamMixin):
+    """Bookkeeping for private order update streams
+
+    Adapters turn the venue's order pushes into fills, (order_id,
+    filled_price, filled_quantity, status) with cumulative quantities, and
+    hand them to order(exchange, kyc, connected_at, fills). connected_at is
+    set once the venue acknowledged the subscription, the stream has seen
+    every update of orders placed after it. The heartbeat calls order with
+    no fills while the venue keeps answering, so readers can tell a quiet
+    stream from a dead one.
+    """
+
+    def init_order_stream(self):
+        self.connected_at = None
+        self.received()
+
+    def order_subscribed(self):
+        self.connected_at = time.time()
+
+    def order_fill(self, order_id, filled_quantity, filled_quote, status):
+        filled_quantity = float(filled_quantity or 0)
+        filled_quote = float(filled_quote or 0)
+        filled_price = filled_quote / filled_quantity if filled_quantity else 0
+        return str(order_id), filled_price, filled_quantity, status
+
+    async def order_heartbeat(self, exchange, websocket, order, ping=None, extend=None):
+        """Keep the stream alive and vouch for it while it is subscribed"""
+
+        def beat():
+            if self.connected_at:
+                order(exchange, self.kyc, self.connected_at, [])
+
+        await self.keepalive(exchange, websocket, ping=ping, extend=extend, beat=beat)
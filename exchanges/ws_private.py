@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+
+class PrivateStreamMixin:
+    """Keepalive shared by the private (listenKey or login) streams
+
+    Adapters call received() for every message. keepalive pings the venue,
+    closes a connection that stopped answering so the adapter reconnects,
+    extends the listenKey and calls beat while the stream is healthy.
+    """
+
+    heartbeat_interval = 10
+    listen_key_interval = 30 * 60  # listenKeys expire after an hour
+
+    def received(self):
+        self.last_received = time.time()
+
+    async def keepalive(self, exchange, websocket, ping=None, extend=None, beat=None):
+        loop = asyncio.get_running_loop()
+        self.received()
+        extended = time.time()
+        while True:
+            if ping:
+                await websocket.send(ping)
+            await asyncio.sleep(self.heartbeat_interval)
+
+            if time.time() - self.last_received > 2 * self.heartbeat_interval:
+                print(f"{exchange} private stream is silent, reconnecting...")
+                await websocket.close()
+                return
+
+            if beat:
+                beat()
+
+            if extend and time.time() - extended > self.listen_key_interval:
+                try:
+                    await loop.run_in_executor(None, extend)
+                    extended = time.time()
+                except Exception:
+                    print(f"{exchange} listenKey keepalive failed, retrying...")
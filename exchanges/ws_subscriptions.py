@@ -0,0 +1,92 @@
+import websockets
+
+
+def from_ms(timestamp):
+    """Seconds from a venue's millisecond timestamp, None when it is missing"""
+    return int(timestamp) / 1000 if timestamp else None
+
+
+class DepthSubscriptionMixin:
+    """Topic bookkeeping for public depth streams carrying many tickers
+
+    Adapters implement depth_topic(ticker) and subscription_message(topics,
+    subscribe) and set self.websocket while connected. Tickers can be added
+    or removed at any time, they are sent right away on a live connection
+    and replayed on every (re)connect. Books are rebuilt from the snapshots
+    the venue sends after the subscription.
+
+    in_sequence drops pushes older than the last one of their topic, resync
+    subscribes a topic again when its book can no longer be trusted.
+    """
+
+    max_subscriptions = 50  # Topics per connection
+    subscriptions_per_message = 10
+
+    def init_subscriptions(self, ticker=None):
+        self.topics = {}
+        self.sequences = {}  # topic -> sequence of the last push
+        self.websocket = None
+        if ticker:
+            self.topics[self.depth_topic(ticker)] = ticker
+
+    @property
+    def tickers(self):
+        return set(self.topics.values())
+
+    def has_capacity(self):
+        return len(self.topics) < self.max_subscriptions
+
+    async def subscribe(self, tickers):
+        topics = []
+        for ticker in tickers:
+            topic = self.depth_topic(ticker)
+            if topic not in self.topics:
+                self.topics[topic] = ticker
+                topics.append(topic)
+
+        await self.send_subscriptions(topics, subscribe=True)
+
+    async def unsubscribe(self, tickers):
+        topics = []
+        for ticker in tickers:
+            topic = self.depth_topic(ticker)
+            if self.topics.pop(topic, None):
+                topics.append(topic)
+
+        await self.send_subscriptions(topics, subscribe=False)
+
+    async def replay_subscriptions(self):
+        """Subscribe every topic on a new connection, sequences start over"""
+        self.sequences = {}
+        await self.send_subscriptions(self.topics)
+
+    def in_sequence(self, topic, seq):
+        """False for a push not newer than the last one of the topic"""
+        if seq is None:
+            return True
+        last = self.sequences.get(topic)
+        if last is not None and seq <= last:
+            return False
+        self.sequences[topic] = seq
+        return True
+
+    async def resync(self, topic):
+        """Subscribe the topic again, the venue answers with a fresh snapshot"""
+        print(f"Depth of {topic} is out of sync, resubscribing...")
+        self.sequences.pop(topic, None)
+        await self.send_subscriptions([topic], subscribe=False)
+        await self.send_subscriptions([topic], subscribe=True)
+
+    async def send_subscriptions(self, topics, subscribe=True):
+        if self.websocket is None or not topics:
+            return
+
+        topics = list(topics)
+        step = self.subscriptions_per_message
+        try:
+            for i in range(0, len(topics), step):
+                await self.websocket.send(
+                    self.subscription_message(topics[i : i + step], subscribe)
+                )
+        except websockets.exceptions.ConnectionClosed:
+            pass  # self.topics is replayed once the supervisor reconnects
@@ -0,0 +1,103 @@
+import asyncio
+import os
+import random
+import time
+import traceback
+import weakref
+
+import websockets
+
+# Reconnect delays grow from the min to the max delay, with full jitter
+RECONNECT_MIN_DELAY = float(os.environ.get("EXCHANGE_WS_RECONNECT_MIN_DELAY", "1"))
+RECONNECT_MAX_DELAY = float(os.environ.get("EXCHANGE_WS_RECONNECT_MAX_DELAY", "60"))
+# A connection that stayed up this long starts the backoff over
+STABLE_AFTER = 60
+
+CONNECTION_ERRORS = (
+    websockets.exceptions.ConnectionClosed,
+    websockets.exceptions.InvalidHandshake,
+    OSError,
+    asyncio.TimeoutError,
+)
+
+registry = weakref.WeakSet()
+
+
+class ConnectionHealth:
+    """Counters of one supervised websocket stream
+
+    The stream counts as connected from its first message, sessions call
+    received() for every message.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.connects = 0
+        self.disconnects = 0
+        self.failures = 0  # Reconnects since the last stable connection
+        self.connected_since = None
+        self.last_received = None
+        self.last_error = None
+        registry.add(self)
+
+    def received(self):
+        self.last_received = time.time()
+        if self.connected_since is None:
+            self.connected_since = self.last_received
+            self.connects += 1
+
+    def disconnected(self, error):
+        now = time.time()
+        if self.connected_since and now - self.connected_since >= STABLE_AFTER:
+            self.failures = 0
+        self.failures += 1
+        self.disconnects += 1
+        self.connected_since = None
+        self.last_error = error
+
+    def reconnect_delay(self):
+        cap = min(RECONNECT_MAX_DELAY, RECONNECT_MIN_DELAY * 2 ** (self.failures - 1))
+        return random.uniform(RECONNECT_MIN_DELAY, max(cap, RECONNECT_MIN_DELAY))
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "connected": self.connected_since is not None,
+            "connected_since": self.connected_since,
+            "last_received": self.last_received,
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+def connection_health():
+    """Health of every live supervised stream of the process"""
+    return [health.as_dict() for health in registry]
+
+
+async def supervise(name, session, health=None):
+    """Run session(health) forever, reconnecting with backoff when it ends
+
+    session opens one connection and returns or raises once it is gone,
+    tasks it started must be cancelled before it returns. Network errors
+    are expected, anything else is printed with its traceback, in both
+    cases the session is started again after a jittered, exponentially
+    growing delay.
+    """
+    health = health or ConnectionHealth(name)
+    while True:
+        try:
+            await session(health)
+            error = "closed"
+        except CONNECTION_ERRORS as e:
+            error = repr(e)
+        except Exception as e:
+            traceback.print_exc()
+            error = repr(e)
+
+        health.disconnected(error)
+        delay = health.reconnect_delay()
+        print(f"{name} connection closed ({error}), reconnecting in {delay:.1f}s...")
+        await asyncio.sleep(delay)
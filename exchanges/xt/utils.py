@@ -1,4 +1,4 @@
-import requests
+from exchanges import aio, sessions
 import hmac
 import hashlib
 import time
@@ -6,7 +6,9 @@ import json
 from copy import deepcopy
 
 HOST = "https://sapi.xt.com"
+EXCHANGE = "XT"  # Rate limit buckets
 WS_HOST = "wss://stream.xt.com/public"
+WS_PRIVATE_HOST = "wss://stream.xt.com/private"
 
 
 def create_sign(url, method, headers=None, secret_key=None, **kwargs):
@@ -48,20 +50,37 @@ def gen_auth_header(public_key, private_key, path, method, **kwargs):
     return headers
 
 
-def sign_request(public_key, private_key, method, path, **params):
+def prepare_sign_request(public_key, private_key, method, path, **params):
     headers = gen_auth_header(public_key, private_key, path, method, **params)
 
     kwargs = {"headers": headers, "timeout": 10}
     kwargs.update(params)
 
     url = "{}{}".format(HOST, path)
-    res = requests.request(method, url, **kwargs)
+    return url, kwargs
+
+
+def sign_request(public_key, private_key, method, path, **params):
+    url, kwargs = prepare_sign_request(public_key, private_key, method, path, **params)
+    res = sessions.request(method, url, rate_limit=(EXCHANGE, public_key), **kwargs)
+    return parse_response(res)
+
+
+async def async_sign_request(public_key, private_key, method, path, **params):
+    url, kwargs = prepare_sign_request(public_key, private_key, method, path, **params)
+    res = await aio.request(method, url, rate_limit=(EXCHANGE, public_key), **kwargs)
     return parse_response(res)
 
 
 def request(method, url, params=None):
     url = "{}{}".format(HOST, url)
-    res = requests.request(method, url, params=params)
+    res = sessions.request(method, url, params=params, rate_limit=(EXCHANGE, None))
+    return parse_response(res)
+
+
+async def async_request(method, url, params=None):
+    url = "{}{}".format(HOST, url)
+    res = await aio.request(method, url, params=params, rate_limit=(EXCHANGE, None))
     return parse_response(res)
 
 
@@ -1,9 +1,7 @@
-from .utils import request
+from .utils import request, async_request
 
 
-def get_tickers():
-    url = "/v4/public/ticker"
-    res = request("GET", url)
+def parse_tickers(res):
     res = res["result"]
 
     tickers = {}
@@ -27,11 +25,19 @@ def get_tickers():
     return tickers
 
 
-def get_depth(ticker):
-    url = "/v4/public/depth"
+def get_tickers():
+    url = "/v4/public/ticker"
+    res = request("GET", url)
+    return parse_tickers(res)
 
-    params = {"symbol": ticker, "limit": 10}
-    res = request("GET", url, params=params)
+
+async def async_get_tickers():
+    url = "/v4/public/ticker"
+    res = await async_request("GET", url)
+    return parse_tickers(res)
+
+
+def parse_depth(res):
     res = res["result"]
     asks = res["asks"]
     bids = res["bids"]
@@ -39,20 +45,59 @@ def get_depth(ticker):
     return asks, bids
 
 
+def get_depth(ticker):
+    url = "/v4/public/depth"
+
+    params = {"symbol": ticker, "limit": 10}
+    res = request("GET", url, params=params)
+    return parse_depth(res)
+
+
+async def async_get_depth(ticker):
+    url = "/v4/public/depth"
+
+    params = {"symbol": ticker, "limit": 10}
+    res = await async_request("GET", url, params=params)
+    return parse_depth(res)
+
+
+def parse_product_details(res):
+    res = res["result"]["symbols"][0]
+    return res
+
+
 def get_product_details(ticker):
     url = "/v4/public/symbol"
 
     params = {"symbol": ticker}
     res = request("GET", url, params=params)
-    res = res["result"]["symbols"][0]
-    return res
+    return parse_product_details(res)
 
 
-def get_allowed_symbols():
+async def async_get_product_details(ticker):
     url = "/v4/public/symbol"
 
-    res = request("GET", url)
+    params = {"symbol": ticker}
+    res = await async_request("GET", url, params=params)
+    return parse_product_details(res)
+
+
+def parse_allowed_symbols(res):
     res = res["result"]["symbols"]
     res = [coin["displayName"] for coin in res if coin["openapiEnabled"]]
 
     return res
+
+
+def get_allowed_symbols():
+    url = "/v4/public/symbol"
+
+    res = request("GET", url)
+    return parse_allowed_symbols(res)
+
+
+async def async_get_allowed_symbols():
+    url = "/v4/public/symbol"
+
+    res = await async_request("GET", url)
+    return parse_allowed_symbols(res)
@@ -1,8 +1,14 @@
 import logging
 import time
 
-from .xt_api import get_tickers, get_depth, get_product_details
-from .utils import sign_request
+from .xt_api import (
+    get_tickers,
+    get_depth,
+    get_product_details,
+    async_get_tickers,
+    async_get_depth,
+)
+from .utils import sign_request, async_sign_request
 
 
 class XtAPI:
@@ -23,10 +29,18 @@ class XtAPI:
         tickers = get_tickers()
         return tickers
 
+    async def async_get_tickers(self):
+        tickers = await async_get_tickers()
+        return tickers
+
     def get_depth(self):
         asks, bids = get_depth(self.ticker)
         return asks, bids
 
+    async def async_get_depth(self):
+        asks, bids = await async_get_depth(self.ticker)
+        return asks, bids
+
     def get_product_details(self):
         product_details = get_product_details(self.ticker)
         price_precision = float(product_details["pricePrecision"])
@@ -41,8 +55,13 @@ class XtAPI:
         balances = res["result"]["assets"]
         return balances
 
-    def get_account_balance(self, coins=None):
-        _balances = self.get_account_balance_function()
+    async def async_get_account_balance_function(self):
+        url = "/v4/balances"
+        res = await async_sign_request(self.public_key, self.private_key, "GET", url)
+        balances = res["result"]["assets"]
+        return balances
+
+    def parse_account_balance(self, _balances, coins=None):
         account_balance = {}
 
         for balance in _balances:
@@ -78,10 +97,16 @@ class XtAPI:
 
         return result
 
-    def create_limit_order(self, side, price, quantity):
-        url = "/v4/order"
+    def get_account_balance(self, coins=None):
+        _balances = self.get_account_balance_function()
+        return self.parse_account_balance(_balances, coins)
 
-        params = {
+    async def async_get_account_balance(self, coins=None):
+        _balances = await self.async_get_account_balance_function()
+        return self.parse_account_balance(_balances, coins)
+
+    def limit_order_params(self, side, price, quantity):
+        return {
             "symbol": self.ticker,
             "side": "BUY" if side == "buy" else "SELL",
             "type": "LIMIT",
@@ -90,41 +115,69 @@ class XtAPI:
             "price": str(price),
             "quantity": str(quantity),
         }
-        res = sign_request(self.public_key, self.private_key, "POST", url, json=params)
+
+    def parse_created_order(self, res):
         if res["rc"] != 0:
             return None, res
 
         return res["result"]["orderId"], res
 
+    def create_limit_order(self, side, price, quantity):
+        url = "/v4/order"
+        params = self.limit_order_params(side, price, quantity)
+        res = sign_request(self.public_key, self.private_key, "POST", url, json=params)
+        return self.parse_created_order(res)
+
+    async def async_create_limit_order(self, side, price, quantity):
+        url = "/v4/order"
+        params = self.limit_order_params(side, price, quantity)
+        res = await async_sign_request(
+            self.public_key, self.private_key, "POST", url, json=params
+        )
+        return self.parse_created_order(res)
+
     def create_market_order(self, side, price, quantity):
         pass
 
+    def parse_order_status(self, order):
+        filled_quantity = float(order["executedQty"])
+        if filled_quantity == 0:
+            return 0, 0
+        return float(order["avgPrice"]), filled_quantity
+
     def get_order_status(self, order_id):
         url = f"/v4/order/{order_id}"
 
         res = sign_request(self.public_key, self.private_key, "GET", url)
         res = res["result"]
-        filled_quantity = float(res["executedQty"])
-        if filled_quantity == 0:
-            return 0, 0, res
-        filled_price = float(res["avgPrice"])
-
-        return filled_price, filled_quantity, res
+        return self.parse_order_status(res) + (res,)
 
-    def cancel_order(self, order_id):
+    async def async_get_order_status(self, order_id):
         url = f"/v4/order/{order_id}"
 
-        res = sign_request(self.public_key, self.private_key, "DELETE", url)
+        res = await async_sign_request(self.public_key, self.private_key, "GET", url)
+        res = res["result"]
+        return self.parse_order_status(res) + (res,)
 
+    def parse_cancelled_order(self, res):
         if res["rc"] != 0:
             return False, res
 
         return True, res
 
-    def get_asset_details(self):
-        url = "/v4/public/wallet/support/currency"
+    def cancel_order(self, order_id):
+        url = f"/v4/order/{order_id}"
 
-        res = sign_request(self.public_key, self.private_key, "GET", url)
+        res = sign_request(self.public_key, self.private_key, "DELETE", url)
+        return self.parse_cancelled_order(res)
+
+    async def async_cancel_order(self, order_id):
+        url = f"/v4/order/{order_id}"
+
+        res = await async_sign_request(self.public_key, self.private_key, "DELETE", url)
+        return self.parse_cancelled_order(res)
+
+    def parse_asset_details(self, res):
         res = res["result"]
         details = {}
 
@@ -150,6 +203,18 @@ class XtAPI:
 
         return details
 
+    def get_asset_details(self):
+        url = "/v4/public/wallet/support/currency"
+
+        res = sign_request(self.public_key, self.private_key, "GET", url)
+        return self.parse_asset_details(res)
+
+    async def async_get_asset_details(self):
+        url = "/v4/public/wallet/support/currency"
+
+        res = await async_sign_request(self.public_key, self.private_key, "GET", url)
+        return self.parse_asset_details(res)
+
     def cancel_open_orders(self):
         url = "/v4/open-order"
 
@@ -160,10 +225,14 @@ class XtAPI:
 
         return res
 
-    def get_deposits(self):
-        url = "/v4/deposit/history"
-        params = {"limit": 200}
-        res = sign_request(self.public_key, self.private_key, "GET", url)
+    def create_ws_listen_key(self):
+        url = "/v4/ws-token"
+        res = sign_request(self.public_key, self.private_key, "POST", url)
+        listen_key = res["result"]["accessToken"]
+
+        return listen_key
+
+    def parse_deposits(self, res):
         res = res["result"]["items"]
         deposits = {}
         for deposit in res:
@@ -179,6 +248,20 @@ class XtAPI:
 
         return deposits
 
+    def get_deposits(self):
+        url = "/v4/deposit/history"
+        params = {"limit": 200}
+        res = sign_request(self.public_key, self.private_key, "GET", url, params=params)
+        return self.parse_deposits(res)
+
+    async def async_get_deposits(self):
+        url = "/v4/deposit/history"
+        params = {"limit": 200}
+        res = await async_sign_request(
+            self.public_key, self.private_key, "GET", url, params=params
+        )
+        return self.parse_deposits(res)
+
     def get_deposit_adresses(self, chain):
         url = "/v4/deposit/address"
         params = {"currency": self.nominator, "chain": chain}
@@ -4,11 +4,29 @@ import json
 import traceback
 from uuid import uuid4
 
-from .utils import WS_HOST
+from exchanges import decoding
+from exchanges.ws_subscriptions import DepthSubscriptionMixin, from_ms
+from exchanges.ws_supervisor import supervise
+from exchanges.ws_accounts import AccountStreamMixin
+
+from .utils import WS_HOST, WS_PRIVATE_HOST
 from .xt_api_class import XtAPI
 
+ACCOUNT_TOPIC = "balance"
+
+
+def parse_depth(message):
+    """(topic, asks, bids, exchange time, update id) of a depth frame or None"""
+    if "data" not in message:
+        return None
+    data = message["data"]
+    return message["event"], data["a"], data["b"], from_ms(data.get("t")), data.get("i")
+
+
+class XtWS(DepthSubscriptionMixin, AccountStreamMixin):
+    max_subscriptions = 50
+    subscriptions_per_message = 50
 
-class XtWS:
     def __init__(
         self, ticker=None, public_key=None, private_key=None, group=None, kyc=None
     ):
@@ -21,85 +39,144 @@ class XtWS:
         self.kyc = kyc
         self.keep_alive_interval = 50  # Interval for sending ping messages
         self.keep_alive_timeout = 55  # Timeout for receiving pong responses
+        self.init_subscriptions(ticker)
+
+    def depth_topic(self, ticker):
+        return f"depth@{ticker.split('/')[0].lower()}_usdt,5"
+
+    def subscription_message(self, topics, subscribe=True):
+        ws_connect_id = str(uuid4()).replace("-", "")
+        return json.dumps(
+            {
+                "method": "subscribe" if subscribe else "unsubscribe",
+                "params": topics,
+                "id": ws_connect_id,
+            }
+        )
 
     async def on_message(self, message, depth=None, balance=None):
         if message == "pong":
             self.last_pong_received = asyncio.get_event_loop().time()
 
         else:
-            message = json.loads(message)
+            message = decoding.loads(message)
             try:
-                if "data" in message:
-                    asks = message["data"]["a"]
-                    bids = message["data"]["b"]
-                    depth("XT", asks, bids)
+                parsed = parse_depth(message)
+                if parsed and parsed[0] in self.topics:
+                    topic, asks, bids, exchange_ts, seq = parsed
+                    if self.in_sequence(topic, seq):
+                        depth(
+                            "XT",
+                            asks,
+                            bids,
+                            ticker=self.topics[topic],
+                            exchange_ts=exchange_ts,
+                            seq=seq,
+                        )
             except:
                 print("Received message:", message)
 
     async def send_keep_alive(self, websocket):
-        while True:
-            try:
+        """Ping until the connection closes, close it when pongs stop"""
+        try:
+            while True:
                 await websocket.send("ping")  # Send ping message
                 await asyncio.sleep(self.keep_alive_interval)  # Wait for the interval
                 if (
-                    self.last_pong_received is None
-                    or (asyncio.get_event_loop().time() - self.last_pong_received)
+                    asyncio.get_event_loop().time() - self.last_pong_received
                     > self.keep_alive_timeout
                 ):
                     print("Pong response not received within timeout")
-                    raise ValueError("Pong response not received within timeout")
-            except Exception as e:
-                print(f"Error sending ping: {e}")
-                break
+                    await websocket.close()
+                    return
+        except websockets.exceptions.ConnectionClosed:
+            pass
 
     async def connect_public_websocket(self, depth=None):
-        ws_connect_id = str(uuid4()).replace("-", "")
-        params = json.dumps(
-            {
-                "method": "subscribe",
-                "params": [f"depth@{self.tick}_usdt,5"],
-                "id": ws_connect_id,
-            }
-        )
-        print(params)
-        try:
-            async with websockets.connect(WS_HOST) as websocket:
-                await websocket.send(params)
-
-                keep_alive_task = asyncio.create_task(self.send_keep_alive(websocket))
-
-                while True:
-                    message = await websocket.recv()
-                    await self.on_message(message, depth=depth)
-        except (
-            websockets.exceptions.ConnectionClosed,
-            websockets.exceptions.InvalidHandshake,
-            Exception,
-        ) as e:
-            print("XT Connection closed, restarting...")
-            await self.connect_public_websocket(depth=depth)
-
-    async def fetch_account_balance(self, balance):
-        Xt = XtAPI(self.ticker, self.public_key, self.private_key, self.group, self.kyc)
-
-        while True:
+        async def session(health):
             try:
-                self.account_balance = Xt.get_account_balance()
-                balance("XT", self.kyc, self.account_balance)
-                await asyncio.sleep(0.5)
-            except:
-                await asyncio.sleep(3)
+                async with websockets.connect(WS_HOST) as websocket:
+                    self.websocket = websocket
+                    self.last_pong_received = asyncio.get_event_loop().time()
+                    keepalive = asyncio.create_task(self.send_keep_alive(websocket))
+                    try:
+                        await self.replay_subscriptions()
+                        while True:
+                            message = await websocket.recv()
+                            health.received()
+                            await self.on_message(message, depth=depth)
+                    finally:
+                        keepalive.cancel()
+            finally:
+                self.websocket = None
+
+        await supervise("XT depth stream", session)
+
+    async def on_account_message(self, message, balance):
+        self.received()
+        if message == "pong":
+            return
+
+        message = decoding.loads(message)
+        try:
+            if message.get("id") == self.account_subscription_id:
+                if message["code"] == 0:
+                    self.account_subscribed()
+                else:
+                    print("Received message:", message)
+            elif message.get("topic") == ACCOUNT_TOPIC:
+                data = message["data"]
+                frozen = float(data["f"])
+                self.update_balance(data["a"], float(data["t"]) - frozen, frozen)
+                self.publish_balances("XT", balance)
+        except:
+            print("Received message:", message)
+
+    async def connect_private_websocket(self, Xt, balance=None):
+        async def session(health):
+            listen_key = Xt.create_ws_listen_key()
+            self.account_subscription_id = str(uuid4()).replace("-", "")
+            params = json.dumps(
+                {
+                    "method": "subscribe",
+                    "params": [ACCOUNT_TOPIC],
+                    "listenKey": listen_key,
+                    "id": self.account_subscription_id,
+                }
+            )
+            async with websockets.connect(WS_PRIVATE_HOST) as websocket:
+                keepalive = asyncio.create_task(
+                    self.keepalive("XT", websocket, ping="ping")
+                )
+                try:
+                    await websocket.send(params)
+                    while True:
+                        message = await websocket.recv()
+                        health.received()
+                        await self.on_account_message(message, balance)
+                finally:
+                    keepalive.cancel()
+
+        await supervise("XT account stream", session)
 
     async def main(self, depth=None, balance=None):
+        tasks = []
         if depth:
-            tasks = [
-                self.connect_public_websocket(depth),
-            ]
+            tasks.append(self.connect_public_websocket(depth))
 
         if balance:
-            tasks = [
-                self.fetch_account_balance(balance),
-            ]
+            Xt = XtAPI(
+                self.ticker, self.public_key, self.private_key, self.group, self.kyc
+            )
+            self.init_account_stream()
+            tasks.extend(
+                [
+                    self.connect_private_websocket(Xt, balance),
+                    self.reconcile_balances("XT", Xt, balance),
+                ]
+            )
+        if not tasks:
+            raise ValueError("Pass depth or balance to start a stream")
         await asyncio.gather(*tasks)
 
 
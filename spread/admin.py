@@ -31,3 +31,9 @@ class SpreadBotTxAdmin(admin.ModelAdmin):
         "created_at",
     )
     search_fields = ("bot__ticker",)
+
+
+@admin.register(models.SpreadBotTxRollup)
+class SpreadBotTxRollupAdmin(admin.ModelAdmin):
+    list_display = ("bot", "hour", "side", "profit", "volume", "count")
+    search_fields = ("bot__ticker",)
@@ -0,0 +1,205 @@
+import json
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+from rest_framework.test import APIRequestFactory
+
+from spread import views
+from spread.models import Exchange, SpreadBot, SpreadBotTx, SpreadBotTxRollup
+from spread.rollups import rebuild_rollups
+
+# Added by 0006_spread_indexes, missing in the "before" run
+NEW_INDEXES = [
+    (model, index)
+    for model in (SpreadBotTx, SpreadBotTxRollup)
+    for index in model._meta.indexes
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds bots and transactions inside a transaction that is rolled back, "
+        "then records EXPLAIN ANALYZE plans and timings of every spread view "
+        "with and without the composite indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bots", type=int, default=50)
+        parser.add_argument("--transactions", type=int, default=1_000_000)
+        parser.add_argument("--days", type=int, default=90)
+        parser.add_argument("--output", default="spread_query_bench.json")
+
+    def seed(self, bot_count, tx_count, days):
+        exchange = Exchange.objects.create(name="Bench")
+        bots = SpreadBot.objects.bulk_create(
+            [
+                SpreadBot(ticker=f"BENCH{i}/USDT", exchange=exchange)
+                for i in range(bot_count)
+            ]
+        )
+
+        start = now() - timedelta(days=days)
+        seconds = days * 24 * 60 * 60
+        batch = []
+        for i in range(tx_count):
+            side = "sell" if i % 2 else "buy"
+            batch.append(
+                SpreadBotTx(
+                    bot=random.choice(bots),
+                    side=side,
+                    buy_price=1.0,
+                    sell_price=1.01 if side == "sell" else None,
+                    quantity=10,
+                    fee=0.01,
+                    profit=0.09 if side == "sell" else -0.01,
+                    created_at=start + timedelta(seconds=random.randrange(seconds)),
+                )
+            )
+            if len(batch) == 10000:
+                SpreadBotTx.objects.bulk_create(batch)
+                batch = []
+        SpreadBotTx.objects.bulk_create(batch)
+        rebuild_rollups()
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        return bots
+
+    def requests(self, bot):
+        factory = APIRequestFactory()
+        transactions = {"bot_id": bot.id, "full": True}
+        return {
+            "spread_bots_data": (views.spread_bots_data, factory.get("/")),
+            "spread_historical_data": (
+                views.spread_historical_data,
+                factory.get("/historical"),
+            ),
+            "get_spread_transactions": (
+                views.get_spread_transactions,
+                factory.post("/transactions", transactions, format="json"),
+            ),
+            "get_spread_transactions_page": (
+                views.get_spread_transactions,
+                factory.post(
+                    "/transactions", dict(transactions, limit=100), format="json"
+                ),
+            ),
+            "get_spread_transactions_all": (
+                views.get_spread_transactions,
+                factory.post(
+                    "/transactions", {"bot_id": "all-transactions"}, format="json"
+                ),
+            ),
+            "export_spread_transactions": (
+                views.export_spread_transactions,
+                factory.get("/transactions/export", {"bot_id": bot.id, "full": "1"}),
+            ),
+            "average_correction": (
+                views.average_correction,
+                factory.post(
+                    "/average-correction",
+                    {"bot_id": bot.id, "new_average": 0.5},
+                    format="json",
+                ),
+            ),
+            "budget_update": (
+                views.budget_update,
+                factory.post(
+                    "/budget-update",
+                    {"bot_id": bot.id, "new_budget": 200},
+                    format="json",
+                ),
+            ),
+            "add_spread_bot": (
+                views.add_spread_bot,
+                factory.post(
+                    "/add-new-bot",
+                    {"ticker": "NEW/USDT", "exchange": "Bench"},
+                    format="json",
+                ),
+            ),
+        }
+
+    def set_indexes(self, enabled):
+        with connection.schema_editor() as editor:
+            for model, index in NEW_INDEXES:
+                if enabled:
+                    editor.add_index(model, index)
+                else:
+                    editor.remove_index(model, index)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")
+            return [row[0] for row in cursor.fetchall()]
+
+    def run_views(self, bot):
+        results = {}
+        for name, (view, request) in self.requests(bot).items():
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = view(request)
+                if response.streaming:
+                    for _ in response.streaming_content:
+                        pass
+                else:
+                    response.render()
+                elapsed = time.perf_counter() - started
+
+            selects = [
+                query["sql"]
+                for query in queries.captured_queries
+                if query["sql"].lstrip().upper().startswith("SELECT")
+            ]
+            results[name] = {
+                "ms": round(elapsed * 1000, 2),
+                "queries": len(queries.captured_queries),
+                "plans": [{"sql": sql, "plan": self.explain(sql)} for sql in selects],
+            }
+            self.stdout.write(
+                f"{name:<32}{results[name]['ms']:>12.2f}ms"
+                f"{results[name]['queries']:>6} queries"
+            )
+        return results
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("The benchmark needs PostgreSQL")
+
+        report = {
+            "options": {
+                key: options[key] for key in ("bots", "transactions", "days")
+            }
+        }
+        try:
+            with transaction.atomic():
+                self.stdout.write("Seeding...")
+                bots = self.seed(
+                    options["bots"], options["transactions"], options["days"]
+                )
+
+                self.set_indexes(False)
+                self.stdout.write("Without indexes")
+                report["before"] = self.run_views(bots[0])
+
+                self.set_indexes(True)
+                self.stdout.write("With indexes")
+                report["after"] = self.run_views(bots[0])
+                raise Rollback()
+        except Rollback:
+            pass
+
+        with open(options["output"], "w") as outfile:
+            json.dump(report, outfile, indent=2)
+        self.stdout.write(f"Plans written to {options['output']}")
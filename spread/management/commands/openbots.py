@@ -1,9 +1,15 @@
 import json
 
 from tenacity import retry, stop, wait
+from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 from spread.models import SpreadBot
-from spread.tasks import run_spread_task, run_spread_depth_cacher_bot
+from spread.tasks import (
+    run_spread_task,
+    run_spread_bot_runner,
+    run_spread_depth_cacher_bot,
+    run_spread_multiplex_depth_cacher_bot,
+)
 
 
 @retry(stop=stop.stop_after_attempt(100), wait=wait.wait_fixed(5))
@@ -11,12 +17,19 @@ def open_bots():
     with open("json/spread_bots.json", "r") as outfile:
         bots = json.load(outfile)
 
+    multiplex = settings.SPREAD_DEPTH_CACHER_MODE == "multiplex"
+    if multiplex:
+        run_spread_multiplex_depth_cacher_bot.delay()
+
+    if settings.SPREAD_BOT_RUNNER_ENABLED:
+        run_spread_bot_runner.delay()
+
     for bot in bots:
         bot_id = bot["bot_id"]
         buy_status = bot["buy"]
         sell_status = bot["sell"]
 
-        if buy_status or sell_status:
+        if (buy_status or sell_status) and not multiplex:
             run_spread_depth_cacher_bot.delay(bot_id)
 
         if buy_status:
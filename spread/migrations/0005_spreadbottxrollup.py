@@ -0,0 +1,72 @@
+# Generated by Django 3.2.9 on 2026-10-18 12:00
+
+from django.db import migrations, models
+from django.db.models import Case, Count, F, FloatField, Max, Sum, When
+from django.db.models.functions import TruncHour
+import django.db.models.deletion
+
+
+def backfill_rollups(apps, schema_editor):
+    SpreadBotTx = apps.get_model('spread', 'SpreadBotTx')
+    SpreadBotTxRollup = apps.get_model('spread', 'SpreadBotTxRollup')
+
+    volume = Case(
+        When(side='buy', then=F('quantity') * F('buy_price')),
+        default=F('quantity') * F('sell_price'),
+        output_field=FloatField(),
+    )
+    rows = (
+        SpreadBotTx.objects.annotate(hour=TruncHour('created_at'))
+        .values('bot_id', 'hour', 'side')
+        .order_by()
+        .annotate(
+            profit_sum=Sum('profit'),
+            fee_sum=Sum('fee'),
+            volume_sum=Sum(volume),
+            tx_count=Count('id'),
+            last_tx=Max('created_at'),
+        )
+    )
+
+    buckets = [
+        SpreadBotTxRollup(
+            bot_id=row['bot_id'],
+            hour=row['hour'],
+            side=row['side'],
+            profit=row['profit_sum'] or 0,
+            fee=row['fee_sum'] or 0,
+            volume=row['volume_sum'] or 0,
+            count=row['tx_count'],
+            last_tx_at=row['last_tx'],
+        )
+        for row in rows
+    ]
+    SpreadBotTxRollup.objects.bulk_create(buckets, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spread', '0004_auto_20240619_1644'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpreadBotTxRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(db_index=True)),
+                ('side', models.CharField(choices=[('buy', 'Buy'), ('sell', 'Sell')], max_length=10)),
+                ('profit', models.FloatField(default=0)),
+                ('fee', models.FloatField(default=0)),
+                ('volume', models.FloatField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('last_tx_at', models.DateTimeField()),
+                ('bot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='spread.spreadbot')),
+            ],
+            options={
+                'unique_together': {('bot', 'hour', 'side')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
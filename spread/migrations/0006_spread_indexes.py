@@ -0,0 +1,25 @@
+# Generated by Django 3.2.9 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spread', '0005_spreadbottxrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='spreadbottx',
+            index=models.Index(fields=['bot', '-created_at', '-id'], name='spread_tx_bot_created_id'),
+        ),
+        migrations.AddIndex(
+            model_name='spreadbottx',
+            index=models.Index(fields=['-created_at', '-id'], name='spread_tx_created_id'),
+        ),
+        migrations.AddIndex(
+            model_name='spreadbottxrollup',
+            index=models.Index(condition=models.Q(('side', 'sell')), fields=['bot', 'hour'], include=('profit',), name='spread_rollup_sell_profit'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.9 on 2026-10-18 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spread', '0006_spread_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='spreadbottx',
+            name='uid',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True),
+        ),
+    ]
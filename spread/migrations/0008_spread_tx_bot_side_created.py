@@ -0,0 +1,17 @@
+# Generated by Django 3.2.9 on 2026-10-18 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spread', '0007_spreadbottx_uid'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='spreadbottx',
+            index=models.Index(fields=['bot', 'side', 'created_at'], name='spread_tx_bot_side_created'),
+        ),
+    ]
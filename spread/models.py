@@ -66,6 +66,49 @@ class SpreadBotTx(models.Model):
     profit = models.FloatField()
     condition = models.CharField(max_length=255, default="M")
     created_at = models.DateTimeField(default=now, db_index=True)
+    uid = models.UUIDField(unique=True, blank=True, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Keyset pages of one bot, newest first
+            models.Index(
+                fields=["bot", "-created_at", "-id"], name="spread_tx_bot_created_id"
+            ),
+            # Keyset pages over every bot
+            models.Index(fields=["-created_at", "-id"], name="spread_tx_created_id"),
+            # Buy or sell transactions of one bot over a time range
+            models.Index(
+                fields=["bot", "side", "created_at"], name="spread_tx_bot_side_created"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.bot.ticker} - {self.created_at}"
+
+
+class SpreadBotTxRollup(models.Model):
+    """Hourly totals of SpreadBotTx per bot and side, read by the dashboards"""
+
+    bot = models.ForeignKey(SpreadBot, on_delete=models.CASCADE, db_index=True)
+    hour = models.DateTimeField(db_index=True)
+    side = models.CharField(max_length=10, choices=SpreadBotTx.SIDE_CHOICES)
+
+    profit = models.FloatField(default=0)
+    fee = models.FloatField(default=0)
+    volume = models.FloatField(default=0)
+    count = models.IntegerField(default=0)
+    last_tx_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("bot", "hour", "side")
+        indexes = [
+            models.Index(
+                fields=["bot", "hour"],
+                name="spread_rollup_sell_profit",
+                condition=models.Q(side="sell"),
+                include=["profit"],
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.bot_id} - {self.hour} - {self.side}"
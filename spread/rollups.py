@@ -0,0 +1,125 @@
+from datetime import timedelta
+import uuid
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, FloatField, Max, Sum, When
+from django.db.models.functions import Greatest, TruncHour
+from django.utils.timezone import now
+
+from spread.models import SpreadBotTx, SpreadBotTxRollup
+
+
+HISTORY_VERSION_KEY = "spread_history_version"
+
+
+def bump_history_version():
+    cache.set(HISTORY_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def history_version():
+    """Changes whenever a bot or transaction is saved or deleted"""
+    version = cache.get(HISTORY_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.add(HISTORY_VERSION_KEY, version, None)
+        version = cache.get(HISTORY_VERSION_KEY, version)
+    return version
+
+
+def tx_hour(created_at):
+    return created_at.replace(minute=0, second=0, microsecond=0)
+
+
+def tx_volume(tx):
+    price = tx.buy_price if tx.side == "buy" else tx.sell_price
+    return tx.quantity * (price or 0)
+
+
+def add_to_rollup(tx, sign=1):
+    """Add (sign=1) or remove (sign=-1) one transaction from its hourly bucket"""
+    lookup = {"bot_id": tx.bot_id, "hour": tx_hour(tx.created_at), "side": tx.side}
+    profit = sign * tx.profit
+    fee = sign * tx.fee
+    volume = sign * tx_volume(tx)
+
+    def update():
+        return SpreadBotTxRollup.objects.filter(**lookup).update(
+            profit=F("profit") + profit,
+            fee=F("fee") + fee,
+            volume=F("volume") + volume,
+            count=F("count") + sign,
+            last_tx_at=Greatest(F("last_tx_at"), tx.created_at),
+        )
+
+    if update() or sign < 0:
+        return
+
+    try:
+        with transaction.atomic():
+            SpreadBotTxRollup.objects.create(
+                **lookup,
+                profit=profit,
+                fee=fee,
+                volume=volume,
+                count=1,
+                last_tx_at=tx.created_at,
+            )
+    except IntegrityError:  # Another writer created the bucket first
+        update()
+
+
+def tx_volume_expression():
+    """Database side tx_volume, quantity times the price of the side"""
+    return Case(
+        When(side="buy", then=F("quantity") * F("buy_price")),
+        default=F("quantity") * F("sell_price"),
+        output_field=FloatField(),
+    )
+
+
+def rollup_rows(transactions):
+    """Hourly bucket totals of a SpreadBotTx queryset, one grouped query"""
+    volume = tx_volume_expression()
+    return (
+        transactions.annotate(hour=TruncHour("created_at"))
+        .values("bot_id", "hour", "side")
+        .order_by()
+        .annotate(
+            profit_sum=Sum("profit"),
+            fee_sum=Sum("fee"),
+            volume_sum=Sum(volume),
+            tx_count=Count("id"),
+            last_tx=Max("created_at"),
+        )
+    )
+
+
+def rebuild_rollups(hours=None):
+    """Recompute the buckets of the last hours, every bucket when None"""
+    transactions = SpreadBotTx.objects.all()
+    rollups = SpreadBotTxRollup.objects.all()
+    if hours is not None:
+        since = tx_hour(now() - timedelta(hours=hours))
+        transactions = transactions.filter(created_at__gte=since)
+        rollups = rollups.filter(hour__gte=since)
+
+    buckets = [
+        SpreadBotTxRollup(
+            bot_id=row["bot_id"],
+            hour=row["hour"],
+            side=row["side"],
+            profit=row["profit_sum"] or 0,
+            fee=row["fee_sum"] or 0,
+            volume=row["volume_sum"] or 0,
+            count=row["tx_count"],
+            last_tx_at=row["last_tx"],
+        )
+        for row in rollup_rows(transactions)
+    ]
+
+    with transaction.atomic():
+        rollups.delete()
+        SpreadBotTxRollup.objects.bulk_create(buckets, batch_size=1000)
+    bump_history_version()
+    return len(buckets)
@@ -0,0 +1,46 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from spread.models import SpreadBot, SpreadBotTx
+from spread.rollups import add_to_rollup, bump_history_version
+from spread.spread_bot.bot_config import notify_bot_changed
+
+
+@receiver(pre_save, sender=SpreadBotTx)
+def remember_stored_tx(sender, instance, **kwargs):
+    """Keep the stored row of an edited transaction to move it out of its bucket"""
+    instance._stored_tx = None
+    if instance.pk is not None:
+        instance._stored_tx = SpreadBotTx.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=SpreadBotTx)
+def add_tx_to_rollup(sender, instance, created, **kwargs):
+    with transaction.atomic():
+        stored = getattr(instance, "_stored_tx", None)
+        if stored is not None and not created:
+            add_to_rollup(stored, sign=-1)
+        add_to_rollup(instance)
+    bump_history_version()
+
+
+@receiver(post_delete, sender=SpreadBotTx)
+def remove_tx_from_rollup(sender, instance, **kwargs):
+    add_to_rollup(instance, sign=-1)
+    bump_history_version()
+
+
+@receiver(post_save, sender=SpreadBot)
+def update_bot_in_history(sender, instance, **kwargs):
+    bump_history_version()
+
+
+@receiver(post_save, sender=SpreadBot)
+def reload_bot_config(sender, instance, **kwargs):
+    notify_bot_changed(instance.id)
+
+
+@receiver(post_delete, sender=SpreadBot)
+def remove_bot_from_history(sender, instance, **kwargs):
+    bump_history_version()
@@ -3,6 +3,7 @@ import asyncio
 from channels.db import database_sync_to_async
 from django.core.cache import cache
 
+from exchanges import aio
 from exchanges.api_classes import ws_classes
 from spread.models import ExchangeApi
 
@@ -21,7 +22,7 @@ def run_spread_exchange_balance_cacher_bot(exchange, api_object):
         api_object["group"],
         api_object["kyc"],
     )
-    asyncio.run(WS_class.main(balance=balance))
+    asyncio.run(aio.closing(WS_class.main(balance=balance)))
 
 
 class SpreadBalanceCacherBot:
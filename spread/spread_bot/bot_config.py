@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django_redis import get_redis_connection
+
+from spread.models import SpreadBot
+
+logger = logging.getLogger(__name__)
+
+CONFIG_CHANNEL = "spread:bot_config"
+
+
+def notify_bot_changed(bot_id):
+    """Tell every bot process to reload the bot once the change is committed"""
+
+    def publish():
+        configs.invalidate(bot_id)
+        get_redis_connection("default").publish(CONFIG_CHANNEL, str(bot_id))
+
+    transaction.on_commit(publish)
+
+
+class BotConfigCache:
+    """Process wide cache of SpreadBot rows invalidated over Redis pub/sub
+
+    SpreadBot saves and the bots' own updates publish the bot id, a daemon
+    thread listening on the channel drops the cached row. While the listener
+    is not connected every get reads the database, and rows are reloaded
+    after SPREAD_BOT_CONFIG_MAX_AGE seconds in any case.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bots = {}  # bot_id -> (SpreadBot, loaded at)
+        self.generations = {}  # bot_id -> invalidation count
+        self.listening = False
+        self.thread = None
+
+    def get(self, bot_id):
+        if not settings.SPREAD_BOT_CONFIG_CACHE_ENABLED:
+            return SpreadBot.objects.get(id=bot_id)
+
+        self.start()
+        with self.lock:
+            cached = self.bots.get(bot_id)
+            generation = self.generations.get(bot_id, 0)
+            listening = self.listening
+        if (
+            cached
+            and listening
+            and time.time() - cached[1] < settings.SPREAD_BOT_CONFIG_MAX_AGE
+        ):
+            return cached[0]
+
+        bot = SpreadBot.objects.select_related("exchange").get(id=bot_id)
+        with self.lock:
+            # A change published during the load may not be in this row
+            if self.listening and self.generations.get(bot_id, 0) == generation:
+                self.bots[bot_id] = (bot, time.time())
+        return bot
+
+    def invalidate(self, bot_id=None):
+        with self.lock:
+            if bot_id is None:
+                self.bots.clear()
+                for key in self.generations:
+                    self.generations[key] += 1
+                return
+            self.bots.pop(bot_id, None)
+            self.generations[bot_id] = self.generations.get(bot_id, 0) + 1
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.listen, name="bot-config-listener", daemon=True
+                )
+                self.thread.start()
+
+    def listen(self):
+        while True:
+            pubsub = get_redis_connection("default").pubsub(
+                ignore_subscribe_messages=True
+            )
+            try:
+                pubsub.subscribe(CONFIG_CHANNEL)
+                pubsub.get_message(timeout=1.0)  # Subscription confirmed
+                self.invalidate()  # Changes may have been missed while away
+                with self.lock:
+                    self.listening = True
+
+                for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.invalidate(int(message["data"]))
+            except Exception:
+                logger.exception("Bot config listener failed, reconnecting")
+            finally:
+                with self.lock:
+                    self.listening = False
+                pubsub.close()
+            time.sleep(1)
+
+
+configs = BotConfigCache()
+
+
+def get_bot(bot_id):
+    return configs.get(bot_id)
@@ -2,18 +2,51 @@ import asyncio
 
 from channels.db import database_sync_to_async
 from django.core.cache import cache
+from django.db.models import Q
 
+from exchanges import aio
 from exchanges.api_classes import ws_classes
+from exchanges.ws_supervisor import connection_health
 from spread.models import SpreadBot, ExchangeApi
+from .depth_publisher import DepthPublisher
 
 
 class SpreadDepthCacherBot:
+    keepalive_interval = 1  # Seconds between checks for quiet books
+
     def __init__(self, bot_id):
         self.bot_id = bot_id
+        self.publisher = DepthPublisher()
+        self.sources = {}  # (ticker, exchange) -> (ws, websocket) that pushed it
+
+    def stream_depth(self, ws):
+        """depth callback of one connection, remembering the source of books"""
+
+        def depth(exchange, asks, bids, ticker=None, exchange_ts=None, seq=None):
+            ticker = ticker or self.ticker
+            self.sources[(ticker, exchange)] = (ws, ws.websocket)
+            self.publisher.publish(ticker, exchange, asks, bids, exchange_ts, seq)
+
+        return depth
 
-    def depth(self, exchange, asks, bids):
-        depth = {"asks": asks, "bids": bids}
-        cache.set(f"{self.ticker}_{exchange}_depth", depth, 5 * 60)
+    def is_live(self, key):
+        """The connection that pushed the book is open and still subscribed
+
+        Dead connections are closed by the websocket keepalive pings, a new
+        connection only vouches for a book once it pushed it again.
+        """
+        ws, websocket = self.sources.get(key, (None, None))
+        return (
+            websocket is not None
+            and ws.websocket is websocket
+            and websocket.open
+            and key[0] in ws.tickers
+        )
+
+    async def keep_books_fresh(self):
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            self.publisher.refresh(self.is_live)
 
     @database_sync_to_async
     def get_trader_model(self):
@@ -34,17 +67,105 @@ class SpreadDepthCacherBot:
 
         api_objects = await self.get_exchange_apis(exchange)
         for api_object in api_objects:
-            tasks.append(
-                ws_classes[exchange](
-                    self.ticker,
-                    api_object["public_key"],
-                    api_object["private_key"],
-                    api_object["group"],
-                    api_object["kyc"],
-                ).main(depth=self.depth)
+            ws = ws_classes[exchange](
+                self.ticker,
+                api_object["public_key"],
+                api_object["private_key"],
+                api_object["group"],
+                api_object["kyc"],
             )
+            tasks.append(ws.main(depth=self.stream_depth(ws)))
 
-        await asyncio.gather(*tasks)
+        await asyncio.gather(self.keep_books_fresh(), *tasks)
 
     def run(self):
-        asyncio.run(self.start_ws())
+        asyncio.run(aio.closing(self.start_ws()))
+
+
+class SpreadMultiplexDepthCacherBot(SpreadDepthCacherBot):
+    """Depth cacher for every active bot, sharing connections per exchange
+
+    Tickers of active bots are grouped by exchange and spread over as few
+    websocket connections as each venue allows. The bot list is polled and
+    tickers are subscribed or unsubscribed on the live connections, so
+    starting or stopping a bot never forces a reconnect. The health of the
+    connections is kept in the spread_depth_connections cache key.
+    """
+
+    refresh_interval = 10
+
+    def __init__(self):
+        self.ticker = None
+        self.publisher = DepthPublisher()
+        self.sources = {}
+        self.connections = {}  # exchange -> [ws instances]
+        self.tasks = []
+
+    @database_sync_to_async
+    def get_active_tickers(self):
+        bots = SpreadBot.objects.filter(Q(buy_status=True) | Q(sell_status=True))
+        tickers = {}
+        for exchange, ticker in bots.values_list("exchange__name", "ticker"):
+            tickers.setdefault(exchange, set()).add(ticker)
+        return tickers
+
+    @database_sync_to_async
+    def get_exchange_api(self, exchange):
+        return ExchangeApi.objects.filter(exchange__name=exchange).values().first()
+
+    async def open_connection(self, exchange):
+        api_object = await self.get_exchange_api(exchange)
+        if not api_object:
+            print(f"No api keys for {exchange}, depth not cached")
+            return None
+
+        ws = ws_classes[exchange](
+            None,
+            api_object["public_key"],
+            api_object["private_key"],
+            api_object["group"],
+            api_object["kyc"],
+        )
+        self.connections.setdefault(exchange, []).append(ws)
+        self.tasks.append(
+            asyncio.create_task(
+                ws.connect_public_websocket(depth=self.stream_depth(ws))
+            )
+        )
+        return ws
+
+    async def update_subscriptions(self, exchange, tickers):
+        connections = self.connections.get(exchange, [])
+        for ws in connections:
+            removed = ws.tickers - tickers
+            if removed:
+                await ws.unsubscribe(removed)
+
+        subscribed = set()
+        for ws in connections:
+            subscribed |= ws.tickers
+
+        for ticker in sorted(tickers - subscribed):
+            ws = next((ws for ws in connections if ws.has_capacity()), None)
+            if ws is None:
+                ws = await self.open_connection(exchange)
+                if ws is None:
+                    return
+                connections = self.connections[exchange]
+            await ws.subscribe([ticker])
+
+    async def start_ws(self):
+        self.tasks.append(asyncio.create_task(self.keep_books_fresh()))
+        while True:
+            tickers = await self.get_active_tickers()
+            for exchange in set(tickers) | set(self.connections):
+                if exchange not in ws_classes:
+                    continue
+                await self.update_subscriptions(exchange, tickers.get(exchange, set()))
+
+            cache.set(
+                "spread_depth_connections",
+                connection_health(),
+                3 * self.refresh_interval,
+            )
+            await asyncio.sleep(self.refresh_interval)
@@ -0,0 +1,74 @@
+"""Binary encoding of the depth books cached in Redis
+
+A book is a fixed header followed by the ask and the bid (price, size)
+pairs as little endian float64. The header holds the format version, both
+level counts, the exchange time, the time the cacher received the book and
+the venue's sequence number (-1 for none).
+
+decode_depth returns the same dict readers got from the pickled books, with
+the levels as (count, 2) float64 NumPy views over the encoded bytes, or as
+lists of (price, size) tuples when NumPy is not installed.
+"""
+import struct
+import sys
+from array import array
+from functools import lru_cache
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+VERSION = 1
+# version, ask count, bid count, exchange_ts, received_at, seq
+HEADER = struct.Struct("<BxHHxxddq")
+
+
+@lru_cache(maxsize=None)
+def levels_struct(count):
+    return struct.Struct(f"<{count * 2}d")
+
+
+def levels(data, offset, count):
+    """count (price, size) float64 pairs of data starting at offset"""
+    if numpy is not None:
+        values = numpy.frombuffer(data, "<f8", count * 2, offset)
+        return values.reshape(count, 2)
+
+    values = array("d")
+    values.frombytes(data[offset : offset + count * 16])
+    if sys.byteorder == "big":
+        values.byteswap()
+    pairs = iter(values)
+    return list(zip(pairs, pairs))
+
+
+def encode_depth(asks, bids, exchange_ts=None, received_at=None, seq=None):
+    values = [float(value) for level in asks for value in level[:2]]
+    values += [float(value) for level in bids for value in level[:2]]
+    return HEADER.pack(
+        VERSION,
+        len(asks),
+        len(bids),
+        exchange_ts or 0,
+        received_at or 0,
+        -1 if seq is None else int(seq),
+    ) + levels_struct(len(asks) + len(bids)).pack(*values)
+
+
+def decode_depth(data):
+    version, ask_count, bid_count, exchange_ts, received_at, seq = (
+        HEADER.unpack_from(data, 0)
+    )
+    if version != VERSION:
+        raise ValueError(f"Unknown depth encoding version: {version}")
+
+    bids_offset = HEADER.size + ask_count * 16
+    return {
+        "asks": levels(data, HEADER.size, ask_count),
+        "bids": levels(data, bids_offset, bid_count),
+        "exchange_ts": exchange_ts or None,
+        "received_at": received_at or None,
+        "seq": None if seq < 0 else seq,
+    }
@@ -0,0 +1,161 @@
+import asyncio
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .depth_codec import encode_depth
+from .depth_store import write_local_depth
+from .notifications import notify_depth_change
+
+
+POLICIES = ("every", "best", "rate")
+NOTIFY_LEVELS = 2  # Bots only look at the best two bid and ask prices
+
+
+class DepthPublisher:
+    """Writes depth to Redis and the local store only when it is worth it
+
+    Each message is reduced to its top `levels` levels and compared with the
+    last published snapshot of the same ticker, identical books are dropped.
+    Policy "every" publishes any change of the top levels, "best" only a
+    change of the two best asks or bids bots price against and "rate" any
+    change but at most `max_rate` times per second, with a trailing write so
+    the last state always lands. Unchanged books are still republished every
+    `keepalive` seconds so the Redis TTL and the store max age never run out.
+    A book without any push is republished by refresh() as long as its feed
+    is alive, so bots can tell a quiet book from a stale one.
+
+    Books are written with the exchange time and sequence of the push and
+    the time it was received, Redis gets them encoded by depth_codec.
+    """
+
+    stats_interval = 10
+
+    def __init__(self, policy=None, max_rate=None, levels=None, keepalive=None):
+        self.policy = policy or settings.SPREAD_DEPTH_PUBLISH_POLICY
+        if self.policy not in POLICIES:
+            raise ValueError(f"Unknown depth publish policy: {self.policy}")
+
+        self.min_interval = 1 / (max_rate or settings.SPREAD_DEPTH_PUBLISH_MAX_RATE)
+        self.levels = levels or settings.SPREAD_DEPTH_PUBLISH_LEVELS
+        if keepalive is None:
+            keepalive = 60
+            if settings.SPREAD_DEPTH_MAX_AGE:
+                keepalive = min(keepalive, settings.SPREAD_DEPTH_MAX_AGE / 3)
+        self.keepalive = keepalive
+
+        self.last_books = {}  # (ticker, exchange) -> top levels
+        self.last_published = {}  # (ticker, exchange) -> timestamp
+        self.last_prices = {}  # (ticker, exchange) -> top prices bots were told about
+        self.last_depth = {}  # (ticker, exchange) -> (asks, bids, meta) last written
+        self.pending = {}  # (ticker, exchange) -> (asks, bids, meta) for rate policy
+        self.published = Counter()  # exchange -> writes since the last flush
+        self.suppressed = Counter()
+        self.stats_flushed_at = time.time()
+
+    def snapshot(self, asks, bids):
+        if self.policy == "best":
+            return (
+                tuple(map(tuple, asks[:NOTIFY_LEVELS])),
+                tuple(map(tuple, bids[:NOTIFY_LEVELS])),
+            )
+        return (
+            tuple(map(tuple, asks[: self.levels])),
+            tuple(map(tuple, bids[: self.levels])),
+        )
+
+    def publish(self, ticker, exchange, asks, bids, exchange_ts=None, seq=None):
+        key = (ticker, exchange)
+        now = time.time()
+        meta = {"exchange_ts": exchange_ts, "received_at": now, "seq": seq}
+        snapshot = self.snapshot(asks, bids)
+        last_published = self.last_published.get(key, 0)
+
+        changed = snapshot != self.last_books.get(key)
+        if not changed and now - last_published < self.keepalive:
+            self.pending.pop(key, None)  # Book went back to the published one
+            self.suppressed[exchange] += 1
+        elif changed and self.policy == "rate":
+            if now - last_published >= self.min_interval:
+                self.write(key, asks, bids, meta, snapshot, now)
+            else:
+                self.schedule(
+                    key, asks, bids, meta, last_published + self.min_interval
+                )
+        else:
+            self.write(key, asks, bids, meta, snapshot, now)
+
+        if now - self.stats_flushed_at >= self.stats_interval:
+            self.flush_stats(now)
+
+    def write(self, key, asks, bids, meta, snapshot, now):
+        ticker, exchange = key
+        asks = asks[: self.levels]
+        bids = bids[: self.levels]
+        depth = encode_depth(asks, bids, **meta)
+        cache.set(f"{ticker}_{exchange}_depth", depth, 5 * 60)
+        write_local_depth(ticker, exchange, asks, bids, **meta)
+
+        prices = (
+            [level[0] for level in asks[:NOTIFY_LEVELS]],
+            [level[0] for level in bids[:NOTIFY_LEVELS]],
+        )
+        if prices != self.last_prices.get(key):
+            self.last_prices[key] = prices
+            notify_depth_change(ticker, exchange)
+
+        self.last_books[key] = snapshot
+        self.last_depth[key] = (asks, bids, meta)
+        self.last_published[key] = now
+        self.pending.pop(key, None)
+        self.published[exchange] += 1
+
+    def refresh(self, alive):
+        """Write again the books quiet for `keepalive` seconds if alive(key)
+
+        A book of a live connection is current however long the venue stays
+        quiet, it gets a new received_at. Books of a dead feed are forgotten
+        and left to go stale.
+        """
+        now = time.time()
+        for key, (asks, bids, meta) in list(self.last_depth.items()):
+            if now - self.last_published[key] < self.keepalive or key in self.pending:
+                continue
+            if not alive(key):
+                del self.last_depth[key]
+                continue
+
+            meta = dict(meta, received_at=now)
+            self.write(key, asks, bids, meta, self.last_books[key], now)
+
+    def schedule(self, key, asks, bids, meta, at):
+        """Keep the latest book and write it once the rate window is over"""
+        if key not in self.pending:
+            delay = max(at - time.time(), 0)
+            asyncio.get_running_loop().call_later(delay, self.flush, key)
+        else:
+            self.suppressed[key[1]] += 1  # The previous pending book is replaced
+
+        self.pending[key] = (asks, bids, meta)
+
+    def flush(self, key):
+        pending = self.pending.get(key)
+        if pending:
+            asks, bids, meta = pending
+            self.write(key, asks, bids, meta, self.snapshot(asks, bids), time.time())
+
+    def flush_stats(self, now):
+        """Add the local counters to the shared {exchange}_depth_* counters"""
+        for name, counter in (
+            ("published", self.published),
+            ("suppressed", self.suppressed),
+        ):
+            for exchange, count in counter.items():
+                stats_key = f"{exchange}_depth_{name}"
+                cache.add(stats_key, 0, None)
+                cache.incr(stats_key, count)
+            counter.clear()
+
+        self.stats_flushed_at = now
@@ -0,0 +1,196 @@
+import fcntl
+import mmap
+import os
+import struct
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .depth_codec import decode_depth, levels, levels_struct
+
+
+MAX_LEVELS = 50
+# Part of the file name, bump it with any change of the layout below so
+# processes running another version never map each other's files
+LAYOUT_VERSION = 2
+
+# seqlock, received_at, ask count, bid count, exchange_ts, book seq (-1 for none)
+HEADER = struct.Struct("<QdIIdq")
+SEQ = struct.Struct("<Q")
+ASKS_OFFSET = HEADER.size
+BIDS_OFFSET = ASKS_OFFSET + MAX_LEVELS * 16
+SIZE = BIDS_OFFSET + MAX_LEVELS * 16
+
+
+class SharedDepthStore:
+    """Fixed layout, seqlock versioned order book in a memory-mapped file
+
+    One file per ticker holds the header followed by MAX_LEVELS ask and bid
+    (price, size) float64 pairs. The header carries the time the cacher
+    received the book, the exchange time and the venue's sequence number.
+    The writer bumps the lock seq to an odd value before touching the levels
+    and to the next even value after, readers copy the region without
+    locking and retry when the lock seq was odd or moved underneath them.
+    Writers serialize on flock so two cachers for the same ticker cannot
+    interleave. read returns the levels the way depth_codec decodes them.
+    """
+
+    def __init__(self, path, writable=False):
+        self.path = path
+        self.writable = writable
+
+        if writable:
+            if not os.path.exists(path):
+                self.create(path)
+            self.fd = os.open(path, os.O_RDWR)
+            if os.fstat(self.fd).st_size < SIZE:
+                os.ftruncate(self.fd, SIZE)
+            self.buffer = mmap.mmap(self.fd, SIZE)
+        else:
+            self.fd = os.open(path, os.O_RDONLY)
+            if os.fstat(self.fd).st_size < SIZE:
+                os.close(self.fd)
+                raise ValueError(f"Depth store {path} is not initialized")
+            self.buffer = mmap.mmap(self.fd, SIZE, prot=mmap.PROT_READ)
+
+    @staticmethod
+    def create(path):
+        """Put a full size file at path, readers never see a shorter one"""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, SIZE)
+            os.link(tmp_path, path)
+        except FileExistsError:
+            pass  # Another cacher created it first
+        finally:
+            os.close(fd)
+            os.unlink(tmp_path)
+
+    def write(self, asks, bids, received_at=None, exchange_ts=None, seq=None):
+        asks = asks[:MAX_LEVELS]
+        bids = bids[:MAX_LEVELS]
+        ask_values = [float(value) for level in asks for value in level[:2]]
+        bid_values = [float(value) for level in bids for value in level[:2]]
+
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            lock_seq = SEQ.unpack_from(self.buffer, 0)[0] | 1
+            SEQ.pack_into(self.buffer, 0, lock_seq)
+            levels_struct(len(asks)).pack_into(self.buffer, ASKS_OFFSET, *ask_values)
+            levels_struct(len(bids)).pack_into(self.buffer, BIDS_OFFSET, *bid_values)
+            HEADER.pack_into(
+                self.buffer,
+                0,
+                lock_seq + 1,
+                received_at or time.time(),
+                len(asks),
+                len(bids),
+                exchange_ts or 0,
+                -1 if seq is None else int(seq),
+            )
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def read(self, retries=100):
+        """Consistent snapshot of the book or None if it was never written"""
+        for _ in range(retries):
+            data = self.buffer[:SIZE]
+            (
+                lock_seq,
+                received_at,
+                ask_count,
+                bid_count,
+                exchange_ts,
+                seq,
+            ) = HEADER.unpack_from(data, 0)
+            if lock_seq & 1:
+                continue
+            if SEQ.unpack_from(self.buffer, 0)[0] != lock_seq:
+                continue
+            if lock_seq == 0:
+                return None
+
+            return {
+                "asks": levels(data, ASKS_OFFSET, ask_count),
+                "bids": levels(data, BIDS_OFFSET, bid_count),
+                "received_at": received_at,
+                "exchange_ts": exchange_ts or None,
+                "seq": None if seq < 0 else seq,
+            }
+
+        return None
+
+    def close(self):
+        self.buffer.close()
+        os.close(self.fd)
+
+
+def depth_store_path(ticker, exchange):
+    name = f"{exchange}_{ticker}".replace("/", "_")
+    return os.path.join(
+        settings.SPREAD_DEPTH_STORE_DIR, f"{name}.v{LAYOUT_VERSION}.depth"
+    )
+
+
+_writers = {}
+_readers = {}
+
+
+def write_local_depth(ticker, exchange, asks, bids, **meta):
+    if not settings.SPREAD_DEPTH_STORE_ENABLED:
+        return
+
+    path = depth_store_path(ticker, exchange)
+    store = _writers.get(path)
+    if store is None:
+        os.makedirs(settings.SPREAD_DEPTH_STORE_DIR, exist_ok=True)
+        store = _writers[path] = SharedDepthStore(path, writable=True)
+
+    store.write(asks, bids, **meta)
+
+
+def read_local_depth(ticker, exchange):
+    if not settings.SPREAD_DEPTH_STORE_ENABLED:
+        return None
+
+    path = depth_store_path(ticker, exchange)
+    store = _readers.get(path)
+    if store is None:
+        if not os.path.exists(path):
+            return None
+        try:
+            store = SharedDepthStore(path)
+        except ValueError:
+            return None
+        _readers[path] = store
+
+    depth = store.read()
+    if not depth:
+        return None
+
+    if time.time() - depth["received_at"] > settings.SPREAD_DEPTH_STORE_MAX_AGE:
+        return None  # Cacher is gone or not on this host anymore
+
+    return depth
+
+
+def depth_age(depth):
+    """Seconds since the cacher received the book, None if it was not timed"""
+    received_at = depth.get("received_at")
+    if received_at is None:
+        return None
+    return time.time() - received_at
+
+
+def get_depth(ticker, exchange):
+    """Depth from the local store, falling back to Redis for remote cachers"""
+    depth = read_local_depth(ticker, exchange)
+    if depth:
+        return depth
+
+    depth = cache.get(f"{ticker}_{exchange}_depth")
+    if isinstance(depth, bytes):
+        return decode_depth(depth)
+    return depth  # Missing, or pickled by a cacher older than depth_codec
@@ -0,0 +1,67 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+FILL_TIMEOUT = 24 * 60 * 60
+
+
+def fill_key(exchange, kyc, order_id):
+    return f"{exchange}_{kyc}_fill_{order_id}"
+
+
+def stream_key(exchange, kyc):
+    return f"{exchange}_{kyc}_order_stream"
+
+
+def record_fills(exchange, kyc, connected_at, fills):
+    """Store the cumulative fills pushed by the order stream of an account
+
+    A push never lowers the filled quantity of an order, late duplicates are
+    dropped. The stream key holds the time the stream started seeing every
+    update and expires when the heartbeat stops.
+    """
+    for order_id, filled_price, filled_quantity, status in fills:
+        key = fill_key(exchange, kyc, order_id)
+        fill = cache.get(key)
+        if fill and fill["filled_quantity"] > filled_quantity:
+            continue
+
+        cache.set(
+            key,
+            {
+                "filled_price": filled_price,
+                "filled_quantity": filled_quantity,
+                "status": status,
+                "updated_at": time.time(),
+            },
+            FILL_TIMEOUT,
+        )
+
+    if connected_at:
+        cache.set(
+            stream_key(exchange, kyc),
+            connected_at,
+            settings.SPREAD_ORDER_STREAM_MAX_AGE,
+        )
+
+
+def get_order_fill(exchange, kyc, order_id, placed_at):
+    """(filled_price, filled_quantity, fill) from the ledger
+
+    None when the stream cannot vouch for the order: it is down, it
+    (re)connected after the order was placed and may have missed updates, or
+    it has not pushed the order yet. The stream records new orders too, so a
+    missing fill is not proof of an untouched order.
+    """
+    if not settings.SPREAD_ORDER_STREAMS_ENABLED or not placed_at:
+        return None
+
+    connected_at = cache.get(stream_key(exchange, kyc))
+    if connected_at is None or connected_at > placed_at:
+        return None
+
+    fill = cache.get(fill_key(exchange, kyc, order_id))
+    if fill is None:
+        return None
+    return fill["filled_price"], fill["filled_quantity"], fill
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+
+def depth_channel(ticker, exchange):
+    return f"spread:depth:{exchange}:{ticker}"
+
+
+def notify_depth_change(ticker, exchange):
+    """Tell the bots of this ticker that the top of the book moved"""
+    if not settings.SPREAD_DEPTH_NOTIFICATIONS_ENABLED:
+        return
+
+    get_redis_connection("default").publish(depth_channel(ticker, exchange), b"1")
+
+
+class DepthChangeListener:
+    """Process wide Redis pub/sub listener for depth change events
+
+    A single daemon thread owns the pub/sub connection and wakes every
+    waiter of a channel when a change is published on it. Each waiter has
+    its own Event, so bots waiting on the same book are all woken. Channels
+    are requested from any thread and subscribed by the listener itself, as
+    redis-py pub/sub objects are not thread safe.
+    The thread blocks on the socket, so a quiet book costs neither CPU nor
+    Redis traffic.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.channels = set()
+        self.waiters = {}  # channel -> {wake callable} of waiting bots
+        self.requested = set()
+        self.thread = None
+
+    def subscribe(self, channel):
+        with self.lock:
+            if channel not in self.channels:
+                self.channels.add(channel)
+                self.requested.add(channel)
+
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.listen, name="depth-change-listener", daemon=True
+                )
+                self.thread.start()
+
+    def listen(self):
+        pubsub = get_redis_connection("default").pubsub(
+            ignore_subscribe_messages=True
+        )
+        with self.lock:
+            self.requested = set(self.channels)
+
+        try:
+            while True:
+                with self.lock:
+                    requested, self.requested = self.requested, set()
+                if requested:
+                    pubsub.subscribe(*requested)
+
+                message = pubsub.get_message(timeout=1.0)
+                if message and message["type"] == "message":
+                    channel = message["channel"].decode()
+                    with self.lock:
+                        waiters = list(self.waiters.get(channel, ()))
+                    for wake in waiters:
+                        wake()
+        finally:
+            pubsub.close()
+
+    def add_waiter(self, ticker, exchange, wake):
+        channel = depth_channel(ticker, exchange)
+        self.subscribe(channel)
+        with self.lock:
+            self.waiters.setdefault(channel, set()).add(wake)
+        return channel
+
+    def remove_waiter(self, channel, wake):
+        with self.lock:
+            self.waiters[channel].discard(wake)
+
+    def wait(self, ticker, exchange, timeout):
+        """Block until the book changes or timeout, True if it changed"""
+        event = threading.Event()
+        wake = event.set
+        channel = self.add_waiter(ticker, exchange, wake)
+        try:
+            return event.wait(timeout)
+        finally:
+            self.remove_waiter(channel, wake)
+
+    async def async_wait(self, ticker, exchange, timeout):
+        """Same as wait without blocking the event loop"""
+        event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        def wake():
+            loop.call_soon_threadsafe(event.set)
+
+        channel = self.add_waiter(ticker, exchange, wake)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.remove_waiter(channel, wake)
+
+
+listener = DepthChangeListener()
+
+
+def wait_for_depth_change(ticker, exchange, timeout):
+    return listener.wait(ticker, exchange, timeout)
+
+
+async def async_wait_for_depth_change(ticker, exchange, timeout):
+    return await listener.async_wait(ticker, exchange, timeout)
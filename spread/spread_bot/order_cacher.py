@@ -0,0 +1,57 @@
+import asyncio
+
+from django.conf import settings
+
+from exchanges import aio
+from exchanges.api_classes import ws_classes
+from spread.models import ExchangeApi
+from .fill_ledger import record_fills
+
+from app.celery import app
+
+
+@app.task(autoretry_for=(), max_retries=0, retry_backoff=False)
+def run_spread_exchange_order_cacher_bot(exchange, api_object):
+    WS_class = ws_classes[exchange](
+        "",
+        api_object["public_key"],
+        api_object["private_key"],
+        api_object["group"],
+        api_object["kyc"],
+    )
+    asyncio.run(aio.closing(WS_class.main(order=record_fills)))
+
+
+class SpreadOrderCacherBot:
+    """Keeps the fill ledger of every account with a private order stream"""
+
+    def get_exchange_apis(self):
+        api_objects = list(
+            ExchangeApi.objects.filter().values(
+                "exchange__name",
+                "public_key",
+                "private_key",
+                "group",
+                "kyc",
+            )
+        )
+        return [
+            api_object
+            for api_object in api_objects
+            if hasattr(
+                ws_classes.get(api_object["exchange__name"]), "connect_order_websocket"
+            )
+        ]
+
+    def start_ws(self):
+        api_objects = self.get_exchange_apis()
+        for api_object in api_objects:
+            run_spread_exchange_order_cacher_bot.delay(
+                api_object["exchange__name"], api_object
+            )
+
+    def run(self):
+        if not settings.SPREAD_ORDER_STREAMS_ENABLED:
+            return
+
+        self.start_ws()
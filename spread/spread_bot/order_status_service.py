@@ -0,0 +1,35 @@
+from exchanges.bingx.bingx_api_class import BingXAPI
+from exchanges.bingx.bingx_order_status import BingXOrderStatusService
+from spread.models import ExchangeApi
+
+from app.celery import app
+
+
+@app.task(autoretry_for=(), max_retries=0, retry_backoff=False)
+def run_spread_exchange_order_status_service(api_object):
+    api = BingXAPI(
+        "",
+        api_object["public_key"],
+        api_object["private_key"],
+        api_object["group"],
+        api_object["kyc"],
+    )
+    BingXOrderStatusService(api).run()
+
+
+class SpreadOrderStatusServiceBot:
+    """Starts the batched order status service of every BingX account"""
+
+    def get_exchange_apis(self):
+        return list(
+            ExchangeApi.objects.filter(exchange__name="BingX").values(
+                "public_key",
+                "private_key",
+                "group",
+                "kyc",
+            )
+        )
+
+    def run(self):
+        for api_object in self.get_exchange_apis():
+            run_spread_exchange_order_status_service.delay(api_object)
@@ -0,0 +1,219 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Floor
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import now
+from django_redis import get_redis_connection
+from redis.exceptions import LockError, WatchError
+
+from spread.models import SpreadBot, SpreadBotTx
+from spread.rollups import add_to_rollup, bump_history_version
+from .bot_config import notify_bot_changed
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_KEY = "spread:tx_journal"
+CANCELLED_KEY = "spread:tx_journal_cancelled"  # uids never to insert
+FLUSH_LOCK_KEY = "spread:tx_journal_lock"
+FLUSH_LOCK_TIMEOUT = 60  # Seconds, renewed after every batch
+FLUSH_BATCH_SIZE = 100
+
+
+def buy_fill_update(price, quantity):
+    """New average price and sellable quantity after a buy fill, in SQL"""
+    return {
+        "average_price": (
+            F("average_price") * F("sellable_quantity") + price * quantity
+        )
+        / (F("sellable_quantity") + quantity),
+        "sellable_quantity": F("sellable_quantity") + quantity,
+    }
+
+
+def sell_fill_update(quantity, quantizer):
+    """Sellable quantity floored to the quantity step after a sell fill, in SQL
+
+    The average price is reset once nothing is left to sell.
+    """
+    return {
+        "sellable_quantity": Floor(
+            (F("sellable_quantity") - quantity) * quantizer.scale
+            / quantizer.tick_units
+            + 1e-9  # Float noise, see Quantizer.ticks
+        )
+        * quantizer.tick_units
+        / float(quantizer.scale),  # FLOOR is an integer on SQLite
+        "average_price": Case(
+            When(
+                sellable_quantity__gte=quantity,
+                sellable_quantity__lt=quantity + quantizer.tick,
+                then=Value(0.0),
+            ),
+            default=F("average_price"),
+            output_field=FloatField(),
+        ),
+    }
+
+
+def record_fill(bot_id, bot_update, tx):
+    """Apply a fill to the bot and record its transaction atomically
+
+    With SPREAD_TX_WRITE_BEHIND the transaction goes to a Redis journal first
+    and is inserted by the journal flusher, the bot update is still applied
+    immediately. A failed bot update takes the journal entry back.
+    """
+    tx = dict(tx, uid=str(uuid.uuid4()), created_at=now())
+
+    if not settings.SPREAD_TX_WRITE_BEHIND:
+        with transaction.atomic():
+            update_bot(bot_id, **bot_update)
+            SpreadBotTx.objects.create(**tx)
+        return
+
+    journal.push(tx)
+    try:
+        update_bot(bot_id, **bot_update)
+    except Exception:
+        journal.cancel(tx)
+        raise
+
+
+def update_bot(bot_id, **fields):
+    """UPDATE the bot row, the bots reload it on their next tick"""
+    SpreadBot.objects.filter(id=bot_id).update(**fields)
+    notify_bot_changed(bot_id)
+
+
+def write_transactions(txs, cancelled=()):
+    """Insert journaled transactions, skipping the ones already inserted"""
+    txs = [tx for tx in txs if tx["uid"] not in cancelled]
+    uids = [tx["uid"] for tx in txs]
+    with transaction.atomic():
+        existing = {
+            str(uid)
+            for uid in SpreadBotTx.objects.filter(uid__in=uids).values_list(
+                "uid", flat=True
+            )
+        }
+        new = [
+            SpreadBotTx(**dict(tx, created_at=parse_datetime(tx["created_at"])))
+            for tx in txs
+            if tx["uid"] not in existing
+        ]
+        SpreadBotTx.objects.bulk_create(new)
+        for tx in new:  # bulk_create sends no post_save
+            add_to_rollup(tx)
+
+    if new:
+        bump_history_version()
+    return len(new)
+
+
+class TransactionJournal:
+    """Crash safe write-behind queue of SpreadBotTx rows
+
+    Rows are pushed to a Redis list and inserted in batches by a flusher
+    thread of the process. A batch leaves the list only after it was
+    committed. Rows carry a uid, so a batch replayed after a crash between
+    the commit and the trim is not inserted twice. Any process, and the
+    flush_spread_tx_journal task, can flush what a dead process left.
+
+    A flusher renews its lock after every batch and stops once it lost it,
+    and a batch is only trimmed while it is still the head of the list, so
+    a flusher that stalled past the lock timeout never drops rows another
+    flusher has not written yet.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = None
+
+    @property
+    def redis(self):
+        return get_redis_connection("default")
+
+    def push(self, tx):
+        self.redis.rpush(JOURNAL_KEY, json.dumps(tx, cls=DjangoJSONEncoder))
+        self.start_flusher()
+
+    def cancel(self, tx):
+        self.redis.sadd(CANCELLED_KEY, tx["uid"])
+
+    def start_flusher(self):
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+
+        threading.Thread(target=self.run_flusher, daemon=True).start()
+        atexit.register(self.flush)
+
+    def run_flusher(self):
+        while True:
+            time.sleep(settings.SPREAD_TX_FLUSH_INTERVAL)
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception:
+                logger.exception("Transaction journal flush failed")
+
+    def trim(self, redis, entries):
+        """Drop the written entries if they still head the list"""
+        with redis.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(JOURNAL_KEY)
+                    if pipe.lrange(JOURNAL_KEY, 0, len(entries) - 1) != entries:
+                        return False  # Trimmed by a flusher that took over
+
+                    pipe.multi()
+                    pipe.ltrim(JOURNAL_KEY, len(entries), -1)
+                    pipe.execute()
+                    return True
+                except WatchError:
+                    continue  # A row was pushed meanwhile
+
+    def flush(self):
+        redis = self.redis
+        lock = redis.lock(FLUSH_LOCK_KEY, timeout=FLUSH_LOCK_TIMEOUT)
+        if not lock.acquire(blocking=False):
+            return 0  # Another process is flushing
+
+        flushed = 0
+        try:
+            while True:
+                entries = redis.lrange(JOURNAL_KEY, 0, FLUSH_BATCH_SIZE - 1)
+                if not entries:
+                    return flushed
+
+                txs = [json.loads(entry) for entry in entries]
+                cancelled = {uid.decode() for uid in redis.smembers(CANCELLED_KEY)}
+                flushed += write_transactions(txs, cancelled)
+                lock.extend(FLUSH_LOCK_TIMEOUT, replace_ttl=True)
+                if not self.trim(redis, entries):
+                    continue
+
+                dropped = cancelled.intersection(tx["uid"] for tx in txs)
+                if dropped:
+                    redis.srem(CANCELLED_KEY, *dropped)
+        except LockError:
+            logger.warning("Transaction journal lock expired, flush left to its owner")
+            return flushed
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                pass  # Expired, another flusher owns it now
+
+
+journal = TransactionJournal()
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db.models import Q
+
+from exchanges import aio
+from spread.models import SpreadBot
+from .spread_buy import SpreadBuy
+from .spread_sell import SpreadSell
+
+
+logger = logging.getLogger(__name__)
+
+bot_classes = {"buy": SpreadBuy, "sell": SpreadSell}
+
+
+class SpreadBotRunner:
+    """Runs every active buy and sell bot in a single event loop
+
+    Each bot is an asyncio task awaiting the bot's step(). Steps call the
+    exchanges through the async API clients and only hand their short
+    database writes to a thread, and the wait between steps is a non
+    blocking wait for a depth change. The thread pool is left for the few
+    blocking calls, such as the BingX order status service. A failing or
+    slow bot is logged and retried on its own, the other bots keep running.
+    Bots are picked up and dropped by their buy/sell status.
+    """
+
+    refresh_interval = 5
+
+    def __init__(self, workers=None, step_timeout=None):
+        self.workers = workers or settings.SPREAD_BOT_RUNNER_WORKERS
+        self.step_timeout = step_timeout or settings.SPREAD_BOT_STEP_TIMEOUT
+        self.tasks = {}  # (bot_id, side) -> Task
+
+    @database_sync_to_async
+    def get_active_bots(self):
+        bots = SpreadBot.objects.filter(Q(buy_status=True) | Q(sell_status=True))
+        active = set()
+        for bot_id, buy_status, sell_status in bots.values_list(
+            "id", "buy_status", "sell_status"
+        ):
+            if buy_status:
+                active.add((bot_id, "buy"))
+            if sell_status:
+                active.add((bot_id, "sell"))
+        return active
+
+    async def run_step(self, bot, step):
+        future = asyncio.ensure_future(step())
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.step_timeout)
+        except asyncio.TimeoutError:
+            # Cancelling could lose an order placed mid step, let it finish
+            bot.logger.warning(f"Step is taking over {self.step_timeout}s")
+            return await future
+
+    async def run_bot(self, bot_id, side):
+        try:
+            bot = await database_sync_to_async(
+                bot_classes[side], thread_sensitive=False
+            )(bot_id)
+        except Exception:
+            logger.critical(f"Bot {bot_id} {side} failed to start")
+            logger.critical(traceback.format_exc())
+            return
+
+        bot.logger.info("Starting")
+        await asyncio.sleep(5)
+        while True:
+            try:
+                if not await self.run_step(bot, bot.step):
+                    return
+
+                await bot.wait_for_depth()
+
+            except Exception:
+                bot.logger.critical(traceback.format_exc())
+                await asyncio.sleep(5)
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=self.workers))
+
+        while True:
+            for key, task in list(self.tasks.items()):
+                if task.done():
+                    del self.tasks[key]
+
+            try:
+                active = await self.get_active_bots()
+            except Exception:
+                logger.critical(traceback.format_exc())
+                active = set()
+
+            for bot_id, side in active - set(self.tasks):
+                logger.info(f"Starting bot {bot_id} {side}")
+                self.tasks[(bot_id, side)] = asyncio.create_task(
+                    self.run_bot(bot_id, side)
+                )
+
+            await asyncio.sleep(self.refresh_interval)
+
+    def run(self):
+        asyncio.run(aio.closing(self.start()))
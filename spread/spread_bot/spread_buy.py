@@ -1,20 +1,28 @@
+import asyncio
 import os
 import logging
 import traceback
-from time import sleep
 import time
 
+from channels.db import database_sync_to_async
+
+from django.conf import settings
 from django.core.cache import cache
 from django.utils.timezone import now
 
+from exchanges import aio
 from exchanges.api_classes import api_classes
 from spread.models import (
     SpreadBot,
     Exchange,
     ExchangeApi,
-    SpreadBotTx,
 )
 from .utils import SpreadUtilityFunctions
+from .depth_store import depth_age, get_depth
+from .notifications import async_wait_for_depth_change
+from .fill_ledger import get_order_fill
+from .bot_config import get_bot
+from .persistence import record_fill, buy_fill_update
 
 
 logger = logging.getLogger(__name__)
@@ -23,9 +31,11 @@ logger = logging.getLogger(__name__)
 class SpreadBuy:
     """Base class for Spread Buy Bot"""
 
+    side = "buy"
+
     def __init__(self, bot_id):
         self.bot_id = bot_id
-        self.bot = SpreadBot.objects.get(id=self.bot_id)
+        self.bot = get_bot(self.bot_id)
         self.exchange = self.bot.exchange.name
 
         self.set_bot_settings()
@@ -36,9 +46,9 @@ class SpreadBuy:
             self.ticker, self.price_precision, self.quantity_precision
         )
 
-        logger.debug(f"API: {self.api}")
-        logger.info(f"Price Precision: {self.price_precision}")
-        logger.info(f"Qty Precision: {self.quantity_precision}")
+        self.logger.debug(f"API: {self.api}")
+        self.logger.info(f"Price Precision: {self.price_precision}")
+        self.logger.info(f"Qty Precision: {self.quantity_precision}")
 
         self.buy_order_id = None
 
@@ -61,6 +71,10 @@ class SpreadBuy:
         return api
 
     def setup_logger(self):
+        self.logger = logger.getChild(f"{self.bot_id}_{self.side}")
+        if self.logger.handlers:
+            return  # Bot was restarted in the same process
+
         filepath = f"logs/SpreadTrader/{self.exchange}"
         if not os.path.exists(filepath):
             os.makedirs(filepath)
@@ -74,18 +88,16 @@ class SpreadBuy:
             datefmt="%d-%m-%Y %H:%M:%S",
         )
         f_handler.setFormatter(f_format)
-        logger.addHandler(f_handler)
+        self.logger.addHandler(f_handler)
 
-    def check_bot_status(self):
+    async def check_bot_status(self):
         """Check bot status"""
 
-        self.bot = SpreadBot.objects.get(id=self.bot_id)
+        self.bot = await database_sync_to_async(get_bot)(self.bot_id)
         return self.bot.buy_status
 
     def set_bot_settings(self):
-        """Set bot settings"""
-        self.bot = SpreadBot.objects.get(id=self.bot_id)
-
+        """Set bot settings from the bot loaded by __init__ or check_bot_status"""
         self.ticker = self.bot.ticker
         self.tick = self.ticker.split("/")[0]
         self.point = self.bot.point
@@ -100,10 +112,39 @@ class SpreadBuy:
         self.average_correction_rate = self.bot.average_correction_rate
 
     def get_depth(self):
-        """Get depth from cache"""
-        depth = cache.get(f"{self.ticker}_{self.exchange}_depth")
+        """Get depth from the local store or cache"""
+        depth = get_depth(self.ticker, self.exchange)
         return depth
 
+    def is_depth_stale(self):
+        """True when the cached book is older than SPREAD_DEPTH_MAX_AGE"""
+        if not settings.SPREAD_DEPTH_MAX_AGE:
+            return False
+
+        depth = self.get_depth()
+        age = depth_age(depth) if depth else None
+        if age is None or age <= settings.SPREAD_DEPTH_MAX_AGE:
+            return False
+
+        self.logger.warning(
+            f"Order book is {age:.1f}s old, not quoting, "
+            f"Exchange: {self.exchange} Ticker: {self.ticker}"
+        )
+        return True
+
+    def wait_timeout(self):
+        """Longest wait for a book change, 0.5s while an order is open"""
+        return 0.5 if self.buy_order_id else settings.SPREAD_DEPTH_IDLE_TIMEOUT
+
+    async def wait_for_depth(self):
+        if not settings.SPREAD_DEPTH_NOTIFICATIONS_ENABLED:
+            await asyncio.sleep(0.5)
+            return
+
+        await async_wait_for_depth_change(
+            self.ticker, self.exchange, self.wait_timeout()
+        )
+
     def get_balances(self):
         """Get balances from cache"""
         key = f"{self.exchange}_Berke_balances"
@@ -117,16 +158,16 @@ class SpreadBuy:
 
         return balance
 
-    def check_deal_condition(self, new_deal):
+    async def check_deal_condition(self, new_deal):
         if new_deal["quantity"] < self.deal["quantity"] * 0.95:
-            logger.info(f"Quantity changed, cancelling order")
-            self.cancel_order()
+            self.logger.info(f"Quantity changed, cancelling order")
+            await self.cancel_order()
             self.deal = None
             return True
 
         if new_deal["quantity"] > self.deal["quantity"] * 1.20:
-            logger.info(f"Quantity changed, cancelling order")
-            self.cancel_order()
+            self.logger.info(f"Quantity changed, cancelling order")
+            await self.cancel_order()
             self.deal = None
             return True
 
@@ -135,16 +176,18 @@ class SpreadBuy:
         second_highest_bid = float(depth["bids"][1][0])
 
         if highest_bid < self.deal["buy_price"]:
-            logger.warning(
+            self.logger.warning(
                 f"Order book may be outdated, Exchange: {self.exchange} Ticker: {self.ticker}"
             )
             return False
 
         if not highest_bid == self.deal["buy_price"]:  # Gerideyiz
-            logger.info(f"Buy order is not the best, canceling order...")
-            logger.debug(f"Current: {highest_bid} - Order: {self.deal['buy_price']}")
-            logger.debug(f"Depth: {depth['bids']}")
-            self.cancel_order()
+            self.logger.info(f"Buy order is not the best, canceling order...")
+            self.logger.debug(
+                f"Current: {highest_bid} - Order: {self.deal['buy_price']}"
+            )
+            self.logger.debug(f"Depth: {depth['bids']}")
+            await self.cancel_order()
             self.deal = None
             return True
 
@@ -152,8 +195,10 @@ class SpreadBuy:
             side="BUY", highest_bid=second_highest_bid
         )
         if not highest_bid == behind_price:  # En öndeyiz ama arkadakine uzağız
-            logger.info(f"Buy order is best but not close to behind, canceling order")
-            self.cancel_order()
+            self.logger.info(
+                f"Buy order is best but not close to behind, canceling order"
+            )
+            await self.cancel_order()
             self.deal = None
             return True
 
@@ -163,44 +208,54 @@ class SpreadBuy:
 
         self.previous_deals[self.buy_order_id] = self.deal
 
-    def check_previous_deals(self):
+    async def get_order_status(self, order_id, placed_at=None):
+        """Fill from the order stream ledger, REST when the stream is not live"""
+        fill = get_order_fill(self.exchange, self.api.kyc, order_id, placed_at)
+        if fill is None:
+            return await self.api.async_get_order_status(order_id)
+        return fill
+
+    async def check_previous_deals(self):
         elapsed_time = time.time() - self.previous_deal_timer
         if elapsed_time < 5:
             return
 
         for order_id in self.previous_deals.copy():
-            filled_price, filled_quantity, res = self.api.get_order_status(order_id)
+            filled_price, filled_quantity, res = await self.get_order_status(
+                order_id, self.previous_deals[order_id].get("placed_at")
+            )
 
             if filled_quantity == 0:
                 del self.previous_deals[order_id]
                 self.previous_deal_timer = time.time()  # Timer Updated
                 continue
 
-            logger.info(
+            self.logger.info(
                 f"Checked - Order is actually filled qty: {filled_quantity}/{self.previous_deals[order_id]['quantity']}"
             )
             self.previous_deals[order_id]["buy_filled_price"] = filled_price
             self.previous_deals[order_id]["buy_filled_qty"] = filled_quantity
 
-            self.update_average_price_and_sellable_qty(filled_price, filled_quantity)
-            self.record_transaction(self.previous_deals[order_id])
+            await self.record_fill(
+                self.previous_deals[order_id], filled_price, filled_quantity
+            )
 
             del self.previous_deals[order_id]
             self.previous_deal_timer = time.time()  # Timer Updated
-            sleep(0.5)
+            await asyncio.sleep(0.5)
 
-    def cancel_order(self, record=True):
+    async def cancel_order(self, record=True):
         if self.buy_order_id:
             if record:
                 self.add_to_previous_deals()
 
-            self.api.cancel_order(self.buy_order_id)
-            logger.info(f"Cancelled Order")
+            await self.api.async_cancel_order(self.buy_order_id)
+            self.logger.info(f"Cancelled Order")
             self.buy_order_id = None
 
-    def record_transaction(self, deal):
+    def fill_transaction(self, deal):
         transaction = {
-            "bot": self.bot,
+            "bot_id": self.bot_id,
             "buy_price": deal["buy_filled_price"],
             "quantity": deal["buy_filled_qty"],
             "side": "buy",
@@ -224,18 +279,18 @@ class SpreadBuy:
         transaction["fee"] = fee
         transaction["profit"] = profit
 
-        SpreadBotTx.objects.create(**transaction)
+        return transaction
 
     def check_deal(self):
         depth = self.get_depth()
         balances = self.get_balances()
 
-        if len(depth) == 0:
-            logger.error(f"Unable to reach cached depth")
+        if not depth:
+            self.logger.error(f"Unable to reach cached depth")
             return False
 
         if len(balances) == 0:
-            logger.error(f"Unable to reach cached balances")
+            self.logger.error(f"Unable to reach cached balances")
             return False
 
         buy_deal_price = float(depth["bids"][0][0])
@@ -246,7 +301,9 @@ class SpreadBuy:
 
         total_usdt = balances["USDT"]["total"]
         available_usdt = balances["USDT"]["available"]
-        logger.debug(f"Total USDT: {total_usdt} - Available USDT: {available_usdt}")
+        self.logger.debug(
+            f"Total USDT: {total_usdt} - Available USDT: {available_usdt}"
+        )
 
         current_lowest_ask = float(depth["asks"][0][0])
         sell_deal_price = self.util_functions.determine_order_price(
@@ -260,7 +317,7 @@ class SpreadBuy:
         )
 
         if not is_profitable:
-            logger.info(
+            self.logger.info(
                 f"Profit rate is not enough: {profit_rate}, trying to enter at bid price"
             )
 
@@ -272,10 +329,10 @@ class SpreadBuy:
                 profit_rate, self.spread_rate
             )
             if is_profitable:
-                logger.info(f"Will be entered at bid price: {buy_deal_price}")
+                self.logger.info(f"Will be entered at bid price: {buy_deal_price}")
 
         if not is_profitable:
-            logger.info(f"Profit rate is not enough: {profit_rate}")
+            self.logger.info(f"Profit rate is not enough: {profit_rate}")
             return False
 
         available_budget = self.budget - (self.average_price * self.sellable_quantity)
@@ -286,7 +343,7 @@ class SpreadBuy:
         )
 
         if trade_size < 6:
-            logger.warning(f"Trade size is too low: {trade_size}")
+            self.logger.warning(f"Trade size is too low: {trade_size}")
             return False
 
         quantity = trade_size / buy_deal_price
@@ -297,10 +354,10 @@ class SpreadBuy:
             "quantity": quantity,
             "profit_rate": profit_rate,
         }
-        logger.debug(f"Deal: {deal}")
+        self.logger.debug(f"Deal: {deal}")
         return deal
 
-    def record_last_order_placed_time(self):
+    async def record_last_order_placed_time(self):
         """Every 3 minutes record order placed time"""
         key = f"last_buy_order_placed_time_{self.bot_id}"
         last_order_placed = cache.get(key)
@@ -308,110 +365,119 @@ class SpreadBuy:
         if last_order_placed:
             return True
 
-        bot = SpreadBot.objects.get(id=self.bot_id)
-        bot.last_buy_order_date = now()
-        bot.save()
+        bot = SpreadBot.objects.filter(id=self.bot_id)
+        await database_sync_to_async(bot.update)(last_buy_order_date=now())
 
         cache.set(key, True, 180)
         return True
 
-    def execute_deal(self, deal):
+    async def execute_deal(self, deal):
         order_price = deal["buy_price"]
         quantity = deal["quantity"]
 
         order_price_formatted = self.util_functions.format_order_price(order_price)
         order_qty = self.util_functions.determine_qty_down(quantity)
-        order_id, res = self.api.create_limit_order(
+        placed_at = time.time()
+        order_id, res = await self.api.async_create_limit_order(
             "buy", order_price_formatted, order_qty
         )
         if not order_id:
-            logger.error(f"Order failed: {res}")
+            self.logger.error(f"Order failed: {res}")
             return "FAILED"
 
         self.buy_order_id = order_id
+        deal["placed_at"] = placed_at
         deal["buy_order_price"] = order_price
         deal["buy_order_qty"] = order_qty
 
         self.deal = deal
-        logger.info(f"Buy Order placed at {order_price} with quantity {order_qty}")
-        self.record_last_order_placed_time()
+        self.logger.info(f"Buy Order placed at {order_price} with quantity {order_qty}")
+        await self.record_last_order_placed_time()
         return True
 
-    def update_average_price_and_sellable_qty(self, price, quantity):
-        bot = SpreadBot.objects.get(id=self.bot_id)
-        average_price = bot.average_price
-        sellable_qty = bot.sellable_quantity
-
-        new_avg_price = ((average_price * sellable_qty) + (price * quantity)) / (
-            sellable_qty + quantity
+    async def record_fill(self, deal, price, quantity):
+        """Apply the fill to the bot and record its transaction in one go"""
+        await database_sync_to_async(record_fill)(
+            self.bot_id, buy_fill_update(price, quantity), self.fill_transaction(deal)
         )
-        new_sellable_qty = sellable_qty + quantity
 
-        bot.average_price = new_avg_price
-        bot.sellable_quantity = new_sellable_qty
-
-        bot.save()
-        return True
-
-    def check_order_status(self):
+    async def check_order_status(self):
         if not self.buy_order_id:
             return "NO_CURRENT_ORDER"
 
-        filled_price, filled_quantity, res = self.api.get_order_status(
-            self.buy_order_id
+        filled_price, filled_quantity, res = await self.get_order_status(
+            self.buy_order_id, self.deal.get("placed_at")
         )
 
         if filled_quantity == 0:
             return "NO_FILL"
 
-        self.cancel_order(record=False)
-        logger.info(f"Order is filled qty: {filled_quantity}/{self.deal['quantity']}")
+        await self.cancel_order(record=False)
+        self.logger.info(
+            f"Order is filled qty: {filled_quantity}/{self.deal['quantity']}"
+        )
 
         self.deal["buy_filled_price"] = filled_price
         self.deal["buy_filled_qty"] = filled_quantity
 
-        self.update_average_price_and_sellable_qty(filled_price, filled_quantity)
-
-        self.record_transaction(self.deal)
+        await self.record_fill(self.deal, filled_price, filled_quantity)
         self.deal = None
         return True
 
-    def run(self):
-        """Main starting point of Spread Buy Bot"""
-        logger.info("Starting")
-        sleep(5)
-        while True:
-            try:
-                bot_status = self.check_bot_status()
-                if bot_status == False:
-                    self.check_order_status()
-                    self.cancel_order()
-                    # self.api.cancel_open_orders()
-                    logger.warning(f"Bot stopped, closing job")
-                    return False
+    async def stop(self):
+        await self.check_order_status()
+        await self.cancel_order()
+        # self.api.cancel_open_orders()
+        self.logger.warning(f"Bot stopped, closing job")
+
+    async def step(self):
+        """One pass of the buy logic, False once the bot has been stopped"""
+        bot_status = await self.check_bot_status()
+        if bot_status == False:
+            await self.stop()
+            return False
 
-                self.set_bot_settings()
-                self.check_previous_deals()
+        self.set_bot_settings()
+        await self.check_previous_deals()
 
-                deal = self.check_deal()
-                if not deal and self.buy_order_id:  # Deal artık yok order varsa iptal
-                    self.check_order_status()
-                    self.cancel_order()
+        if self.is_depth_stale():  # Neither quote nor cancel until the book is back
+            if self.buy_order_id:
+                await self.check_order_status()
+            return True
+
+        deal = self.check_deal()
+        if not deal and self.buy_order_id:  # Deal artık yok order varsa iptal
+            await self.check_order_status()
+            await self.cancel_order()
 
-                if deal and not self.buy_order_id:  # Deal var order yok alım gir
-                    self.execute_deal(deal)
+        if deal and not self.buy_order_id:  # Deal var order yok alım gir
+            await self.execute_deal(deal)
 
-                if deal and self.buy_order_id:  # Deal var order var durumu kontrol et
-                    self.check_order_status()
+        if deal and self.buy_order_id:  # Deal var order var durumu kontrol et
+            await self.check_order_status()
 
-                if (
-                    deal and self.buy_order_id
-                ):  # Deal var, order gerçekleşmemiş ama deal geçerli mi?
-                    self.check_deal_condition(deal)
+        if (
+            deal and self.buy_order_id
+        ):  # Deal var, order gerçekleşmemiş ama deal geçerli mi?
+            await self.check_deal_condition(deal)
 
-                sleep(0.5)
+        return True
+
+    async def async_run(self):
+        self.logger.info("Starting")
+        await asyncio.sleep(5)
+        while True:
+            try:
+                if not await self.step():
+                    return False
+
+                await self.wait_for_depth()
 
             except Exception as ex:
-                logger.critical(traceback.format_exc())
-                sleep(5)
+                self.logger.critical(traceback.format_exc())
+                await asyncio.sleep(5)
                 pass
+
+    def run(self):
+        """Main starting point of Spread Buy Bot"""
+        return asyncio.run(aio.closing(self.async_run()))
@@ -2,51 +2,83 @@ import math
 from decimal import Decimal
 
 
+class Quantizer:
+    """Exact rounding of prices or quantities to an exchange tick size
+
+    Decimal places and the integer scale of the tick are worked out once.
+    Values are mapped to a whole number of ticks, rounded there and mapped
+    back, so a value already on the grid never moves by a tick because of
+    float noise (0.29 * 100 == 28.999999999999996).
+    """
+
+    def __init__(self, tick):
+        tick = Decimal(str(tick)).normalize()
+        self.decimals = max(0, -tick.as_tuple().exponent)
+        self.scale = 10**self.decimals
+        self.tick_units = int(tick * self.scale)  # Tick in units of 10^-decimals
+        self.tick = self.tick_units / self.scale
+
+    def ticks(self, value, rounding=round):
+        """Whole ticks in value, rounding applies when it is off the grid"""
+        scaled = value * self.scale / self.tick_units
+        nearest = round(scaled)
+        if abs(scaled - nearest) <= 1e-9 + abs(scaled) * 1e-12:
+            return nearest
+        return rounding(scaled)
+
+    def value(self, ticks):
+        return ticks * self.tick_units / self.scale
+
+    def round(self, value):
+        return self.value(self.ticks(value))
+
+    def floor(self, value):
+        return self.value(self.ticks(value, math.floor))
+
+    def ceil(self, value):
+        return self.value(self.ticks(value, math.ceil))
+
+    def step(self, value, ticks):
+        """value moved by a number of ticks, from its nearest tick"""
+        return self.value(self.ticks(value) + ticks)
+
+    def format(self, value):
+        units = self.ticks(value) * self.tick_units
+        sign = "-" if units < 0 else ""
+        whole, fraction = divmod(abs(units), self.scale)
+        if not self.decimals:
+            return f"{sign}{whole}"
+        return f"{sign}{whole}.{fraction:0{self.decimals}d}"
+
+
 class SpreadUtilityFunctions:
     def __init__(self, ticker, price_precision, quantity_precision):
         self.ticker = ticker
         self.price_precision = price_precision
         self.quantity_precision = quantity_precision
+        self.price = Quantizer(price_precision)
+        self.quantity = Quantizer(quantity_precision)
 
     def determine_order_price(self, side, lowest_ask=None, highest_bid=None):
-        decimal_count = Decimal(str(self.price_precision)).as_tuple().exponent * -1
         if side == "BUY":
-            return round(highest_bid + self.price_precision, decimal_count)
+            return self.price.step(highest_bid, 1)
         if side == "SELL":
-            return round(lowest_ask - self.price_precision, decimal_count)
+            return self.price.step(lowest_ask, -1)
 
     def format_order_price(self, order_price):
-        decimal_count = Decimal(str(self.price_precision)).as_tuple().exponent * -1
-        order_price_formatted = format(order_price, f".{decimal_count}f")
-        return order_price_formatted
+        return self.price.format(order_price)
 
     def determine_qty_down(self, qty):
-        decimal_count = Decimal(str(self.quantity_precision)).as_tuple().exponent * -1
-        factor = 10**decimal_count
-        remaining_qty = math.floor(qty * factor) / factor
-
-        return remaining_qty
+        return self.quantity.floor(qty)
 
     def determine_partial_qty(self, total_qty, filled_qty):
-        decimal_count = Decimal(str(self.quantity_precision)).as_tuple().exponent * -1
-        factor = 10**decimal_count
-        remaining_qty = math.floor(total_qty - filled_qty) / factor
-
-        return remaining_qty
+        return self.quantity.floor(total_qty - filled_qty)
 
     def determine_price_down(self, price):
-        decimal_count = Decimal(str(self.price_precision)).as_tuple().exponent * -1
-        factor = 10**decimal_count
-        order_price = math.floor(price * factor) / factor
-
-        return order_price
+        return self.price.floor(price)
 
     def determine_price_up(self, price):
-        decimal_count = Decimal(str(self.price_precision)).as_tuple().exponent * -1
-        factor = 10**decimal_count
-        order_price = math.ceil(price * factor) / factor
-
-        return order_price
+        return self.price.ceil(price)
 
     def calculate_profit_rate(self, buy_price, sell_price):
         return sell_price / buy_price - 1
@@ -7,13 +7,22 @@ import time
 from app.celery import app
 from celery.exceptions import SoftTimeLimitExceeded
 from celery.schedules import crontab
+from django.conf import settings
 from django.core.cache import cache
 
 from spread.models import SpreadBot
+from spread.rollups import rebuild_rollups
 from spread.spread_bot.spread_buy import SpreadBuy
 from spread.spread_bot.spread_sell import SpreadSell
+from spread.spread_bot.runner import SpreadBotRunner
 from spread.spread_bot.balance_cacher import SpreadBalanceCacherBot
-from spread.spread_bot.depth_cacher import SpreadDepthCacherBot
+from spread.spread_bot.order_cacher import SpreadOrderCacherBot
+from spread.spread_bot.order_status_service import SpreadOrderStatusServiceBot
+from spread.spread_bot.persistence import journal
+from spread.spread_bot.depth_cacher import (
+    SpreadDepthCacherBot,
+    SpreadMultiplexDepthCacherBot,
+)
 
 
 @app.task
@@ -22,6 +31,9 @@ def run_spread_task(bot_id, side):
     bot.status = True
     bot.save()
 
+    if settings.SPREAD_BOT_RUNNER_ENABLED:
+        return  # The runner picks the bot up from its status
+
     if side == "buy":
         run_spread_buy_bot.delay(bot_id)
 
@@ -41,13 +53,49 @@ def run_spread_sell_bot(bot_id):
     bot.run()
 
 
+@app.task(autoretry_for=(), max_retries=0, retry_backoff=False)
+def run_spread_bot_runner():
+    runner = SpreadBotRunner()
+    runner.run()
+
+
 @app.task(autoretry_for=(), max_retries=0, retry_backoff=False)
 def run_spread_depth_cacher_bot(bot_id):
     bot = SpreadDepthCacherBot(bot_id)
     bot.run()
 
 
+@app.task(autoretry_for=(), max_retries=0, retry_backoff=False)
+def run_spread_multiplex_depth_cacher_bot():
+    bot = SpreadMultiplexDepthCacherBot()
+    bot.run()
+
+
 @app.task(autoretry_for=(), max_retries=0, retry_backoff=False)
 def run_spread_balance_cacher_bot():
     bot = SpreadBalanceCacherBot()
     bot.run()
+
+
+@app.task(autoretry_for=(), max_retries=0, retry_backoff=False)
+def run_spread_order_cacher_bot():
+    bot = SpreadOrderCacherBot()
+    bot.run()
+
+
+@app.task(autoretry_for=(), max_retries=0, retry_backoff=False)
+def run_spread_order_status_service():
+    bot = SpreadOrderStatusServiceBot()
+    bot.run()
+
+
+@app.task
+def rebuild_spread_tx_rollups(hours=None):
+    """Recompute the hourly transaction rollups, e.g. after manual edits"""
+    return rebuild_rollups(hours)
+
+
+@app.task
+def flush_spread_tx_journal():
+    """Insert the transactions a stopped bot process left in the journal"""
+    return journal.flush()
@@ -0,0 +1,562 @@
+import asyncio
+import logging
+import math
+import random
+import time
+from decimal import ROUND_CEILING, ROUND_FLOOR, ROUND_HALF_EVEN, Decimal
+from unittest import mock
+
+import fakeredis
+from django.db import connection
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from exchanges import aio, rate_limit
+from exchanges.bingx import bingx_api_class, bingx_order_status
+from exchanges.mexc.mexc_ws_class import MexcWS
+from spread.models import Exchange, SpreadBot, SpreadBotTx, SpreadBotTxRollup
+from spread.spread_bot import depth_publisher, fill_ledger, persistence, spread_buy
+from spread.spread_bot.depth_cacher import SpreadDepthCacherBot
+from spread.spread_bot.depth_codec import decode_depth
+from spread.spread_bot.utils import Quantizer
+
+
+class SpreadBotsDataQueriesTest(TestCase):
+    """spread_bots_data costs the same number of queries for any bot count"""
+
+    def setUp(self):
+        self.exchange = Exchange.objects.create(name="Mexc")
+
+    def add_bots(self, count):
+        for _ in range(count):
+            bot = SpreadBot.objects.create(
+                ticker=f"T{SpreadBot.objects.count()}/USDT", exchange=self.exchange
+            )
+            for side in ("buy", "sell", "sell"):
+                SpreadBotTx.objects.create(
+                    bot=bot,
+                    side=side,
+                    buy_price=1,
+                    sell_price=1.1,
+                    quantity=10,
+                    fee=0.01,
+                    profit=0.5,
+                )
+
+    def get_bots_data(self):
+        response = self.client.get(reverse("spread_bots_data"))
+        self.assertEqual(response.status_code, 200)
+        return response.json()["bots"]
+
+    def test_query_count_is_constant_in_bot_count(self):
+        self.add_bots(1)
+        with CaptureQueriesContext(connection) as queries:
+            bots = self.get_bots_data()
+        self.assertEqual(len(bots), 1)
+
+        self.add_bots(9)
+        with self.assertNumQueries(len(queries)):
+            bots = self.get_bots_data()
+        self.assertEqual(len(bots), 10)
+
+        for bot in bots:
+            self.assertAlmostEqual(bot["profits"]["profit_total"], 1.0)
+            self.assertAlmostEqual(bot["profits"]["profit_today"], 1.0)
+
+
+class SpreadBotTxRollupTest(TestCase):
+    def setUp(self):
+        exchange = Exchange.objects.create(name="Mexc")
+        self.bot = SpreadBot.objects.create(ticker="T/USDT", exchange=exchange)
+
+    def bucket(self, side):
+        return SpreadBotTxRollup.objects.filter(bot=self.bot, side=side).first()
+
+    def test_edited_transaction_moves_between_buckets(self):
+        tx = SpreadBotTx.objects.create(
+            bot=self.bot,
+            side="sell",
+            buy_price=1,
+            sell_price=2,
+            quantity=3,
+            fee=0.1,
+            profit=0.5,
+        )
+        tx.profit = 0.75
+        tx.save()
+        self.assertEqual(self.bucket("sell").count, 1)
+        self.assertAlmostEqual(self.bucket("sell").profit, 0.75)
+
+        tx.side = "buy"
+        tx.save()
+        self.assertEqual(self.bucket("sell").count, 0)
+        self.assertAlmostEqual(self.bucket("sell").profit, 0)
+        self.assertEqual(self.bucket("buy").count, 1)
+        self.assertAlmostEqual(self.bucket("buy").volume, 3)
+
+
+class SpreadTransactionsValidationTest(TestCase):
+    def setUp(self):
+        exchange = Exchange.objects.create(name="Mexc")
+        self.bot = SpreadBot.objects.create(ticker="T/USDT", exchange=exchange)
+
+    def post_transactions(self, **body):
+        return self.client.post(
+            reverse("get_spread_transactions"), body, content_type="application/json"
+        )
+
+    def test_malformed_parameters_are_rejected(self):
+        for body in (
+            {},
+            {"bot_id": "abc"},
+            {"bot_id": self.bot.id, "limit": "ten"},
+            {"bot_id": self.bot.id, "limit": 0},
+            {"bot_id": self.bot.id, "limit": 10, "cursor": "not a cursor"},
+            {"bot_id": self.bot.id, "limit": 10, "cursor": "bm90fGE="},
+        ):
+            self.assertEqual(self.post_transactions(**body).status_code, 400, body)
+
+        response = self.client.get(reverse("export_spread_transactions"))
+        self.assertEqual(response.status_code, 400)
+
+    @mock.patch("spread.views.MAX_TRANSACTIONS_LIMIT", 2)
+    def test_limit_is_capped(self):
+        for _ in range(3):
+            SpreadBotTx.objects.create(
+                bot=self.bot, buy_price=1, quantity=1, fee=0, profit=0
+            )
+
+        page = self.post_transactions(bot_id=self.bot.id, limit=10**9).json()
+        self.assertEqual(len(page["transactions"]), 2)
+
+        cursor = page["next_cursor"]
+        page = self.post_transactions(bot_id=self.bot.id, limit=2, cursor=cursor)
+        self.assertEqual(len(page.json()["transactions"]), 1)
+
+
+class SpreadHistoricalDataTest(TestCase):
+    def test_edited_bot_changes_the_etag(self):
+        exchange = Exchange.objects.create(name="Mexc")
+        bot = SpreadBot.objects.create(ticker="T/USDT", exchange=exchange)
+        url = reverse("spread_historical_data")
+
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        bot.ticker = "U/USDT"
+        bot.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["ticker"], "U/USDT")
+
+    def test_etag_is_checked_after_authentication(self):
+        url = reverse("spread_historical_data")
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(
+            url, HTTP_IF_NONE_MATCH=etag, HTTP_AUTHORIZATION="Bearer invalid"
+        )
+        self.assertEqual(response.status_code, 401)
+
+
+class QuantizerTest(SimpleTestCase):
+    """Quantizer agrees with Decimal arithmetic on the decimal value of floats"""
+
+    TICKS = (0.01, 0.005, 0.0001, 0.00000001, 0.25, 1, 5, 10)
+    CASES = 2000
+
+    def reference(self, tick, value, rounding):
+        tick = Decimal(str(tick))
+        return (Decimal(str(value)) / tick).to_integral_value(rounding) * tick
+
+    def values(self, tick, rng):
+        """On grid values and off grid ones with a few more decimals"""
+        decimals = max(0, -Decimal(str(tick)).normalize().as_tuple().exponent)
+        for _ in range(self.CASES):
+            ticks = rng.randint(0, 10**6)
+            yield float(Decimal(ticks) * Decimal(str(tick)))
+
+            digits = decimals + rng.randint(1, 4)
+            value = round(rng.uniform(0, ticks * tick + 1), digits)
+            half = (Decimal(str(value)) / Decimal(str(tick))) % 1
+            if half != Decimal("0.5"):  # Ties depend on the float, not the decimal
+                yield value
+
+    def assertQuantized(self, result, expected, tick, value):
+        self.assertEqual(result, float(expected), f"tick {tick}, value {value!r}")
+
+    def test_floor_ceil_step_format_match_decimal(self):
+        rng = random.Random(20)
+        for tick in self.TICKS:
+            quantizer = Quantizer(tick)
+            places = Decimal(1).scaleb(-quantizer.decimals)
+            for value in self.values(tick, rng):
+                floor = self.reference(tick, value, ROUND_FLOOR)
+                ceil = self.reference(tick, value, ROUND_CEILING)
+                nearest = self.reference(tick, value, ROUND_HALF_EVEN)
+                self.assertQuantized(quantizer.floor(value), floor, tick, value)
+                self.assertQuantized(quantizer.ceil(value), ceil, tick, value)
+                for ticks in (-1, 1, 3):
+                    self.assertQuantized(
+                        quantizer.step(value, ticks),
+                        nearest + ticks * Decimal(str(tick)),
+                        tick,
+                        value,
+                    )
+                self.assertEqual(
+                    quantizer.format(value), f"{nearest.quantize(places):f}", value
+                )
+
+    def test_on_grid_values_do_not_move(self):
+        quantizer = Quantizer(0.01)
+        self.assertEqual(quantizer.floor(0.29), 0.29)
+        self.assertEqual(quantizer.ceil(0.29), 0.29)
+        self.assertEqual(quantizer.format(0.29), "0.29")
+        self.assertEqual(quantizer.step(0.29, 1), 0.3)
+        self.assertEqual(quantizer.floor(1.15), 1.15)
+        self.assertEqual(Quantizer(0.005).floor(0.015), 0.015)
+        self.assertEqual(Quantizer(5).format(10), "10")
+        self.assertTrue(math.isclose(Quantizer(0.00000001).ceil(1e-8), 1e-8))
+
+
+class Stop(BaseException):
+    """Breaks out of the service loops under test"""
+
+
+class BingXOrderStatusServiceTest(SimpleTestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis()
+        patcher = mock.patch.object(
+            bingx_order_status, "get_redis_connection", return_value=self.redis
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.api = mock.Mock(kyc="k")
+        self.api.get_open_orders.return_value = [{"orderId": 1}]
+        self.api.parse_order_status.return_value = (1.5, 2.0)
+        self.service = bingx_order_status.BingXOrderStatusService(self.api)
+
+    @mock.patch.object(bingx_order_status.time, "sleep")
+    def test_redis_errors_do_not_stop_the_service(self, sleep):
+        with mock.patch.object(
+            self.service, "serve", side_effect=[ConnectionError, True, Stop]
+        ) as serve:
+            with self.assertRaises(Stop), self.assertLogs(bingx_order_status.logger):
+                self.service.run()
+        self.assertEqual(serve.call_count, 3)
+        sleep.assert_called_once_with(bingx_order_status.ERROR_MIN_DELAY)
+
+    def test_late_reply_is_not_taken_by_the_next_request(self):
+        pending = bingx_order_status.service_key("k", "pending")
+        self.redis.hset(pending, "1:old", "T/USDT")  # Its caller timed out
+        self.redis.rpush(bingx_order_status.service_key("k", "wake"), "1:old")
+        self.service.serve()
+
+        self.redis.set(bingx_order_status.service_key("k", "alive"), 1)
+        reply = bingx_order_status.request_order_status("k", "T/USDT", 1, timeout=1)
+        self.assertIsNone(reply)
+        late_reply = bingx_order_status.reply_key("k", "1:old")
+        self.assertEqual(self.redis.llen(late_reply), 1)
+
+    def test_async_status_is_fetched_when_the_service_is_down(self):
+        api = bingx_api_class.BingXAPI("T/USDT", "public", "private", "group", "k")
+        order = {"cummulativeQuoteQty": "3", "executedQty": "2"}
+
+        async def sign_request(*args):
+            return {"code": 0, "msg": "", "data": order}
+
+        with mock.patch.object(bingx_api_class, "async_sign_request", sign_request):
+            self.assertEqual(
+                asyncio.run(api.async_get_order_status(1)), (1.5, 2.0, order)
+            )
+
+
+class WebsocketMainTest(SimpleTestCase):
+    def test_every_requested_stream_is_started(self):
+        ws = MexcWS("T/USDT")
+        streams = {}
+
+        def stream(name):
+            async def connect(*args):
+                streams[name] = args
+
+            return connect
+
+        with mock.patch.multiple(
+            ws,
+            connect_public_websocket=stream("depth"),
+            connect_order_websocket=stream("order"),
+        ):
+            asyncio.run(ws.main(depth=print, order=print))
+        self.assertEqual(set(streams), {"depth", "order"})
+
+        with self.assertRaises(ValueError):
+            asyncio.run(ws.main())
+
+
+class AioSessionTest(SimpleTestCase):
+    def test_sessions_are_closed_and_forgotten_with_their_loop(self):
+        async def use_session():
+            aio.limit("Mexc")
+            return aio.get_session()
+
+        session = asyncio.run(aio.closing(use_session()))
+        self.assertTrue(session.closed)
+        self.assertEqual((aio._sessions, aio._semaphores), ({}, {}))
+
+        with self.assertWarns(ResourceWarning), self.assertLogs("asyncio"):
+            asyncio.run(use_session())
+            session = asyncio.run(aio.closing(use_session()))
+        self.assertTrue(session.closed)
+        self.assertEqual((aio._sessions, aio._semaphores), ({}, {}))
+
+
+@mock.patch.object(depth_publisher, "write_local_depth", mock.Mock())
+@mock.patch.object(depth_publisher, "notify_depth_change", mock.Mock())
+class DepthKeepaliveTest(SimpleTestCase):
+    def setUp(self):
+        self.cacher = SpreadDepthCacherBot(bot_id=1)
+        self.cacher.ticker = "T/USDT"
+        self.ws = mock.Mock(websocket=mock.Mock(open=True), tickers={"T/USDT"})
+        cache.delete("T/USDT_Mexc_depth")
+
+    def received_at(self):
+        return decode_depth(cache.get("T/USDT_Mexc_depth"))["received_at"]
+
+    @mock.patch.object(depth_publisher, "time")
+    def test_quiet_book_of_a_live_connection_is_not_stale(self, time):
+        time.time.return_value = 100
+        self.cacher.stream_depth(self.ws)("Mexc", [[1.1, 5]], [[1.0, 5]])
+
+        time.time.return_value = 100 + self.cacher.publisher.keepalive
+        self.cacher.publisher.refresh(self.cacher.is_live)
+        self.assertEqual(self.received_at(), time.time.return_value)
+
+        refreshed_at = time.time.return_value
+        self.ws.websocket.open = False
+        time.time.return_value += self.cacher.publisher.keepalive
+        self.cacher.publisher.refresh(self.cacher.is_live)
+        self.assertEqual(self.received_at(), refreshed_at)
+
+
+class SpreadBuyAsyncStepTest(SimpleTestCase):
+    def setUp(self):
+        self.bot = SpreadBot(id=1, ticker="T/USDT", exchange=Exchange(name="Mexc"))
+        self.bot.buy_status = True
+        self.api = mock.Mock(kyc="k")
+        self.api.async_create_limit_order = mock.AsyncMock(return_value=("7", {}))
+        self.api.async_get_order_status = mock.AsyncMock(return_value=(1.01, 5, {}))
+        self.api.async_cancel_order = mock.AsyncMock(return_value=(True, {}))
+
+        def setup_api(bot):
+            bot.price_precision, bot.quantity_precision = 0.01, 1
+            return self.api
+
+        depth = {"asks": [[1.2, 100], [1.21, 100]], "bids": [[1.0, 100], [0.99, 100]]}
+        for patcher in (
+            mock.patch.object(spread_buy, "get_bot", return_value=self.bot),
+            mock.patch.object(spread_buy, "get_depth", return_value=depth),
+            mock.patch.object(spread_buy.SpreadBuy, "setup_api", setup_api),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        bot_logger = spread_buy.logger.getChild("1_buy")
+        if not bot_logger.handlers:  # Keeps setup_logger off the disk
+            bot_logger.addHandler(logging.NullHandler())
+        cache.set("Mexc_Berke_balances", {"USDT": {"total": 100, "available": 100}})
+        cache.set("last_buy_order_placed_time_1", True)
+
+    @mock.patch.object(spread_buy, "record_fill")
+    def test_step_trades_through_the_async_client(self, record_fill):
+        bot = spread_buy.SpreadBuy(1)
+        self.assertTrue(asyncio.run(bot.step()))
+
+        self.api.async_create_limit_order.assert_awaited_once_with("buy", "1.01", 99)
+        self.api.async_get_order_status.assert_awaited_once_with("7")
+        self.api.async_cancel_order.assert_awaited_once_with("7")
+        record_fill.assert_called_once()
+        self.assertIsNone(bot.buy_order_id)
+        for method in ("create_limit_order", "get_order_status", "cancel_order"):
+            getattr(self.api, method).assert_not_called()
+
+
+@override_settings(SPREAD_TX_WRITE_BEHIND=True)
+class TransactionJournalTest(TestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis()
+        for patcher in (
+            mock.patch.object(
+                persistence, "get_redis_connection", return_value=self.redis
+            ),
+            mock.patch.object(persistence.journal, "start_flusher"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        exchange = Exchange.objects.create(name="Mexc")
+        self.bot = SpreadBot.objects.create(ticker="T/USDT", exchange=exchange)
+
+    def record_buy(self, price=1, quantity=2):
+        tx = {
+            "bot_id": self.bot.id,
+            "buy_price": price,
+            "quantity": quantity,
+            "side": "buy",
+            "fee": 0,
+            "profit": 0,
+        }
+        persistence.record_fill(
+            self.bot.id, persistence.buy_fill_update(price, quantity), tx
+        )
+
+    def test_batch_replayed_after_a_crash_is_inserted_once(self):
+        self.record_buy()
+        entries = self.redis.lrange(persistence.JOURNAL_KEY, 0, -1)
+        self.assertEqual(persistence.journal.flush(), 1)
+
+        self.redis.rpush(persistence.JOURNAL_KEY, *entries)  # Died before the trim
+        self.assertEqual(persistence.journal.flush(), 0)
+        self.assertEqual(SpreadBotTx.objects.count(), 1)
+        self.assertEqual(self.redis.llen(persistence.JOURNAL_KEY), 0)
+
+    def test_fill_of_a_failed_bot_update_is_never_inserted(self):
+        with mock.patch.object(persistence, "update_bot", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.record_buy()
+
+        self.assertEqual(persistence.journal.flush(), 0)
+        self.assertFalse(SpreadBotTx.objects.exists())
+        self.assertFalse(self.redis.exists(persistence.CANCELLED_KEY))
+        self.assertEqual(self.redis.llen(persistence.JOURNAL_KEY), 0)
+
+    def test_rows_after_a_batch_trimmed_by_another_flusher_are_kept(self):
+        write_transactions = persistence.write_transactions
+
+        def stalled_write(txs, cancelled):
+            written = write_transactions(txs, cancelled)
+            if SpreadBotTx.objects.count() == 1:
+                # The lock expired, the next flusher wrote and trimmed the
+                # batch and a new fill came in
+                self.redis.lpop(persistence.JOURNAL_KEY)
+                self.record_buy(price=2)
+            return written
+
+        self.record_buy()
+        with mock.patch.object(persistence, "write_transactions", stalled_write):
+            self.assertEqual(persistence.journal.flush(), 2)
+        self.assertEqual(SpreadBotTx.objects.count(), 2)
+        self.assertEqual(self.redis.llen(persistence.JOURNAL_KEY), 0)
+
+    def test_selling_everything_resets_the_average_price(self):
+        SpreadBot.objects.filter(id=self.bot.id).update(
+            average_price=2, sellable_quantity=0.3
+        )
+        quantizer = Quantizer(0.1)
+
+        persistence.update_bot(
+            self.bot.id, **persistence.sell_fill_update(0.1, quantizer)
+        )
+        self.bot.refresh_from_db()
+        self.assertAlmostEqual(self.bot.sellable_quantity, 0.2)
+        self.assertEqual(self.bot.average_price, 2)
+
+        persistence.update_bot(
+            self.bot.id, **persistence.sell_fill_update(0.2, quantizer)
+        )
+        self.bot.refresh_from_db()
+        self.assertEqual(self.bot.sellable_quantity, 0)
+        self.assertEqual(self.bot.average_price, 0)
+
+
+@mock.patch.dict(rate_limit.LIMITS, {"Test": {"public": (2, 1), "private": (100, 1)}})
+class RateLimiterTest(SimpleTestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis()
+        patcher = mock.patch.object(
+            rate_limit, "get_redis_connection", return_value=self.redis
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.limiter = rate_limit.RateLimiter()
+
+    def tokens(self, costs):
+        key = self.limiter.bucket_key(costs[0])
+        return float(self.redis.hget(key, "tokens"))
+
+    def test_empty_bucket_blocks_until_it_refills(self):
+        costs = self.limiter.costs("Test", None, "/depth")
+        self.assertEqual(self.limiter.take_shared(costs, 100), 0)
+        self.assertEqual(self.limiter.take_shared(costs, 100), 0)
+        self.assertEqual(self.limiter.take_shared(costs, 100), 1)
+
+        # Told to wait, the process does not ask Redis again before it is over
+        with mock.patch.object(self.limiter, "take_shared") as take_shared:
+            self.assertEqual(self.limiter.take_leased(costs, 100.25), 0.75)
+            take_shared.assert_not_called()
+
+        self.assertEqual(self.limiter.take_shared(costs, 101), 0)
+        self.assertEqual(self.tokens(costs), 0)
+
+    def test_unspent_leased_calls_go_back_to_the_bucket(self):
+        costs = self.limiter.costs("Test", "key", "/order")
+        self.assertEqual(self.limiter.take_shared(costs, 100), 0)
+        self.assertEqual(self.tokens(costs), 100 - rate_limit.LEASE)
+        self.assertEqual(self.limiter.take_leased(costs, 100.5), 0)
+
+        expired = 100 + rate_limit.LEASE_TTL
+        self.assertIsNone(self.limiter.take_leased(costs, expired))
+        self.assertEqual(self.limiter.take_shared(costs, expired), 0)
+        unspent = rate_limit.LEASE - 2
+        self.assertEqual(
+            self.tokens(costs),
+            100 - 2 * rate_limit.LEASE + rate_limit.LEASE_TTL + unspent,
+        )
+
+    def test_metrics_are_shared_over_redis(self):
+        costs = self.limiter.costs("Test", None, "/depth")
+        now = time.time()
+        self.limiter.take_shared(costs, now)
+        self.limiter.take_shared(costs, now)
+
+        with mock.patch.object(rate_limit, "limiter", self.limiter):
+            (buckets,) = rate_limit.shared_metrics().values()
+        self.assertEqual(buckets["Test:host:public"]["requests"], 1)
+
+
+@override_settings(SPREAD_ORDER_STREAMS_ENABLED=True, SPREAD_ORDER_STREAM_MAX_AGE=30)
+class FillLedgerTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def record(self, connected_at, fills=()):
+        fill_ledger.record_fills("Mexc", "kyc", connected_at, fills)
+
+    def test_fill_of_a_live_stream_is_returned(self):
+        self.record(100, [("1", 2.5, 4, "PARTIALLY_FILLED")])
+
+        filled_price, filled_quantity, fill = fill_ledger.get_order_fill(
+            "Mexc", "kyc", "1", 150
+        )
+        self.assertEqual((filled_price, filled_quantity), (2.5, 4))
+        self.assertEqual(fill["status"], "PARTIALLY_FILLED")
+
+    def test_stale_heartbeat_falls_back_to_rest(self):
+        self.record(100, [("1", 2.5, 4, "FILLED")])
+        cache.delete(fill_ledger.stream_key("Mexc", "kyc"))  # Heartbeat expired
+
+        self.assertIsNone(fill_ledger.get_order_fill("Mexc", "kyc", "1", 150))
+
+    def test_order_placed_before_the_stream_connected_falls_back_to_rest(self):
+        self.record(200, [("1", 2.5, 4, "FILLED")])
+
+        self.assertIsNone(fill_ledger.get_order_fill("Mexc", "kyc", "1", 150))
+
+    def test_order_missing_from_the_ledger_falls_back_to_rest(self):
+        self.record(100)
+
+        self.assertIsNone(fill_ledger.get_order_fill("Mexc", "kyc", "1", 150))
@@ -1,17 +1,27 @@
 from datetime import datetime, timedelta
 import asyncio
+import base64
+import csv
+import hashlib
+import itertools
 import json
 
-from django.db.models import Sum, FloatField
+from django.db.models import Sum, Max, FloatField
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
+from django.views.decorators.http import condition
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from django.db.models.functions import Coalesce
 from django.utils.timezone import now
 from django.db.models import Q
 from django.core.cache import cache
 
-from spread.models import SpreadBot, SpreadBotTx, Exchange
+from spread.models import SpreadBot, SpreadBotTx, SpreadBotTxRollup, Exchange
+from spread.rollups import history_version, tx_hour, tx_volume_expression
 
 
 @api_view(["POST"])
@@ -27,54 +37,53 @@ def add_spread_bot(request):
         return Response({"result": "ok"})
 
 
-def get_profits(bot):
-    profit_today = SpreadBotTx.objects.filter(
-        bot=bot,
-        created_at__gte=now().replace(hour=0, minute=0, second=0),
-        side="sell",
-    ).aggregate(profit_today=Coalesce(Sum("profit"), 0, output_field=FloatField()))[
-        "profit_today"
-    ]
-    profit_24hours = SpreadBotTx.objects.filter(
-        bot=bot,
-        created_at__gte=now() - timedelta(hours=24),
-        side="sell",
-    ).aggregate(profit_24hours=Coalesce(Sum("profit"), 0, output_field=FloatField()))[
-        "profit_24hours"
-    ]
-    profit_7days = SpreadBotTx.objects.filter(
-        bot=bot,
-        created_at__gte=now() - timedelta(days=7),
-        side="sell",
-    ).aggregate(profit_7days=Coalesce(Sum("profit"), 0, output_field=FloatField()))[
-        "profit_7days"
-    ]
-    profit_30days = SpreadBotTx.objects.filter(
-        bot=bot,
-        created_at__gte=now() - timedelta(days=30),
-        side="sell",
-    ).aggregate(profit_30days=Coalesce(Sum("profit"), 0, output_field=FloatField()))[
-        "profit_30days"
-    ]
-    profit_total = SpreadBotTx.objects.filter(bot=bot, side="sell").aggregate(
-        profit_total=Coalesce(Sum("profit"), 0, output_field=FloatField())
-    )["profit_total"]
-
-    profits = {
-        "profit_today": profit_today,
-        "profit_24hours": profit_24hours,
-        "profit_7days": profit_7days,
-        "profit_30days": profit_30days,
-        "profit_total": profit_total,
+PROFIT_FIELDS = (
+    "profit_today",
+    "profit_24hours",
+    "profit_7days",
+    "profit_30days",
+    "profit_total",
+)
+
+
+def get_profits():
+    """{bot_id: profits} of sell transactions from the hourly rollups
+
+    Windows start on the hour, so rolling ones include up to an extra hour.
+    """
+    current = now()
+    since = {
+        "profit_today": current.replace(hour=0, minute=0, second=0),
+        "profit_24hours": current - timedelta(hours=24),
+        "profit_7days": current - timedelta(days=7),
+        "profit_30days": current - timedelta(days=30),
     }
-    return profits
+    sums = {
+        field: Coalesce(
+            Sum("profit", filter=Q(hour__gte=tx_hour(since[field]))),
+            0,
+            output_field=FloatField(),
+        )
+        for field in since
+    }
+    sums["profit_total"] = Coalesce(Sum("profit"), 0, output_field=FloatField())
+
+    rows = (
+        SpreadBotTxRollup.objects.filter(side="sell")
+        .values("bot_id")
+        .order_by()
+        .annotate(**sums)
+    )
+    return {row.pop("bot_id"): row for row in rows}
 
 
 @api_view(["GET"])
 def spread_bots_data(request):
     data = {"bots": []}
 
-    query = SpreadBot.objects.all()
+    query = SpreadBot.objects.select_related("exchange")
+    profits = get_profits()
+    no_profits = dict.fromkeys(PROFIT_FIELDS, 0)
 
     for bot in query:
         bot_dict = {}
@@ -100,69 +109,189 @@ def spread_bots_data(request):
             "created_at": bot.created_at,
         }
         bot_dict["settings"] = settings
-        bot_dict["profits"] = get_profits(bot)
+        bot_dict["profits"] = profits.get(bot.id, no_profits)
 
         data["bots"].append(bot_dict)
 
     return Response(data)
 
 
+TRANSACTION_FIELDS = (
+    "id",
+    "bot__ticker",
+    "bot__exchange__name",
+    "buy_price",
+    "sell_price",
+    "quantity",
+    "fee",
+    "profit",
+    "side",
+    "condition",
+    "created_at",
+)
+EXPORT_CHUNK_SIZE = 2000
+MAX_TRANSACTIONS_LIMIT = 1000
+
+
+def parse_bot_id(bot_id):
+    """A bot id or "all-transactions", ValidationError for anything else"""
+    if bot_id == "all-transactions":
+        return bot_id
+    try:
+        return int(bot_id)
+    except (TypeError, ValueError):
+        raise ValidationError({"bot_id": "A bot id or all-transactions is required"})
+
+
+def parse_limit(limit):
+    """Page size capped at MAX_TRANSACTIONS_LIMIT, None when not paginated"""
+    if limit in (None, ""):
+        return None
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        limit = 0
+    if limit < 1:
+        raise ValidationError({"limit": "Must be a positive integer"})
+    return min(limit, MAX_TRANSACTIONS_LIMIT)
+
+
+def filter_transactions(bot_id, full):
+    if bot_id == "all-transactions":
+        return SpreadBotTx.objects.filter(created_at__gte=now() - timedelta(hours=6))
+    if full:
+        return SpreadBotTx.objects.filter(bot_id=bot_id)
+    return SpreadBotTx.objects.filter(
+        bot_id=bot_id, created_at__gte=now() - timedelta(days=2)
+    )
+
+
+def transaction_totals(query):
+    return query.order_by().aggregate(
+        total_profit=Coalesce(Sum("profit"), 0, output_field=FloatField()),
+        total_volume=Coalesce(
+            Sum(tx_volume_expression()), 0, output_field=FloatField()
+        ),
+    )
+
+
+def encode_cursor(transaction):
+    value = f"{transaction['created_at'].isoformat()}|{transaction['id']}"
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def after_cursor(query, cursor):
+    """Transactions older than the cursor in (-created_at, -id) order"""
+    try:
+        value = base64.urlsafe_b64decode(str(cursor).encode()).decode()
+        created_at, tx_id = value.split("|")
+        created_at = datetime.fromisoformat(created_at)
+        tx_id = int(tx_id)
+    except ValueError:  # Also bad base64 and utf-8
+        raise ValidationError({"cursor": "Invalid cursor"})
+    return query.filter(
+        Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=tx_id)
+    )
+
+
 @api_view(["POST"])
 def get_spread_transactions(request):
+    """Transactions of a bot, newest first, with database computed totals
+
+    A limit in the body, capped at MAX_TRANSACTIONS_LIMIT, returns one keyset
+    page and the next_cursor to send back for the following one.
+    """
     if request.method == "POST":
         body = request.data
-        bot_id = body["bot_id"]
+        bot_id = parse_bot_id(body.get("bot_id"))
         full = body.get("full", None)
+        limit = parse_limit(body.get("limit", None))
+        cursor = body.get("cursor", None)
+
+        query = filter_transactions(bot_id, full)
+        totals = transaction_totals(query)
 
         if bot_id == "all-transactions":
-            last_24_hours = now() - timedelta(hours=6)
-            query = transactions = SpreadBotTx.objects.filter(
-                created_at__gte=last_24_hours
-            )
+            ticker = "All Transactions"
         else:
-            if full:
-                query = transactions = SpreadBotTx.objects.filter(bot_id=bot_id)
-            else:
-                last_3_days = now() - timedelta(days=2)
-                query = transactions = SpreadBotTx.objects.filter(
-                    bot_id=bot_id, created_at__gte=last_3_days
-                )
-
-        transactions = query.order_by("-created_at").values(
-            "bot__ticker",
-            "bot__exchange__name",
-            "buy_price",
-            "sell_price",
-            "quantity",
-            "fee",
-            "profit",
-            "side",
-            "condition",
-            "created_at",
-        )
+            ticker = (
+                SpreadBot.objects.filter(id=bot_id)
+                .values_list("ticker", flat=True)
+                .first()
+            )
 
-        total_profit = 0
-        total_volume = 0
-        for transaction in transactions:
-            total_profit += transaction["profit"]
-            if transaction["side"] == "buy":
-                total_volume += transaction["quantity"] * transaction["buy_price"]
-            else:
-                total_volume += transaction["quantity"] * transaction["sell_price"]
+        if cursor:
+            query = after_cursor(query, cursor)
+        transactions = query.order_by("-created_at", "-id").values(
+            *TRANSACTION_FIELDS
+        )
 
-        ticker = transactions[0]["bot__ticker"] if transactions else None
-        ticker = "All Transactions" if bot_id == "all-transactions" else ticker
+        next_cursor = None
+        if limit:
+            transactions = list(transactions[: limit + 1])
+            if len(transactions) > limit:
+                transactions = transactions[:limit]
+                next_cursor = encode_cursor(transactions[-1])
 
         return Response(
             {
                 "ticker": ticker,
                 "transactions": transactions,
-                "total_profit": total_profit,
-                "total_volume": total_volume,
+                "total_profit": totals["total_profit"],
+                "total_volume": totals["total_volume"],
+                "next_cursor": next_cursor,
             }
         )
 
 
+class Echo:
+    """File-like object handing each csv row back instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+@api_view(["GET"])
+def export_spread_transactions(request):
+    """Streams the transactions of a bot as NDJSON (default) or CSV
+
+    Rows are read from a server side cursor in chunks, totals are sent in
+    the X-Total-Profit and X-Total-Volume headers.
+    """
+    bot_id = parse_bot_id(request.query_params.get("bot_id"))
+    full = request.query_params.get("full") in ("1", "true")
+    export_format = request.query_params.get("export", "ndjson")
+
+    query = filter_transactions(bot_id, full)
+    totals = transaction_totals(query)
+    rows = (
+        query.order_by("-created_at", "-id")
+        .values_list(*TRANSACTION_FIELDS)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+    if export_format == "csv":
+        writer = csv.writer(Echo())
+        lines = itertools.chain(
+            [writer.writerow(TRANSACTION_FIELDS)],
+            (writer.writerow(row) for row in rows),
+        )
+        response = StreamingHttpResponse(lines, content_type="text/csv")
+        filename = f"spread_transactions_{bot_id}.csv"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    else:
+        lines = (
+            json.dumps(dict(zip(TRANSACTION_FIELDS, row)), cls=DjangoJSONEncoder)
+            + "\n"
+            for row in rows
+        )
+        response = StreamingHttpResponse(lines, content_type="application/x-ndjson")
+
+    response["X-Total-Profit"] = str(totals["total_profit"])
+    response["X-Total-Volume"] = str(totals["total_volume"])
+    return response
+
+
 @api_view(["POST"])
 def average_correction(request):
     if request.method == "POST":
@@ -212,37 +341,37 @@ def budget_update(request):
         return Response({"result": "ok"})
 
 
-def get_bot_total_profit(bot_id):
-    profit = SpreadBotTx.objects.filter(bot_id=bot_id).aggregate(
-        total=Coalesce(Sum("profit"), 0.0),
-    )
-    return profit
+class HistoricalDataPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+def historical_data_etag(request):
+    params = request.GET.urlencode()
+    return f"{history_version()}-{hashlib.md5(params.encode()).hexdigest()[:8]}"
 
 
 @api_view(["GET"])
+@condition(etag_func=historical_data_etag)
 def spread_historical_data(request):
-    bots = []
-
-    _bots = (
-        SpreadBot.objects.filter()
-        .order_by("-created_at")
-        .values("id", "ticker", "exchange__name", "created_at")
+    """Bots with their total profit and latest transaction, newest first
+
+    Paginated when a page is requested, the whole list otherwise. Answers
+    304, after authentication, while no bot or transaction changed.
+    """
+    bots = (
+        SpreadBot.objects.order_by("-created_at")
+        .annotate(
+            profit=Coalesce(Sum("spreadbottxrollup__profit"), 0.0),
+            latest_tx=Max("spreadbottxrollup__last_tx_at"),
+        )
+        .values("id", "ticker", "exchange__name", "created_at", "profit", "latest_tx")
     )
 
-    for bot in _bots:
-        bot_id = bot["id"]
-        profit = get_bot_total_profit(bot_id)
-        bot["profit"] = profit["total"]
-        try:
-            get_bot_latest_tx = (
-                SpreadBotTx.objects.filter(bot_id=bot_id)
-                .order_by("-created_at")
-                .values("created_at")
-                .first()
-            )
-            bot["latest_tx"] = get_bot_latest_tx["created_at"]
-        except:
-            bot["latest_tx"] = None
-        bots.append(bot)
+    if "page" not in request.query_params:
+        return Response(list(bots))
 
-    return Response(bots)
+    paginator = HistoricalDataPagination()
+    page = paginator.paginate_queryset(bots, request)
+    return paginator.get_paginated_response(page)